@@ -1,14 +1,32 @@
 # hormon_app_perfect.py
+import hmac
+import inspect
+import json
+import os
+import time
+import uuid
+from contextlib import nullcontext
+
 import streamlit as st
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from scipy.interpolate import interp1d
-from datetime import datetime
-import json
-import io
-import sys
-import subprocess
+
+from kalibrovka import (
+    УСУЛЛАР, content_hash, parse_columns_report,
+    cached_artifact, статистика_ҳисоблаш, results_table, filter_results,
+    build_config, config_to_json, validate_config, available_formats, get_backend,
+    archive_bytes
+)
+from kalibrovka.plot import cached_calibration_plot
+from kalibrovka.registry import default_registry
+from kalibrovka.history import RunRecord, default_history
+from kalibrovka.incremental import Update, curve_reusable, patch_result
+from kalibrovka.multiplex import (
+    Analyte, build_multiplex_config, evaluate_multiplex, is_multiplex_config, validate_multiplex_config
+)
+from kalibrovka.store import MemoryBudgetError, StoredResult, default_store
+from kalibrovka.uncertainty import DEFAULT_LEVEL, DEFAULT_REPLICATES, cached_bootstrap_ci
+from kalibrovka.instrument import Capture, enable, enabled, metrics, prometheus_text, stage, timed
 
 # Streamlit саҳифа конфигурацияси - ФАҚАТ БИТТА МАРТА
 st.set_page_config(
@@ -18,6 +36,21 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Ўлчовлар: ёқилган бўлса (HORMON_METRICS=1 ёки диагностика панели) ҳар бир
+# rerun учун босқичлар тақсимоти; cProfile/tracemalloc фақат сўралганда.
+# Ўчиқ бўлса ҳеч нарса бошланмайди.
+_тугалланмаган = st.session_state.get("_жорий_ўлчов")
+if _тугалланмаган is not None:
+    # Олдинги rerun охирига етмаган (st.rerun) - профилловчини ёпамиз
+    _тугалланмаган.abort()
+ўлчов = None
+# Профиллаш фақат админ сессияда (байроқлар админ панелидан)
+_профил = bool(st.session_state.get("админ") and st.session_state.get("profile_cpu"))
+_хотира = bool(st.session_state.get("админ") and st.session_state.get("profile_memory"))
+if enabled() or _профил or _хотира:
+    ўлчов = Capture(profile=_профил, memory=_хотира).start()
+st.session_state._жорий_ўлчов = ўлчов
+
 # CSS стиллар
 st.markdown("""
 <style>
@@ -112,199 +145,477 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Excel экспорт учун функция
-def check_excel_support():
-    """Excel экспортни қўллаб-қувватлашни текшириш"""
-    try:
-        import xlsxwriter
-        return True
-    except ImportError:
-        return False
+# Экспорт ёзувчилари - жараён бошида бир марта текширилади
+экспорт_форматлари = available_formats()
 
-def install_xlsxwriter():
-    """xlsxwriter ни ўрнатиш"""
-    try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "xlsxwriter", "--quiet"])
-        return True
-    except:
-        return False
+# Натижалар омбори - жараён учун битта, сессиялар ўртасида бўлишилади;
+# сессия ҳолатида фақат натижа калити сақланади
+омбор = default_store()
+
+# Мосланган эгри чизиқлар реестри (гормон, бирлик, лот, стандартлар бўйича)
+реестр = default_registry()
+
+# Ҳисоблашлар тарихи (HORMON_HISTORY_DB берилганда; ёзиш орқа thread'да)
+тарих = default_history()
+
+# Streamlit 1.52+ да download_button маълумотни функция сифатида қабул қилади -
+# файл фақат тугма босилганда қурилади
+try:
+    _streamlit_version = tuple(int(x) for x in st.__version__.split(".")[:2])
+except ValueError:
+    _streamlit_version = (0, 0)
+LAZY_DOWNLOAD = _streamlit_version >= (1, 52)
+
+# st.tabs(on_change=...) - танланган бўлимни билиш мумкин бўлган версиялар
+LAZY_TABS = "on_change" in inspect.signature(st.tabs).parameters
+
+# Жонли кўринишда кўрсатиладиган охирги ўзгарган қаторлар сони
+ЖОНЛИ_ҚАТОРЛАР = 20
+
+def экспорт_маълумоти(калит, формат, builder):
+    """Экспорт файли: натижа hash'и бўйича кэшланади, имкон бўлса кечиктириб қурилади"""
+    def build():
+        return cached_artifact(калит, формат, builder)
+    return build if LAZY_DOWNLOAD else build()
 
-def export_to_excel(results_df, статистика, гормон_номи):
-    """Excel файл яратиш"""
+# Функцияларни эълон қилиш
+@timed("interpolate")
+def интерполяция(оптик_зичлик_стандарт, концентрация_стандарт, оптик_зичлик_беморлар, усул='linear'):
+    """
+    Интерполяция функцияси (хатоликни UI'да кўрсатади)
+
+    Эгри чизиқ лот реестридан олинади - шу гормон, бирлик, лот ва
+    стандартлар бошқа сессияда мосланган бўлса қайта мосланмайди.
+    Қайтаради: (концентрация, ҳолат, эгри_чизиқ, реестрдан_олинди).
+    """
+    оптик_зичлик_беморлар = np.asarray(оптик_зичлик_беморлар, dtype=float)
     try:
-        # Автоматик ўрнатиш
-        if not check_excel_support():
-            if install_xlsxwriter():
-                st.success("✅ xlsxwriter ўрнатилди")
-            else:
-                st.warning("⚠️ xlsxwriter ўрнатишда хатолик. CSV форматида юклаб олинг.")
-                return None
-        
-        import xlsxwriter
-        from io import BytesIO
-        
-        output = BytesIO()
-        
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            # Натижаларни ёзиш
-            results_df.to_excel(writer, sheet_name='Натижалар', index=False)
-            
-            # Статистикани ёзиш
-            stats_df = pd.DataFrame(list(статистика.items()), columns=['Параметр', 'Қиймат'])
-            stats_df.to_excel(writer, sheet_name='Статистика', index=False)
-            
-            # Форматлаш
-            workbook = writer.book
-            
-            # Сарлавҳа формати
-            header_format = workbook.add_format({
-                'bold': True,
-                'border': 1,
-                'bg_color': '#2E86AB',
-                'color': 'white',
-                'align': 'center'
-            })
-            
-            # Ҳолат формати
-            normal_format = workbook.add_format({
-                'bg_color': '#d4edda',
-                'border': 1,
-                'align': 'center'
-            })
-            
-            warning_format = workbook.add_format({
-                'bg_color': '#fff3cd',
-                'border': 1,
-                'align': 'center'
-            })
-            
-            # Форматларни қўллаш
-            worksheet = writer.sheets['Натижалар']
-            for col_num, value in enumerate(results_df.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            
-            # Ҳолатларга ранг бериш
-            if 'Ҳолат' in results_df.columns:
-                col_idx = results_df.columns.get_loc('Ҳолат')
-                for row_num in range(1, len(results_df) + 1):
-                    cell_value = results_df.iloc[row_num-1, col_idx]
-                    if '✅' in str(cell_value):
-                        worksheet.write(row_num, col_idx, cell_value, normal_format)
-                    elif '⚠️' in str(cell_value):
-                        worksheet.write(row_num, col_idx, cell_value, warning_format)
-        
-        return output.getvalue()
-        
+        эгри_чизиқ, реестрдан = реестр.get_or_fit(
+            st.session_state.гормон_номи,
+            st.session_state.улчов_бирлиги,
+            st.session_state.лот,
+            оптик_зичлик_стандарт,
+            концентрация_стандарт,
+            усул
+        )
+        return эгри_чизиқ(оптик_зичлик_беморлар), эгри_чизиқ.classify(оптик_зичлик_беморлар), эгри_чизиқ, реестрдан
     except Exception as e:
-        st.error(f"❌ Excel экспортда хатолик: {str(e)[:100]}")
+        st.error(f"Интерполяцияда хатолик: {str(e)[:100]}")
+        return np.full_like(оптик_зичлик_беморлар, np.nan), np.zeros_like(оптик_зичлик_беморлар, dtype=int), None, False
+
+def style_results(results_df):
+    """Жадвал кўриниши: концентрациялар "%.4f", NaN - "N/A" (фақат экранда)"""
+    concentration = [c for c in results_df.columns if c.startswith("Концентрация")]
+    return results_df.style.format("{:.4f}", subset=concentration, na_rep="N/A")
+
+# Стиллаш функцияси - .applymap() ўрнига .map() ишлатилди
+def color_status(val):
+    if '✅' in str(val):
+        return 'background-color: #d4edda; color: #155724; font-weight: bold;'
+    elif '⚠️' in str(val):
+        return 'background-color: #fff3cd; color: #856404; font-weight: bold;'
+    return ''
+
+def маълумотлар_калити(усул):
+    """Киритилган маълумотлар учун контент hash (ўзгаришни аниқлаш учун)"""
+    return content_hash(
+        [x for row in st.session_state.стандарт_маълумотлари for x in row],
+        st.session_state.беморлар_маълумотлари,
+        усул,
+        st.session_state.улчов_бирлиги
+    )
+
+def ташланган_қаторлар(калит, сони=None):
+    """
+    Юклашда ўтказиб юборилган (сон бўлмаган) қаторлар ҳақида огоҳлантириш
+
+    сони берилса rerun'дан кейин кўрсатиш учун сақланади, акс ҳолда
+    сақланган огоҳлантириш бир марта кўрсатилади.
+    """
+    калит = f"{калит}_skipped"
+    if сони is not None:
+        st.session_state[калит] = сони
+    elif st.session_state.get(калит):
+        st.warning(f"⚠️ Сон бўлмаган {st.session_state.pop(калит)} та қатор ўтказиб юборилди")
+
+def сессия_калити():
+    """Омбордаги сессия идентификатори"""
+    if "сессия_id" not in st.session_state:
+        st.session_state.сессия_id = uuid.uuid4().hex[:12]
+    return st.session_state.сессия_id
+
+def олдинги_натижа():
+    """Сессиянинг охирги натижаси (инкрементал янгилаш учун) ёки None"""
+    калит = st.session_state.get("натижа_калити")
+    if not st.session_state.calculated or калит is None:
         return None
+    return омбор.get(сессия_калити(), калит)
 
-# Функцияларни эълон қилиш
-def интерполяция(оптик_зичлик_стандарт, концентрация_стандарт, оптик_зичлик_беморлар, усул='linear'):
+def эгри_чизиқ_реестрданми(натижа_калити=None):
+    """Натижанинг (берилмаса жорийсининг) эгри чизиғи лот реестридан олинганми"""
+    if натижа_калити is None:
+        натижа_калити = st.session_state.get("натижа_калити")
+    return натижа_калити in st.session_state.get("эгри_чизиқ_реестрдан", ())
+
+def эгри_чизиқ_манбаи(натижа_калити, реестрдан):
+    """Натижа эгри чизиғининг манбаини ҳар бир ҳисоблаш йўлида ёзиб қўйиш"""
+    калитлар = set(st.session_state.get("эгри_чизиқ_реестрдан", ()))
+    if реестрдан:
+        калитлар.add(натижа_калити)
+    else:
+        калитлар.discard(натижа_калити)
+    st.session_state.эгри_чизиқ_реестрдан = калитлар
+
+def ҳисоблаш(усул, натижа_калити):
     """
-    Интерполяция функцияси
+    Калибровка ва натижаларни ҳисоблаб, омборга сақлаш
+
+    Стандартлар ва усул ўзгармаган бўлса олдинги натижанинг эгри чизиғи
+    қайта ишлатилади ва фақат ўзгарган беморлар ҳисобланади; акс ҳолда
+    эгри чизиқ бир марта мосланади ва беморлар битта векторли ўтишда.
     """
     try:
-        оптик_зичлик_стандарт = np.array(оптик_зичлик_стандарт, dtype=float)
-        концентрация_стандарт = np.array(концентрация_стандарт, dtype=float)
-        оптик_зичлик_беморлар = np.array(оптик_зичлик_беморлар, dtype=float)
-        
-        # Тартиблаш
-        tartib = np.argsort(оптик_зичлик_стандарт)
-        оптик_зичлик_стандарт = оптик_зичлик_стандарт[tartib]
-        концентрация_стандарт = концентрация_стандарт[tartib]
-        
-        if усул == 'linear':
-            f = interp1d(оптик_зичлик_стандарт, концентрация_стандарт, fill_value="extrapolate")
-        elif усул == 'spline':
-            f = interp1d(оптик_зичлик_стандарт, концентрация_стандарт, kind='cubic', fill_value="extrapolate")
-        elif усул == 'quadratic':
-            f = interp1d(оптик_зичлик_стандарт, концентрация_стандарт, kind='quadratic', fill_value="extrapolate")
-        else:
-            raise ValueError("Номаълум интерполяция усули")
+        # Бир хил маълумот бошқа сессияда ҳисобланган бўлса - қайта ишлатамиз
+        натижа = омбор.get(сессия_калити(), натижа_калити)
+        if натижа is not None:
+            st.session_state.натижа_калити = натижа_калити
+            st.session_state.янгиланиш = (натижа_калити, Update("same"))
+            st.session_state.calculated = True
+            return True
         
-        концентрация_беморлар = f(оптик_зичлик_беморлар)
+        # Маълумотлар
+        оптик_зичлик_стандарт = np.array([x[0] for x in st.session_state.стандарт_маълумотлари], dtype=float)
+        концентрация_стандарт = np.array([x[1] for x in st.session_state.стандарт_маълумотлари], dtype=float)
+        оптик_зичлик_беморлар = np.array(st.session_state.беморлар_маълумотлари, dtype=float)
         
-        # Ҳолатни аниқлаш
-        сақлаш_холати = np.zeros_like(концентрация_беморлар, dtype=int)
-        if len(оптик_зичлик_стандарт) > 0:
-            min_val = оптик_зичлик_стандарт.min()
-            max_val = оптик_зичлик_стандарт.max()
-            сақлаш_холати[оптик_зичлик_беморлар < min_val] = -1
-            сақлаш_холати[оптик_зичлик_беморлар > max_val] = 1
+        олдинги = олдинги_натижа()
+        if curve_reusable(олдинги, оптик_зичлик_стандарт, концентрация_стандарт, усул):
+            # Фақат беморлар (ёки бирлик) ўзгарган - эгри чизиқ манбаи
+            # олдинги натижаникидек
+            натижа, янгиланиш = patch_result(олдинги, оптик_зичлик_беморлар, st.session_state.улчов_бирлиги)
+            реестрдан = эгри_чизиқ_реестрданми()
+        else:
+            # Интерполяция (эгри чизиқ график ва логистик мослаш маълумоти учун ҳам)
+            концентрация_беморлар, сақлаш_холати, эгри_чизиқ, реестрдан = интерполяция(
+                оптик_зичлик_стандарт,
+                концентрация_стандарт,
+                оптик_зичлик_беморлар,
+                усул
+            )
+            натижа = StoredResult.create(
+                оптик_зичлик_стандарт,
+                концентрация_стандарт,
+                оптик_зичлик_беморлар,
+                концентрация_беморлар,
+                сақлаш_холати,
+                st.session_state.улчов_бирлиги,
+                усул,
+                эгри_чизиқ
+            )
+            янгиланиш = Update("curve")
         
-        return концентрация_беморлар, сақлаш_холати
+        # Сақлаш - массивлар бир марта, ихчам кўринишда; статистика ва
+        # натижалар жадвали улардан олинади
+        натижа = омбор.put(сессия_калити(), натижа_калити, натижа)
+        st.session_state.натижа_калити = натижа_калити
+        st.session_state.янгиланиш = (натижа_калити, янгиланиш)
+        эгри_чизиқ_манбаи(натижа_калити, реестрдан)
+        st.session_state.calculated = True
+        return True
         
+    except MemoryBudgetError as e:
+        st.error(f"❌ Хотира чегараси: {e}")
+        return False
     except Exception as e:
-        st.error(f"Интерполяцияда хатолик: {str(e)[:100]}")
-        return np.full_like(оптик_зичлик_беморлар, np.nan), np.zeros_like(оптик_зичлик_беморлар, dtype=int)
+        st.error(f"❌ Ҳисоблашда хатолик: {str(e)[:100]}")
+        return False
 
-def create_calibration_plot(оптик_зичлик_стандарт, концентрация_стандарт, 
-                          оптик_зичлик_беморлар, концентрация_беморлар, 
-                          гормон_номи, улчов_бирлиги, сақлаш_холати):
+def тарихга_ёзиш(натижа, натижа_калити):
     """
-    Interactive Plotly график яратиш
+    Ҳисоблашни тарихга навбатга қўйиш (сессияда бир натижа - бир ёзув)
+
+    Такрорни аниқлаш калитида гормон номи ва лот ҳам бор - улар
+    ҳисоблашдан кейин тузатилса, тарихга тўғри маълумотли янги ёзув тушади.
     """
-    fig = go.Figure()
-    
-    # Калибровка қийшиқ чизиғи
-    if len(оптик_зичлик_стандарт) > 0:
-        fig.add_trace(go.Scatter(
-            x=оптик_зичлик_стандарт,
-            y=концентрация_стандарт,
-            mode='lines+markers',
-            name='Стандартлар',
-            line=dict(color='blue', width=3),
-            marker=dict(size=10, color='blue', symbol='square')
-        ))
-    
-    # Беморлар натижалари
-    colors = ['green', 'red', 'orange']
-    labels = ['Беморлар (нормал)', 'Беморлар (пастки диапазон)', 'Беморлар (юкори диапазон)']
-    
-    for i, (color, label) in enumerate(zip(colors, labels)):
-        mask = сақлаш_холати == (i-1)
-        if np.any(mask):
-            fig.add_trace(go.Scatter(
-                x=оптик_зичлик_беморлар[mask],
-                y=концентрация_беморлар[mask],
-                mode='markers',
-                name=label,
-                marker=dict(size=12, color=color, symbol='circle', 
-                          line=dict(width=2, color='white'))
+    тарих_калити = content_hash(натижа_калити, st.session_state.гормон_номи, st.session_state.лот)
+    if тарих is None or st.session_state.get("тарихдаги_калит") == тарих_калити:
+        return
+    тарих.record(RunRecord.from_result(
+        натижа,
+        st.session_state.гормон_номи,
+        st.session_state.лот,
+        манба=сессия_калити(),
+        натижа_калити=натижа_калити
+    ))
+    st.session_state.тарихдаги_калит = тарих_калити
+
+def жорий_натижа(усул, тарихга=True):
+    """
+    Сессиянинг жорий натижаси (омбордан)
+
+    Маълумотлар ўзгарган бўлса ёки натижа омбордан чиқарилган бўлса (TTL
+    ёки хотира чегараси), у шу ерда қайта ҳисобланади - натижани
+    кўрсатадиган бўлим очилгандагина. тарихга=False - жонли кўриниш
+    учун (таҳрирнинг ҳар бир қадами тарихга ёзилмайди).
+    """
+    if not st.session_state.calculated:
+        return None
+    калит = маълумотлар_калити(усул)
+    натижа = None
+    if st.session_state.get("натижа_калити") == калит:
+        натижа = омбор.get(сессия_калити(), калит)
+    if натижа is None and ҳисоблаш(усул, калит):
+        натижа = омбор.get(сессия_калити(), калит)
+    if натижа is None:
+        st.session_state.calculated = False
+    elif тарихга:
+        тарихга_ёзиш(натижа, калит)
+    return натижа
+
+def жорий_янгиланиш():
+    """Жорий натижа қандай олингани (kalibrovka.incremental.Update) ёки None"""
+    калит, янгиланиш = st.session_state.get("янгиланиш") or (None, None)
+    return янгиланиш if калит == st.session_state.get("натижа_калити") else None
+
+def янгиланиш_матни():
+    """Жорий натижа қандай олинганини тавсифловчи қатор (ёки None)"""
+    янгиланиш = жорий_янгиланиш()
+    if янгиланиш is None:
+        return None
+    if янгиланиш.тур == "rows":
+        return (f"⚡ {янгиланиш.сони} қатор қайта ҳисобланди, эгри чизиқ ўзгармади "
+                f"({янгиланиш.seconds * 1000:.2f} мс)")
+    if янгиланиш.тур == "patients":
+        return "⚡ Беморлар қайта ҳисобланди, эгри чизиқ ўзгармади"
+    if янгиланиш.тур == "curve":
+        return "⚡ Эгри чизиқ қайта мосланди, беморлар қайта ҳисобланди"
+    return None
+
+def жонли_натижа(усул):
+    """
+    Таҳрир пайтида жонли натижа (аввал ҳисобланган бўлса)
+
+    Ҳар бир таҳрирдан кейин натижа инкрементал янгиланади - ҲИСОБЛАШ
+    тугмасини қайта босиш шарт эмас. Қайтаради: натижа ёки None.
+    """
+    натижа = жорий_натижа(усул, тарихга=False)
+    if натижа is None:
+        return None
+    статистика = натижа.статистика
+    матн = (f"Жонли натижа: нормал {статистика['Нормал диапазонда']}, "
+            f"пастки {статистика['Пастки диапазон']}, юкори {статистика['Юкори диапазон']}")
+    изоҳ = янгиланиш_матни()
+    st.caption(f"{матн} · {изоҳ}" if изоҳ else матн)
+    return натижа
+
+def ишонч_оралиғи(натижа):
+    """Ёқилган бўлса натижа учун bootstrap ишонч оралиғи (кэшланган)"""
+    if not st.session_state.ci_ёқилган:
+        return None
+    репликалар = int(st.session_state.ci_репликалар)
+    даража = float(st.session_state.ci_даража)
+    try:
+        # seed белгиланган - бир хил натижа учун оралиқ ҳар доим бир хил
+        return cached_bootstrap_ci(
+            content_hash(st.session_state.натижа_калити, репликалар, даража),
+            натижа.оптик_зичлик_стандарт,
+            натижа.концентрация_стандарт,
+            натижа.оптик_зичлик_беморлар,
+            натижа.усул,
+            replicates=репликалар,
+            level=даража,
+            seed=0
+        )
+    except ValueError as e:
+        st.error(f"❌ Ишонч оралиғи: {e}")
+        return None
+
+def ишонч_устунлари(results_df, ci):
+    """Жадвалга оралиқ чегаралари устунлари ("Ҳолат"дан олдин)"""
+    alpha = (1 - ci.level) / 2 * 100
+    df = results_df.assign(**{
+        f"Концентрация {alpha:g}%": ci.пастки,
+        f"Концентрация {100 - alpha:g}%": ci.юкори,
+    })
+    return df[[c for c in df.columns if c != "Ҳолат"] + ["Ҳолат"]]
+
+def натижаларни_тозалаш():
+    """Сессия натижасини бекор қилиш (омбордаги боғланиш ҳам узилади)"""
+    st.session_state.calculated = False
+    омбор.release(сессия_калити())
+
+def маълумотларни_янгилаш():
+    """Жадвал муҳаррирларини сессиядаги рўйхатлардан қайта бошлаш"""
+    st.session_state.жадвал_версияси = st.session_state.get("жадвал_версияси", 0) + 1
+    st.session_state.стандарт_асос = pd.DataFrame(
+        st.session_state.стандарт_маълумотлари, columns=["Оптик зичлик", "Концентрация"]
+    )
+    st.session_state.беморлар_асос = pd.DataFrame(
+        {"Оптик зичлик": st.session_state.беморлар_маълумотлари}
+    )
+
+# Кўп аналитли пластина (мультиплекс) учун мисол маълумотлари
+МУЛЬТИПЛЕКС_МИСОЛ = {
+    "аналитлар": [
+        {"Аналит": "TSH", "Бирлик": "мкМЕ/мл", "Лот": "", "Усул": "linear"},
+        {"Аналит": "FT4", "Бирлик": "пмоль/л", "Лот": "", "Усул": "linear"},
+        {"Аналит": "FT3", "Бирлик": "пмоль/л", "Лот": "", "Усул": "linear"},
+    ],
+    "стандартлар": [
+        ["TSH", 0.05, 0.0], ["TSH", 0.2, 0.5], ["TSH", 0.6, 2.0], ["TSH", 1.2, 5.0], ["TSH", 2.0, 10.0],
+        ["FT4", 0.1, 2.0], ["FT4", 0.4, 8.0], ["FT4", 0.9, 20.0], ["FT4", 1.5, 40.0], ["FT4", 2.2, 80.0],
+        ["FT3", 0.1, 1.0], ["FT3", 0.5, 3.0], ["FT3", 1.0, 8.0], ["FT3", 1.6, 15.0], ["FT3", 2.1, 30.0],
+    ],
+    "беморлар": [
+        [0.3, 0.8, 0.6], [0.7, 1.1, 0.9], [1.5, 0.5, 1.2],
+        [0.1, 1.8, 0.4], [2.2, 0.9, 1.0], [0.9, 1.3, 2.3],
+    ],
+}
+
+def мультиплекс_номлари():
+    return [a["Аналит"] for a in st.session_state.мультиплекс_аналитлар]
+
+def мультиплексни_янгилаш():
+    """Мультиплекс жадвал муҳаррирларини сессиядаги рўйхатлардан қайта бошлаш"""
+    st.session_state.мультиплекс_версияси = st.session_state.get("мультиплекс_версияси", 0) + 1
+    st.session_state.мультиплекс_аналит_асос = pd.DataFrame(
+        st.session_state.мультиплекс_аналитлар, columns=["Аналит", "Бирлик", "Лот", "Усул"]
+    )
+    st.session_state.мультиплекс_стандарт_асос = pd.DataFrame(
+        st.session_state.мультиплекс_стандартлар, columns=["Аналит", "Оптик зичлик", "Концентрация"]
+    )
+    st.session_state.мультиплекс_бемор_асос = pd.DataFrame(
+        st.session_state.мультиплекс_беморлар, columns=мультиплекс_номлари(), dtype=float
+    )
+
+def мультиплекс_бошлаш(маълумот=МУЛЬТИПЛЕКС_МИСОЛ):
+    """Мультиплекс маълумотларини сессияга ёзиш (натижа бекор қилинади)"""
+    st.session_state.мультиплекс_аналитлар = [dict(a) for a in маълумот["аналитлар"]]
+    st.session_state.мультиплекс_стандартлар = [list(r) for r in маълумот["стандартлар"]]
+    st.session_state.мультиплекс_беморлар = [list(r) for r in маълумот["беморлар"]]
+    st.session_state.мультиплекс_ҳисобланган = False
+    мультиплексни_янгилаш()
+
+def мультиплекс_ҳисоблаш():
+    """
+    Барча аналитларни бир ўтишда ҳисоблаш (омбор орқали)
+
+    Бир хил маълумот учун натижа омбордан олинади; эгри чизиқлар лот
+    реестридан. Қайтаради: MultiplexResult ёки хатоликда None.
+    """
+    try:
+        аналитлар = tuple(
+            Analyte.create(
+                a["Аналит"], a["Бирлик"],
+                [(od, conc) for номи, od, conc in st.session_state.мультиплекс_стандартлар if номи == a["Аналит"]],
+                a["Усул"], a["Лот"]
+            )
+            for a in st.session_state.мультиплекс_аналитлар
+        )
+        беморлар = np.array(st.session_state.мультиплекс_беморлар, dtype=float).reshape(-1, len(аналитлар))
+        калит = content_hash(
+            "multiplex",
+            *(content_hash(a.гормон_номи, a.улчов_бирлиги, a.лот, a.усул, a.стандартлар) for a in аналитлар),
+            беморлар
+        )
+        натижа = омбор.get(сессия_калити(), калит)
+        if натижа is None:
+            натижа = омбор.put(сессия_калити(), калит, evaluate_multiplex(
+                аналитлар,
+                беморлар,
+                fit=lambda a: реестр.get_or_fit(
+                    a.гормон_номи, a.улчов_бирлиги, a.лот, a.оптик, a.концентрация, a.усул
+                )[0]
             ))
+        # Тарихга ҳар бир аналит алоҳида ҳисоблаш бўлиб ёзилади
+        if тарих is not None and st.session_state.get("мультиплекс_тарихдаги") != калит:
+            for i, analyte in enumerate(аналитлар):
+                тарих.record(RunRecord.from_result(
+                    натижа.analyte_result(i),
+                    analyte.гормон_номи,
+                    analyte.лот,
+                    манба=сессия_калити(),
+                    натижа_калити=f"{калит}/{analyte.гормон_номи}"
+                ))
+            st.session_state.мультиплекс_тарихдаги = калит
+        st.session_state.мультиплекс_калити = калит
+        st.session_state.мультиплекс_ҳисобланган = True
+        return натижа
+    except MemoryBudgetError as e:
+        st.error(f"❌ Хотира чегараси: {e}")
+    except Exception as e:
+        st.error(f"❌ Ҳисоблашда хатолик: {str(e)[:100]}")
+    st.session_state.мультиплекс_ҳисобланган = False
+    return None
+
+def конфигурацияни_юклаш():
+    """Экспорт қилинган JSON конфигурацияни сессияга юклаш (файл танланганда)"""
+    файл = st.session_state.get("config_upload")
+    if файл is None:
+        return
+    try:
+        config_data = json.loads(файл.getvalue())
+        if is_multiplex_config(config_data):
+            validate_multiplex_config(config_data)
+        else:
+            validate_config(config_data)
+    except ValueError as e:
+        st.session_state.юклаш_хабари = ("error", f"❌ {файл.name}: {str(e)[:150]}")
+        return
     
-    # Диапазон чизиқлари
-    if len(оптик_зичлик_стандарт) > 0:
-        fig.add_vline(x=min(оптик_зичлик_стандарт), line_dash="dash", 
-                     line_color="red", opacity=0.5, annotation_text="Минимал диапазон")
-        fig.add_vline(x=max(оптик_зичлик_стандарт), line_dash="dash", 
-                     line_color="red", opacity=0.5, annotation_text="Максимал диапазон")
+    if is_multiplex_config(config_data):
+        мультиплекс_бошлаш({
+            "аналитлар": [
+                {"Аналит": a["гормон_номи"].strip(), "Бирлик": a.get("улчов_бирлиги") or "",
+                 "Лот": a.get("лот") or "", "Усул": a.get("интерполяция_усули", "linear")}
+                for a in config_data["аналитлар"]
+            ],
+            "стандартлар": [
+                [a["гормон_номи"].strip(), float(od), float(conc)]
+                for a in config_data["аналитлар"] for od, conc in a["стандартлар"]
+            ],
+            "беморлар": config_data["беморлар"],
+        })
+        if LAZY_TABS:
+            st.session_state.active_tab = "🧬 Мультиплекс"
+        st.session_state.юклаш_хабари = (
+            "success",
+            f"✅ {файл.name}: {len(config_data['аналитлар'])} аналит, {len(config_data['беморлар'])} бемор"
+        )
+        return
     
-    fig.update_layout(
-        title=f'{гормон_номи} калибровка қийшиқ чизиғи',
-        xaxis_title='Оптик зичлик',
-        yaxis_title=f'Концентрация ({улчов_бирлиги})',
-        height=600,
-        hovermode='x unified',
-        template='plotly_white',
-        plot_bgcolor='rgba(240,242,246,0.8)',
-        paper_bgcolor='rgba(255,255,255,0.9)',
-        font=dict(size=14)
+    st.session_state.гормон_номи = config_data.get("гормон_номи") or ""
+    st.session_state.улчов_бирлиги = config_data.get("улчов_бирлиги") or ""
+    st.session_state.лот = config_data.get("лот") or ""
+    # Матн майдонлари янги қийматдан қайта бошланади
+    for калит in ("hormon_name_input", "unit_input", "lot_input"):
+        st.session_state.pop(калит, None)
+    st.session_state.interpolation_method = config_data.get("интерполяция_усули", "linear")
+    st.session_state.стандарт_маълумотлари = [[float(od), float(conc)] for od, conc in config_data["стандартлар"]]
+    st.session_state.беморлар_маълумотлари = [float(od) for od in config_data["беморлар"]]
+    натижаларни_тозалаш()
+    маълумотларни_янгилаш()
+    st.session_state.юклаш_хабари = (
+        "success",
+        f"✅ {файл.name}: {len(config_data['стандартлар'])} стандарт, {len(config_data['беморлар'])} бемор"
     )
-    
-    return fig
 
 # Сессия стейтини инициализация қилиш
 if 'initialized' not in st.session_state:
     st.session_state.initialized = True
     st.session_state.гормон_номи = "TSH"
     st.session_state.улчов_бирлиги = "мкМЕ/мл"
+    st.session_state.лот = ""
+    st.session_state.ci_ёқилган = False
+    st.session_state.ci_репликалар = DEFAULT_REPLICATES
+    st.session_state.ci_даража = DEFAULT_LEVEL
     st.session_state.стандарт_маълумотлари = [[0.1, 1.0], [0.2, 2.0], [0.3, 3.0], [0.4, 4.0], [0.5, 5.0]]
     st.session_state.беморлар_маълумотлари = [0.15, 0.25, 0.35, 0.45, 0.55, 0.65, 0.75, 0.85, 0.95, 1.05]
     st.session_state.calculated = False
-    st.session_state.results_df = None
-    st.session_state.статистика = {}
+    маълумотларни_янгилаш()
+
+if 'мультиплекс_аналитлар' not in st.session_state:
+    мультиплекс_бошлаш()
 
 # САҲИФАНИ ТЕКШИРИШ
 st.markdown('<h1 class="main-header">🧪 ГОРМОН КАЛИБРОВКА ТИЗИМИ</h1>', unsafe_allow_html=True)
@@ -320,7 +631,7 @@ with st.sidebar:
     
     усул = st.selectbox(
         "Интерполяция усули",
-        ["linear", "spline", "quadratic"],
+        list(УСУЛЛАР),
         index=0,
         key="interpolation_method"
     )
@@ -346,8 +657,8 @@ with st.sidebar:
         st.session_state.улчов_бирлиги = "мкМЕ/мл"
         st.session_state.стандарт_маълумотлари = [[0.1, 1.0], [0.2, 2.0], [0.3, 3.0], [0.4, 4.0], [0.5, 5.0]]
         st.session_state.беморлар_маълумотлари = [0.15, 0.25, 0.35, 0.45, 0.55, 0.65, 0.75, 0.85, 0.95, 1.05]
-        st.session_state.calculated = False
-        st.session_state.results_df = None
+        натижаларни_тозалаш()
+        маълумотларни_янгилаш()
         
         # Rerun логикаси
         if use_rerun:
@@ -360,8 +671,8 @@ with st.sidebar:
                 key="clear_all_data"):
         st.session_state.стандарт_маълумотлари = [[0.1, 1.0], [0.2, 2.0], [0.3, 3.0]]
         st.session_state.беморлар_маълумотлари = [0.15, 0.25, 0.35]
-        st.session_state.calculated = False
-        st.session_state.results_df = None
+        натижаларни_тозалаш()
+        маълумотларни_янгилаш()
         
         # Rerun логикаси
         if use_rerun:
@@ -369,398 +680,859 @@ with st.sidebar:
         else:
             st.experimental_rerun()
     
-    # Excel ўрнатиш
+    # Экспорт қилинган конфигурацияни қайта юклаш
+    st.file_uploader(
+        "⚙️ Конфигурация юклаш (JSON)",
+        type=["json"],
+        key="config_upload",
+        on_change=конфигурацияни_юклаш,
+        help="Экспорт бўлимидаги JSON. Кўп файлни бирдан: python -m kalibrovka reprocess <каталог ёки zip>"
+    )
+    хабар = st.session_state.get("юклаш_хабари")
+    if хабар is not None:
+        (st.success if хабар[0] == "success" else st.error)(хабар[1])
+    
+    # Экспорт форматлари
     st.markdown("---")
-    if st.button("📦 Excel ўрнатиш (xlsxwriter)", 
-                use_container_width=True,
-                key="install_xlsxwriter"):
-        with st.spinner("xlsxwriter ўрнатилмоқда..."):
-            if install_xlsxwriter():
-                st.success("✅ xlsxwriter ўрнатилди!")
-                # Фойдаланувчига янгилаш кераклигини айтиш
-                st.info("Илтимос, саҳифани қўлда янгиланг (F5 ёки браузернинг 'Refresh' тугмаси)")
-            else:
-                st.error("❌ xlsxwriter ўрнатишда хатолик")
+    st.caption("Экспорт: " + ", ".join(
+        f"{формат} ({номи})" for формат, номи in экспорт_форматлари.items()
+    ))
 
 # Основной интерфейс
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Стандартлар", "👥 Беморлар", "📈 Натижалар", "💾 Экспорт"])
+# Streamlit'нинг янги версияларида бўлимлар ҳолатни кузатади: фақат очиқ
+# бўлим ишлайди (тугма, жадвал, график, экспорт). Эски версияларда
+# ҳаммаси аввалгидек чизилади.
+if LAZY_TABS:
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["📊 Стандартлар", "👥 Беморлар", "📈 Натижалар", "💾 Экспорт", "🧬 Мультиплекс"],
+        key="active_tab",
+        on_change="rerun"
+    )
+else:
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["📊 Стандартлар", "👥 Беморлар", "📈 Натижалар", "💾 Экспорт", "🧬 Мультиплекс"]
+    )
 
-with tab1:
-    st.markdown('<h3 class="sub-header">Стандарт маълумотлари</h3>', unsafe_allow_html=True)
-    
-    st.markdown('<div class="info-box">Стандарт маълумотлари - гормон калибровкаси учун асосий маълумотлар</div>', unsafe_allow_html=True)
-    
-    col1, col2, col3 = st.columns([2, 2, 1])
-    
-    with col1:
-        гормон_номи = st.text_input("Гормон номи", 
-                                   value=st.session_state.гормон_номи,
-                                   key="hormon_name_input")
-        st.session_state.гормон_номи = гормон_номи
-        
-    with col2:
-        улчов_бирлиги = st.text_input("Ўлчов бирлиги", 
-                                     value=st.session_state.улчов_бирлиги,
-                                     key="unit_input")
-        st.session_state.улчов_бирлиги = улчов_бирлиги
-    
-    with col3:
-        if st.button("♻️ Тозалаш", 
-                    use_container_width=True,
-                    key="clear_standards_only"):
-            st.session_state.стандарт_маълумотлари = [[0.1, 1.0], [0.2, 2.0], [0.3, 3.0]]
-            # Rerun логикаси
-            if use_rerun:
-                st_rerun()
-            else:
-                st.experimental_rerun()
-    
-    стандартлар_сони = st.number_input("Стандартлар сони", 
-                                       min_value=3, 
-                                       max_value=10, 
-                                       value=5, 
-                                       key="стандарт_сони_input")
-    
-    # Стандарт маълумотларини киритиш
-    st.markdown("### Оптик зичлик ва концентрация киритиш:")
-    
-    # Текшириш ва тузатиш
-    current_standard_data = st.session_state.стандарт_маълумотлари.copy()
-    if len(current_standard_data) < стандартлар_сони:
-        for i in range(len(current_standard_data), стандартлар_сони):
-            current_standard_data.append([0.1 * (i+1), 1.0 * (i+1)])
-    elif len(current_standard_data) > стандартлар_сони:
-        current_standard_data = current_standard_data[:стандартлар_сони]
-    
-    new_standard_data = []
-    for i in range(стандартлар_сони):
-        cols = st.columns(2)
+def бўлим_очиқ(tab):
+    """Бўлим кўринаяптими (ҳолат кузатилмаса - доим True)"""
+    return getattr(tab, "open", None) is not False
+
+def бўлим_босқичи(tab, номи):
+    """Очиқ бўлим иши учун ўлчов (ёпиқ бўлимлар ўлчанмайди)"""
+    return stage(номи) if бўлим_очиқ(tab) else nullcontext()
+
+with tab1, бўлим_босқичи(tab1, "tab_standards"):
+    if бўлим_очиқ(tab1):
+        st.markdown('<h3 class="sub-header">Стандарт маълумотлари</h3>', unsafe_allow_html=True)
         
-        with cols[0]:
-            if i < len(current_standard_data):
-                default_opt = float(current_standard_data[i][0])
-            else:
-                default_opt = 0.1 * (i+1)
-            
-            оптик = st.number_input(
-                f"Оптик зичлик {i+1}", 
-                value=default_opt, 
-                min_value=0.0,
-                max_value=10.0,
-                step=0.01,
-                key=f"opt_input_{i}"
-            )
+        st.markdown('<div class="info-box">Стандарт маълумотлари - гормон калибровкаси учун асосий маълумотлар</div>', unsafe_allow_html=True)
         
-        with cols[1]:
-            if i < len(current_standard_data):
-                default_conc = float(current_standard_data[i][1])
-            else:
-                default_conc = 1.0 * (i+1)
-            
-            концентрация = st.number_input(
-                f"Концентрация {i+1}", 
-                value=default_conc, 
-                min_value=0.0,
-                max_value=1000.0,
-                step=0.1,
-                key=f"conc_input_{i}"
-            )
+        col1, col2, col4, col3 = st.columns([2, 2, 2, 1])
         
-        new_standard_data.append([оптик, концентрация])
-    
-    # Сақлаш
-    st.session_state.стандарт_маълумотлари = new_standard_data
-    
-    # Таблица
-    st.markdown("### Стандартлар жадвали:")
-    стандарт_df = pd.DataFrame(
-        new_standard_data, 
-        columns=["Оптик зичлик", f"Концентрация ({улчов_бирлиги})"]
-    )
-    
-    st.dataframe(стандарт_df.style.format({
-        "Оптик зичлик": "{:.3f}", 
-        f"Концентрация ({улчов_бирлиги})": "{:.3f}"
-    }), use_container_width=True)
+        with col1:
+            гормон_номи = st.text_input("Гормон номи", 
+                                       value=st.session_state.гормон_номи,
+                                       key="hormon_name_input")
+            st.session_state.гормон_номи = гормон_номи
+            
+        with col2:
+            улчов_бирлиги = st.text_input("Ўлчов бирлиги", 
+                                         value=st.session_state.улчов_бирлиги,
+                                         key="unit_input")
+            st.session_state.улчов_бирлиги = улчов_бирлиги
+        
+        with col4:
+            лот = st.text_input("Лот рақами",
+                                value=st.session_state.лот,
+                                key="lot_input",
+                                help="Бир хил лот ва стандартлар учун эгри чизиқ қайта мосланмайди")
+            st.session_state.лот = лот
+        
+        with col3:
+            if st.button("♻️ Тозалаш", 
+                        use_container_width=True,
+                        key="clear_standards_only"):
+                st.session_state.стандарт_маълумотлари = [[0.1, 1.0], [0.2, 2.0], [0.3, 3.0]]
+                маълумотларни_янгилаш()
+                # Rerun логикаси
+                if use_rerun:
+                    st_rerun()
+                else:
+                    st.experimental_rerun()
+        
+        # Стандарт маълумотларини киритиш
+        st.markdown("### Оптик зичлик ва концентрация киритиш:")
+        
+        # Битта жадвал - ҳар бир катак учун алоҳида виджет эмас
+        стандарт_df = st.data_editor(
+            st.session_state.стандарт_асос,
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Оптик зичлик": st.column_config.NumberColumn(
+                    "Оптик зичлик", min_value=0.0, max_value=10.0, step=0.01, format="%.3f"
+                ),
+                "Концентрация": st.column_config.NumberColumn(
+                    f"Концентрация ({улчов_бирлиги})", min_value=0.0, max_value=1000.0, step=0.1, format="%.3f"
+                ),
+            },
+            key=f"standards_editor_{st.session_state.жадвал_версияси}"
+        )
+        
+        # Сақлаш
+        st.session_state.стандарт_маълумотлари = стандарт_df.dropna().values.tolist()
+        
+        if len(st.session_state.стандарт_маълумотлари) < 3:
+            st.warning("⚠️ Камида 3 та стандарт киритинг")
+        
+        # Аввал ҳисобланган бўлса - эгри чизиқ шу ерда қайта мосланади
+        жонли_натижа(усул)
+        
+        # Нусхалаш ёки файлдан юклаш
+        ташланган_қаторлар("standards_load")
+        with st.expander("📋 Нусхалаш ёки файлдан юклаш"):
+            стандарт_матн = st.text_area(
+                "Икки устун: оптик зичлик ва концентрация (Excel'дан нусхалаш мумкин)",
+                key="standards_paste"
+            )
+            стандарт_файл = st.file_uploader("CSV/TXT файл", type=["csv", "txt"], key="standards_file")
+            
+            if st.button("📥 Юклаш", key="standards_load"):
+                маълумот, ташланган = parse_columns_report(
+                    стандарт_файл.getvalue() if стандарт_файл else стандарт_матн,
+                    2,
+                    ["Оптик зичлик", "Концентрация"]
+                )
+                if len(маълумот) >= 2:
+                    st.session_state.стандарт_маълумотлари = маълумот.tolist()
+                    ташланган_қаторлар("standards_load", ташланган)
+                    маълумотларни_янгилаш()
+                    # Rerun логикаси
+                    if use_rerun:
+                        st_rerun()
+                    else:
+                        st.experimental_rerun()
+                else:
+                    st.warning("⚠️ Стандартлар топилмади")
 
-with tab2:
-    st.markdown('<h3 class="sub-header">Беморлар маълумотлари</h3>', unsafe_allow_html=True)
-    
-    st.markdown('<div class="info-box">Беморларнинг оптик зичликларини киритинг</div>', unsafe_allow_html=True)
-    
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        беморлар_сони = st.number_input("Беморлар сони", 
-                                       min_value=1, 
-                                       max_value=50, 
-                                       value=10, 
-                                       key="бемор_сони_input")
-    
-    with col2:
+with tab2, бўлим_босқичи(tab2, "tab_patients"):
+    if бўлим_очиқ(tab2):
+        st.markdown('<h3 class="sub-header">Беморлар маълумотлари</h3>', unsafe_allow_html=True)
+        
+        st.markdown('<div class="info-box">Беморларнинг оптик зичликларини киритинг</div>', unsafe_allow_html=True)
+        
         if st.button("🗑️ Тозалаш", 
-                    use_container_width=True,
                     key="clear_patients_only"):
             st.session_state.беморлар_маълумотлари = [0.15, 0.25, 0.35]
+            маълумотларни_янгилаш()
             # Rerun логикаси
             if use_rerun:
                 st_rerun()
             else:
                 st.experimental_rerun()
-    
-    # Бемор маълумотларини киритиш
-    st.markdown("### Беморлар оптик зичликлари:")
-    
-    # Текшириш ва тузатиш
-    current_patient_data = st.session_state.беморлар_маълумотлари.copy()
-    if len(current_patient_data) < беморлар_сони:
-        for i in range(len(current_patient_data), беморлар_сони):
-            current_patient_data.append(0.5 + (i * 0.05))
-    elif len(current_patient_data) > беморлар_сони:
-        current_patient_data = current_patient_data[:беморлар_сони]
-    
-    patient_data = []
-    for i in range(беморлар_сони):
-        cols = st.columns([1, 3])
         
-        with cols[0]:
-            st.markdown(f"**Бемор {i+1}**")
+        # Бемор маълумотларини киритиш
+        st.markdown("### Беморлар оптик зичликлари:")
         
-        with cols[1]:
-            if i < len(current_patient_data):
-                default_value = float(current_patient_data[i])
-            else:
-                default_value = 0.5 + (i * 0.05)
-            
-            оптик = st.number_input(
-                f"Оптик зичлик {i+1}",
-                value=default_value,
-                min_value=0.0,
-                max_value=10.0,
-                step=0.001,
-                format="%.4f",
-                key=f"patient_opt_input_{i}",
-                label_visibility="collapsed"
+        беморлар_df = st.data_editor(
+            st.session_state.беморлар_асос,
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Оптик зичлик": st.column_config.NumberColumn(
+                    "Оптик зичлик", min_value=0.0, max_value=10.0, step=0.001, format="%.4f"
+                ),
+            },
+            key=f"patients_editor_{st.session_state.жадвал_версияси}"
+        )
+        
+        # Сақлаш
+        st.session_state.беморлар_маълумотлари = беморлар_df["Оптик зичлик"].dropna().tolist()
+        st.caption(f"Беморлар сони: {len(st.session_state.беморлар_маълумотлари)}")
+        
+        # Жонли натижа: ўзгарган қаторлар олдинги эгри чизиқ орқали ҳисобланади
+        натижа = жонли_натижа(усул)
+        янгиланиш = жорий_янгиланиш()
+        if натижа is not None and янгиланиш is not None and янгиланиш.тур == "rows" and янгиланиш.сони:
+            ўзгарганлар = натижа.results_df.iloc[янгиланиш.қаторлар[-ЖОНЛИ_ҚАТОРЛАР:]]
+            st.dataframe(style_results(ўзгарганлар).map(color_status, subset=['Ҳолат']),
+                         use_container_width=True, hide_index=True)
+        
+        # Нусхалаш ёки файлдан юклаш
+        ташланган_қаторлар("patients_load")
+        with st.expander("📋 Нусхалаш ёки файлдан юклаш"):
+            беморлар_матн = st.text_area(
+                "Оптик зичликлар устуни (Excel'дан нусхалаш мумкин)",
+                key="patients_paste"
             )
+            беморлар_файл = st.file_uploader("CSV/TXT файл", type=["csv", "txt"], key="patients_file")
+            
+            if st.button("📥 Юклаш", key="patients_load"):
+                маълумот, ташланган = parse_columns_report(
+                    беморлар_файл.getvalue() if беморлар_файл else беморлар_матн,
+                    1,
+                    ["Оптик зичлик"]
+                )
+                if len(маълумот) > 0:
+                    st.session_state.беморлар_маълумотлари = маълумот[:, 0].tolist()
+                    ташланган_қаторлар("patients_load", ташланган)
+                    маълумотларни_янгилаш()
+                    # Rerun логикаси
+                    if use_rerun:
+                        st_rerun()
+                    else:
+                        st.experimental_rerun()
+                else:
+                    st.warning("⚠️ Оптик зичликлар топилмади")
+
+with tab3, бўлим_босқичи(tab3, "tab_results"):
+    if бўлим_очиқ(tab3):
+        st.markdown('<h3 class="sub-header">Ҳисоблаш натижалари</h3>', unsafe_allow_html=True)
         
-        patient_data.append([i+1, оптик])
-    
-    # Сақлаш
-    st.session_state.беморлар_маълумотлари = [data[1] for data in patient_data]
-    
-    # Таблица
-    if patient_data:
-        st.markdown("### Беморлар жадвали:")
-        беморлар_df = pd.DataFrame(patient_data, columns=["Бемор №", "Оптик зичлик"])
+        натижа_калити = маълумотлар_калити(усул)
+        
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            if st.button("🎯 ҲИСОБЛАШ", 
+                        type="primary", 
+                        use_container_width=True,
+                        key="calculate_button"):
+                with st.spinner("Ҳисоблаш жараёнида..."):
+                    if ҳисоблаш(усул, натижа_калити):
+                        st.success("✅ Ҳисоблаш муваффақиятли тугади!")
         
-        st.dataframe(беморлар_df.style.format({
-            "Оптик зичлик": "{:.4f}"
-        }), use_container_width=True)
+        with col2:
+            if st.button("🗑️ Тозалаш", 
+                        use_container_width=True,
+                        key="clear_results"):
+                натижаларни_тозалаш()
+                # Rerun логикаси
+                if use_rerun:
+                    st_rerun()
+                else:
+                    st.experimental_rerun()
+        
+        # Натижаларни кўрсатиш
+        натижа = жорий_натижа(усул)
+        if натижа is not None:
+            results_df = натижа.results_df
+            
+            st.markdown('<div class="success-box">✅ Ҳисоблаш муваффақиятли амалга оширилди!</div>', unsafe_allow_html=True)
+            
+            # Таблица
+            st.markdown("### Беморлар натижалари:")
+            
+            # Саралаш - жадвалда сонлар ва категориялар, шунинг учун тез
+            with st.expander("🔎 Саралаш"):
+                f_col1, f_col2, f_col3 = st.columns([2, 1, 1])
+                with f_col1:
+                    танланган_ҳолатлар = st.multiselect(
+                        "Ҳолат",
+                        list(results_df["Ҳолат"].cat.categories),
+                        key="filter_status"
+                    )
+                with f_col2:
+                    min_концентрация = st.number_input("Концентрация ≥", value=None, key="filter_min")
+                with f_col3:
+                    max_концентрация = st.number_input("Концентрация ≤", value=None, key="filter_max")
+            
+            # Ишонч оралиғи - стандартлар B марта ғалаёнлантирилиб қайта мосланади
+            with st.expander("📏 Ишонч оралиғи (bootstrap)", expanded=st.session_state.ci_ёқилган):
+                ci_col1, ci_col2, ci_col3 = st.columns([1, 1, 1])
+                with ci_col1:
+                    st.session_state.ci_ёқилган = st.checkbox(
+                        "Ҳисоблаш",
+                        value=st.session_state.ci_ёқилган,
+                        key="ci_input"
+                    )
+                with ci_col2:
+                    st.session_state.ci_репликалар = st.number_input(
+                        "Репликалар",
+                        min_value=100,
+                        max_value=20000,
+                        value=st.session_state.ci_репликалар,
+                        step=100,
+                        key="ci_replicates_input"
+                    )
+                with ci_col3:
+                    даражалар = [0.90, 0.95, 0.99]
+                    st.session_state.ci_даража = st.selectbox(
+                        "Ишонч даражаси",
+                        даражалар,
+                        index=даражалар.index(st.session_state.ci_даража),
+                        format_func=lambda v: f"{v:.0%}",
+                        key="ci_level_input"
+                    )
+            
+            ci = ишонч_оралиғи(натижа)
+            if ci is not None:
+                results_df = ишонч_устунлари(results_df, ci)
+                ci_матн = f"📏 {ci.level:.0%} ишонч оралиғи: {ci.replicates} реплика ({ci.шовқин}), {ci.seconds * 1000:.0f} мс"
+                тўлиқ_эмас = int(np.sum(ci.valid < 1))
+                if тўлиқ_эмас:
+                    ci_матн += f" · {тўлиқ_эмас} беморда баъзи репликалар ҳисобланмади"
+                st.caption(ci_матн)
+            
+            кўрсатиладиган_df = filter_results(
+                results_df,
+                танланган_ҳолатлар or None,
+                min_концентрация,
+                max_концентрация
+            )
+            if len(кўрсатиладиган_df) != len(results_df):
+                st.caption(f"Кўрсатилмоқда: {len(кўрсатиладиган_df)} / {len(results_df)}")
+            
+            # .applymap() ўрнига .map() ишлатилди; концентрация формати фақат
+            # экранда берилади - жадвалдаги қийматлар сонлигича қолади
+            styled_df = style_results(кўрсатиладиган_df).map(color_status, subset=['Ҳолат'])
+            st.dataframe(styled_df, use_container_width=True)
+            
+            # График
+            st.markdown("### Калибровка графиги:")
+            # График натижа hash'и бўйича кэшланади; кўп нуқтада WebGL
+            fig = cached_calibration_plot(
+                content_hash(st.session_state.натижа_калити, st.session_state.гормон_номи),
+                натижа.оптик_зичлик_стандарт,
+                натижа.концентрация_стандарт,
+                натижа.оптик_зичлик_беморлар,
+                натижа.концентрация_беморлар,
+                st.session_state.гормон_номи,
+                st.session_state.улчов_бирлиги,
+                натижа.сақлаш_холати,
+                curve=натижа.эгри_чизиқ
+            )
+            with stage("plot_render"):
+                st.plotly_chart(fig, use_container_width=True)
+            
+            if эгри_чизиқ_реестрданми():
+                st.caption("♻️ Эгри чизиқ реестрдан олинди (қайта мосланмади)")
+            if янгиланиш_матни():
+                st.caption(янгиланиш_матни())
+            
+            мослаш_маълумоти = натижа.мослаш_маълумоти
+            if мослаш_маълумоти is not None:
+                st.caption(
+                    f"Мослаш: {мослаш_маълумоти.iterations} итерация, "
+                    f"{мослаш_маълумоти.seconds * 1000:.1f} мс"
+                    + ("" if мослаш_маълумоти.converged
+                       else " ⚠️ тўхтаб қолди" if мослаш_маълумоти.stalled
+                       else " ⚠️ яқинлашмади")
+                )
+            
+            # Статистика
+            st.markdown('<h4>📊 Статистика</h4>', unsafe_allow_html=True)
+            
+            stat_items = list(натижа.статистика.items())
+            cols = st.columns(min(4, len(stat_items)))
+            
+            for idx, (key, value) in enumerate(stat_items):
+                col_idx = idx % len(cols)
+                with cols[col_idx]:
+                    st.metric(label=key, value=value)
+        else:
+            st.markdown('<div class="warning-box">ℹ️ Ҳисоблаш учун "🎯 ҲИСОБЛАШ" тугмасини босинг.</div>', unsafe_allow_html=True)
 
-with tab3:
-    st.markdown('<h3 class="sub-header">Ҳисоблаш натижалари</h3>', unsafe_allow_html=True)
-    
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        if st.button("🎯 ҲИСОБЛАШ", 
-                    type="primary", 
+with tab4, бўлим_босқичи(tab4, "tab_export"):
+    if бўлим_очиқ(tab4):
+        st.markdown('<h3 class="sub-header">Экспорт ва сақлаш</h3>', unsafe_allow_html=True)
+        
+        натижа = жорий_натижа(усул)
+        if натижа is not None:
+            # Натижаларни юклаб олиш
+            st.markdown("### 📥 Натижаларни юклаб олиш")
+            
+            # Файллар шу натижалар учун бир марта қурилади
+            results_df = натижа.results_df
+            статистика = натижа.статистика
+            гормон_номи = st.session_state.гормон_номи
+            ci = ишонч_оралиғи(натижа)
+            if ci is not None:
+                results_df = ишонч_устунлари(results_df, ci)
+            экспорт_калити = content_hash(
+                st.session_state.натижа_калити, гормон_номи, st.session_state.лот,
+                ci and content_hash(ci.replicates, ci.level)
+            )
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                # CSV формати
+                csv_backend = get_backend("csv")
+                csv = экспорт_маълумоти(
+                    экспорт_калити, "csv",
+                    lambda: csv_backend.write(results_df, статистика, гормон_номи)
+                )
+                st.download_button(
+                    label="📄 CSV форматида",
+                    data=csv,
+                    file_name=f"{st.session_state.гормон_номи}_натижалари.csv",
+                    mime="text/csv",
                     use_container_width=True,
-                    key="calculate_button"):
-            with st.spinner("Ҳисоблаш жараёнида..."):
-                try:
-                    # Маълумотлар
-                    оптик_зичлик_стандарт = np.array([x[0] for x in st.session_state.стандарт_маълумотлари])
-                    концентрация_стандарт = np.array([x[1] for x in st.session_state.стандарт_маълумотлари])
-                    оптик_зичлик_беморлар = np.array(st.session_state.беморлар_маълумотлари[:беморлар_сони])
-                    
-                    # Интерполяция
-                    концентрация_беморлар, сақлаш_холати = интерполяция(
-                        оптик_зичлик_стандарт,
-                        концентрация_стандарт,
-                        оптик_зичлик_беморлар,
-                        усул
+                    key="download_csv"
+                )
+            
+            with col2:
+                # Excel формати
+                excel_backend = get_backend("xlsx")
+                if excel_backend is not None:
+                    excel_data = экспорт_маълумоти(
+                        экспорт_калити, "xlsx",
+                        lambda: excel_backend.write(results_df, статистика, гормон_номи)
                     )
-                    
-                    # Статистика
-                    статистика = {
-                        "Жами беморлар": len(концентрация_беморлар),
-                        "Нормал диапазонда": int(np.sum(сақлаш_холати == 0)),
-                        "Пастки диапазон": int(np.sum(сақлаш_холати == -1)),
-                        "Юкори диапазон": int(np.sum(сақлаш_холати == 1)),
-                    }
-                    
-                    # Натижалар
-                    results_data = []
-                    for i in range(len(концентрация_беморлар)):
-                        if сақлаш_холати[i] == 0:
-                            status = "✅ Нормал"
-                        elif сақлаш_холати[i] == -1:
-                            status = "⚠️ Пастки"
-                        else:
-                            status = "⚠️ Юкори"
-                        
-                        conc_value = концентрация_беморлар[i]
-                        if np.isnan(conc_value):
-                            conc_text = "N/A"
-                        else:
-                            conc_text = f"{conc_value:.4f}"
-                        
-                        results_data.append([
-                            i+1,
-                            оптик_зичлик_беморлар[i],
-                            conc_text,
-                            status
-                        ])
-                    
-                    results_df = pd.DataFrame(
-                        results_data,
-                        columns=["Бемор №", "Оптик зичлик", f"Концентрация ({st.session_state.улчов_бирлиги})", "Ҳолат"]
+                    st.download_button(
+                        label="📊 Excel форматида",
+                        data=excel_data,
+                        file_name=f"{st.session_state.гормон_номи}_натижалари.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        use_container_width=True,
+                        key="download_excel"
                     )
-                    
-                    # Сақлаш
-                    st.session_state.results_df = results_df
-                    st.session_state.статистика = статистика
-                    st.session_state.концентрация_беморлар = концентрация_беморлар
-                    st.session_state.сақлаш_холати = сақлаш_холати
-                    st.session_state.оптик_зичлик_стандарт = оптик_зичлик_стандарт
-                    st.session_state.концентрация_стандарт = концентрация_стандарт
-                    st.session_state.оптик_зичлик_беморлар = оптик_зичлик_беморлар
-                    st.session_state.calculated = True
-                    
-                    st.success("✅ Ҳисоблаш муваффақиятли тугади!")
-                    
-                except Exception as e:
-                    st.error(f"❌ Ҳисоблашда хатолик: {str(e)[:100]}")
-    
-    with col2:
-        if st.button("🗑️ Тозалаш", 
+                else:
+                    st.info("Excel экспорт мавжуд эмас (xlsxwriter ёки openpyxl ўрнатилмаган) - CSV форматида юклаб олинг")
+            
+            with col3:
+                # JSON конфигурация
+                config_data = build_config(
+                    st.session_state.гормон_номи,
+                    st.session_state.улчов_бирлиги,
+                    st.session_state.стандарт_маълумотлари,
+                    st.session_state.беморлар_маълумотлари,
+                    усул,
+                    лот=st.session_state.лот
+                )
+                
+                config_json = экспорт_маълумоти(экспорт_калити, "json", lambda: config_to_json(config_data))
+                
+                st.download_button(
+                    label="⚙️ JSON конфигурация",
+                    data=config_json,
+                    file_name=f"{st.session_state.гормон_номи}_конфигурация.json",
+                    mime="application/json",
                     use_container_width=True,
-                    key="clear_results"):
-            st.session_state.calculated = False
-            st.session_state.results_df = None
+                    key="download_config"
+                )
+            
+            # Бинар архив - ҳисобланган массивлар форматланмасдан сақланади
+            archive_data = экспорт_маълумоти(
+                экспорт_калити, "kres",
+                lambda: archive_bytes([{
+                    "гормон_номи": гормон_номи,
+                    "улчов_бирлиги": st.session_state.улчов_бирлиги,
+                    "лот": st.session_state.лот,
+                    "усул": усул,
+                    "стандартлар": st.session_state.стандарт_маълумотлари,
+                    "оптик_зичлик": натижа.оптик_зичлик_беморлар,
+                    "концентрация": натижа.концентрация_беморлар,
+                    "сақлаш_холати": натижа.сақлаш_холати,
+                }])
+            )
+            st.download_button(
+                label="📦 Бинар архив (.kres)",
+                data=archive_data,
+                file_name=f"{st.session_state.гормон_номи}_натижалари.kres",
+                mime="application/octet-stream",
+                key="download_archive",
+                help="Катта натижалар учун ихчам формат: kalibrovka.load_archive() билан дарҳол очилади"
+            )
+            
+            # Натижаларни кўриш
+            st.markdown("### 👁️ Натижаларни кўриш")
+            st.dataframe(style_results(results_df), use_container_width=True)
+            
+        else:
+            st.markdown('<div class="warning-box">ℹ️ Аввало ҳисоблаш амалиётини бажаринг.</div>', unsafe_allow_html=True)
+        
+        # Ўтган ҳисоблашлар (индексланган сўров, миллисекундлар)
+        if тарих is not None:
+            with st.expander("🗂️ Ҳисоблашлар тарихи"):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    тарих_гормон = st.text_input("Гормон", value=st.session_state.гормон_номи, key="history_hormone")
+                with col2:
+                    тарих_кунлар = st.number_input("Охирги кунлар", min_value=1, value=30, step=1, key="history_days")
+                with col3:
+                    тарих_юкори = st.number_input("Юкори, % дан кам эмас", min_value=0.0, max_value=100.0,
+                                                  value=0.0, step=5.0, key="history_high")
+                ҳисоблашлар = тарих.runs(
+                    гормон_номи=тарих_гормон or None,
+                    since=time.time() - тарих_кунлар * 86400,
+                    min_high=тарих_юкори / 100 if тарих_юкори else None
+                )
+                if ҳисоблашлар:
+                    тарих_df = pd.DataFrame(ҳисоблашлар)
+                    st.dataframe(
+                        pd.DataFrame({
+                            "Вақт": тарих_df["created"].map(
+                                lambda t: time.strftime("%Y-%m-%d %H:%M", time.localtime(t))
+                            ),
+                            "Гормон": тарих_df["hormone"],
+                            "Лот": тарих_df["lot"],
+                            "Усул": тарих_df["method"],
+                            "Беморлар": тарих_df["n_total"],
+                            "Пастки, %": тарих_df["low_fraction"] * 100,
+                            "Юкори, %": тарих_df["high_fraction"] * 100,
+                        }).style.format("{:.1f}", subset=["Пастки, %", "Юкори, %"]),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                else:
+                    st.caption("Шартларга мос ҳисоблашлар йўқ")
+
+with tab5, бўлим_босқичи(tab5, "tab_multiplex"):
+    if бўлим_очиқ(tab5):
+        st.markdown('<h3 class="sub-header">Кўп аналитли пластина</h3>', unsafe_allow_html=True)
+        
+        st.markdown('<div class="info-box">Битта пластинада бир неча гормон: ҳар бир аналитнинг ўз стандартлари ва усули бор, беморда ҳар бир аналит учун битта оптик зичлик</div>', unsafe_allow_html=True)
+        
+        if st.button("🔄 Мисол (TSH, FT4, FT3)", key="multiplex_example"):
+            мультиплекс_бошлаш()
             # Rerun логикаси
             if use_rerun:
                 st_rerun()
             else:
                 st.experimental_rerun()
-    
-    # Натижаларни кўрсатиш
-    if st.session_state.calculated:
-        results_df = st.session_state.results_df
-        
-        st.markdown('<div class="success-box">✅ Ҳисоблаш муваффақиятли амалга оширилди!</div>', unsafe_allow_html=True)
-        
-        # Таблица
-        st.markdown("### Беморлар натижалари:")
-        
-        # Стиллаш функцияси - .applymap() ўрнига .map() ишлатилди
-        def color_status(val):
-            if '✅' in str(val):
-                return 'background-color: #d4edda; color: #155724; font-weight: bold;'
-            elif '⚠️' in str(val):
-                return 'background-color: #fff3cd; color: #856404; font-weight: bold;'
-            return ''
-        
-        # .applymap() ўрнига .map() ишлатилди
-        styled_df = results_df.style.map(color_status, subset=['Ҳолат'])
-        st.dataframe(styled_df, use_container_width=True)
-        
-        # График
-        st.markdown("### Калибровка графиги:")
-        fig = create_calibration_plot(
-            st.session_state.оптик_зичлик_стандарт,
-            st.session_state.концентрация_стандарт,
-            st.session_state.оптик_зичлик_беморлар,
-            st.session_state.концентрация_беморлар,
-            st.session_state.гормон_номи,
-            st.session_state.улчов_бирлиги,
-            st.session_state.сақлаш_холати
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Статистика
-        st.markdown('<h4>📊 Статистика</h4>', unsafe_allow_html=True)
         
-        stat_items = list(st.session_state.статистика.items())
-        cols = st.columns(min(4, len(stat_items)))
+        # Аналитлар
+        st.markdown("### Аналитлар:")
+        аналит_df = st.data_editor(
+            st.session_state.мультиплекс_аналит_асос,
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Усул": st.column_config.SelectboxColumn(
+                    "Усул", options=list(УСУЛЛАР), default="linear", required=True
+                ),
+            },
+            key=f"multiplex_analytes_{st.session_state.мультиплекс_версияси}"
+        )
+        st.session_state.мультиплекс_аналитлар = [
+            {
+                "Аналит": str(r["Аналит"]).strip(),
+                "Бирлик": r["Бирлик"] if isinstance(r["Бирлик"], str) else "",
+                "Лот": r["Лот"] if isinstance(r["Лот"], str) else "",
+                "Усул": r["Усул"] if r["Усул"] in УСУЛЛАР else "linear",
+            }
+            for r in аналит_df.to_dict("records")
+            if isinstance(r["Аналит"], str) and r["Аналит"].strip()
+        ]
         
-        for idx, (key, value) in enumerate(stat_items):
-            col_idx = idx % len(cols)
-            with cols[col_idx]:
-                st.metric(label=key, value=value)
-    else:
-        st.markdown('<div class="warning-box">ℹ️ Ҳисоблаш учун "🎯 ҲИСОБЛАШ" тугмасини босинг.</div>', unsafe_allow_html=True)
-
-with tab4:
-    st.markdown('<h3 class="sub-header">Экспорт ва сақлаш</h3>', unsafe_allow_html=True)
-    
-    if st.session_state.calculated:
-        # Натижаларни юклаб олиш
-        st.markdown("### 📥 Натижаларни юклаб олиш")
+        # Беморлар жадвали устунлари аналитлар номларига мос бўлиши керак
+        if list(st.session_state.мультиплекс_бемор_асос.columns) != мультиплекс_номлари():
+            сони = len(мультиплекс_номлари())
+            st.session_state.мультиплекс_беморлар = [
+                (list(row) + [np.nan] * сони)[:сони] for row in st.session_state.мультиплекс_беморлар
+            ]
+            мультиплексни_янгилаш()
+            # Rerun логикаси
+            if use_rerun:
+                st_rerun()
+            else:
+                st.experimental_rerun()
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2 = st.columns(2)
         
         with col1:
-            # CSV формати
-            csv = st.session_state.results_df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button(
-                label="📄 CSV форматида",
-                data=csv,
-                file_name=f"{st.session_state.гормон_номи}_натижалари.csv",
-                mime="text/csv",
+            st.markdown("### Стандартлар:")
+            стандарт_df = st.data_editor(
+                st.session_state.мультиплекс_стандарт_асос,
+                num_rows="dynamic",
+                hide_index=True,
                 use_container_width=True,
-                key="download_csv"
+                column_config={
+                    "Аналит": st.column_config.SelectboxColumn(
+                        "Аналит", options=мультиплекс_номлари(), required=True
+                    ),
+                    "Оптик зичлик": st.column_config.NumberColumn(
+                        "Оптик зичлик", min_value=0.0, max_value=10.0, step=0.01, format="%.3f"
+                    ),
+                    "Концентрация": st.column_config.NumberColumn(
+                        "Концентрация", min_value=0.0, max_value=1000.0, step=0.1, format="%.3f"
+                    ),
+                },
+                key=f"multiplex_standards_{st.session_state.мультиплекс_версияси}"
             )
+            st.session_state.мультиплекс_стандартлар = стандарт_df.dropna().values.tolist()
         
         with col2:
-            # Excel формати
-            excel_data = export_to_excel(
-                st.session_state.results_df,
-                st.session_state.статистика,
-                st.session_state.гормон_номи
+            st.markdown("### Беморлар (OD):")
+            бемор_df = st.data_editor(
+                st.session_state.мультиплекс_бемор_асос,
+                num_rows="dynamic",
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    номи: st.column_config.NumberColumn(
+                        номи, min_value=0.0, max_value=10.0, step=0.001, format="%.4f"
+                    )
+                    for номи in мультиплекс_номлари()
+                },
+                key=f"multiplex_patients_{st.session_state.мультиплекс_версияси}"
             )
+            st.session_state.мультиплекс_беморлар = бемор_df.dropna(how="all").values.tolist()
+            st.caption(f"Беморлар сони: {len(st.session_state.мультиплекс_беморлар)}")
+        
+        # Нусхалаш - ридер экспортидаги устунлар аналитлар тартибида
+        ташланган_қаторлар("multiplex_load")
+        with st.expander("📋 Беморларни нусхалаш ёки файлдан юклаш"):
+            мультиплекс_матн = st.text_area(
+                f"Устунлар: {', '.join(мультиплекс_номлари())} (Excel'дан нусхалаш мумкин)",
+                key="multiplex_paste"
+            )
+            мультиплекс_файл = st.file_uploader("CSV/TXT файл", type=["csv", "txt"], key="multiplex_file")
+            
+            if st.button("📥 Юклаш", key="multiplex_load"):
+                маълумот, ташланган = parse_columns_report(
+                    мультиплекс_файл.getvalue() if мультиплекс_файл else мультиплекс_матн,
+                    len(мультиплекс_номлари()),
+                    мультиплекс_номлари()
+                )
+                if len(маълумот) > 0:
+                    st.session_state.мультиплекс_беморлар = маълумот.tolist()
+                    ташланган_қаторлар("multiplex_load", ташланган)
+                    мультиплексни_янгилаш()
+                    # Rerun логикаси
+                    if use_rerun:
+                        st_rerun()
+                    else:
+                        st.experimental_rerun()
+                else:
+                    st.warning("⚠️ Оптик зичликлар топилмади")
+        
+        if st.button("🎯 БАРЧА АНАЛИТЛАРНИ ҲИСОБЛАШ",
+                    type="primary",
+                    use_container_width=True,
+                    key="multiplex_calculate"):
+            with st.spinner("Ҳисоблаш жараёнида..."):
+                мультиплекс_ҳисоблаш()
+        
+        # Натижа - маълумотлар ўзгарган бўлса қайта ҳисобланади (омбор орқали)
+        мультиплекс = мультиплекс_ҳисоблаш() if st.session_state.мультиплекс_ҳисобланган else None
+        if мультиплекс is not None:
+            results_df = мультиплекс.results_df
+            
+            # Статистика (аналитлар бўйича)
+            st.markdown('<h4>📊 Статистика</h4>', unsafe_allow_html=True)
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Аналит": analyte.гормон_номи,
+                        "Усул": analyte.усул,
+                        **статистика_ҳисоблаш(мультиплекс.сақлаш_холати[:, i]),
+                    }
+                    for i, analyte in enumerate(мультиплекс.аналитлар)
+                ]),
+                hide_index=True,
+                use_container_width=True
+            )
+            
+            # Умумий жадвал: бемор - бир қатор
+            st.markdown("### Беморлар натижалари:")
+            ҳолат_устунлари = [c for c in results_df.columns if c.startswith("Ҳолат ")]
+            st.dataframe(
+                style_results(results_df).map(color_status, subset=ҳолат_устунлари),
+                use_container_width=True,
+                hide_index=True
+            )
+            
+            # График - танланган аналит учун
+            номлар = [a.гормон_номи for a in мультиплекс.аналитлар]
+            танланган = st.selectbox("📈 Калибровка графиги", номлар, key="multiplex_plot_analyte")
+            i = номлар.index(танланган)
+            analyte = мультиплекс.аналитлар[i]
+            fig = cached_calibration_plot(
+                content_hash(st.session_state.мультиплекс_калити, analyte.гормон_номи),
+                analyte.оптик,
+                analyte.концентрация,
+                мультиплекс.оптик_зичлик[:, i],
+                мультиплекс.концентрация[:, i],
+                analyte.гормон_номи,
+                analyte.улчов_бирлиги,
+                мультиплекс.сақлаш_холати[:, i],
+                curve=мультиплекс.эгри_чизиқлар[i]
+            )
+            with stage("plot_render"):
+                st.plotly_chart(fig, use_container_width=True)
+            
+            # Экспорт - барча аналитлар битта файлда
+            st.markdown("### 📥 Натижаларни юклаб олиш")
+            мультиплекс_экспорт_калити = st.session_state.мультиплекс_калити
+            col1, col2, col3 = st.columns(3)
             
-            if excel_data:
+            with col1:
+                csv_backend = get_backend("csv")
                 st.download_button(
-                    label="📊 Excel форматида",
-                    data=excel_data,
-                    file_name=f"{st.session_state.гормон_номи}_натижалари.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    label="📄 CSV форматида",
+                    data=экспорт_маълумоти(
+                        мультиплекс_экспорт_калити, "csv",
+                        lambda: csv_backend.write(results_df, мультиплекс.статистика, "Мультиплекс")
+                    ),
+                    file_name="мультиплекс_натижалари.csv",
+                    mime="text/csv",
                     use_container_width=True,
-                    key="download_excel"
+                    key="multiplex_download_csv"
                 )
-            else:
-                st.info("Excel учун 'Excel ўрнатиш' тугмасини босинг")
-        
-        with col3:
-            # JSON конфигурация
-            config_data = {
-                "гормон_номи": st.session_state.гормон_номи,
-                "улчов_бирлиги": st.session_state.улчов_бирлиги,
-                "стандартлар": st.session_state.стандарт_маълумотлари,
-                "беморлар": st.session_state.беморлар_маълумотлари,
-                "интерполяция_усули": усул,
-                "сақлаш_вақти": datetime.now().isoformat()
-            }
             
-            config_json = json.dumps(config_data, indent=2, ensure_ascii=False)
+            with col2:
+                excel_backend = get_backend("xlsx")
+                if excel_backend is not None:
+                    st.download_button(
+                        label="📊 Excel форматида",
+                        data=экспорт_маълумоти(
+                            мультиплекс_экспорт_калити, "xlsx",
+                            lambda: excel_backend.write(results_df, мультиплекс.статистика, "Мультиплекс")
+                        ),
+                        file_name="мультиплекс_натижалари.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        use_container_width=True,
+                        key="multiplex_download_excel"
+                    )
+            
+            with col3:
+                st.download_button(
+                    label="⚙️ JSON конфигурация",
+                    data=экспорт_маълумоти(
+                        мультиплекс_экспорт_калити, "json",
+                        lambda: config_to_json(build_multiplex_config(мультиплекс.аналитлар, мультиплекс.оптик_зичлик))
+                    ),
+                    file_name="мультиплекс_конфигурация.json",
+                    mime="application/json",
+                    use_container_width=True,
+                    key="multiplex_download_config"
+                )
+        else:
+            st.markdown('<div class="warning-box">ℹ️ Ҳисоблаш учун "🎯 БАРЧА АНАЛИТЛАРНИ ҲИСОБЛАШ" тугмасини босинг.</div>', unsafe_allow_html=True)
+
+# Ўлчовни якунлаш (админ панели ва футер ҳисобга олинмайди)
+if ўлчов is not None:
+    st.session_state.охирги_ўлчов = ўлчов.finish()
+    st.session_state._жорий_ўлчов = None
+
+def админ_калити():
+    """
+    Админ панеллари учун махфий калит (берилмаса - панеллар ўчиқ)
+
+    HORMON_ADMIN_TOKEN муҳит ўзгарувчиси ёки st.secrets["admin_token"].
+    """
+    калит = os.environ.get("HORMON_ADMIN_TOKEN")
+    if not калит:
+        try:
+            калит = st.secrets.get("admin_token")
+        except Exception:
+            # secrets.toml йўқ
+            калит = None
+    return str(калит) if калит else None
+
+def админми():
+    """
+    Сессия админ панелларини кўра оладими
+
+    Иловани ?admin=<калит> билан очиш керак; калит бир марта текширилади,
+    сессияда эслаб қолинади ва URL'дан олиб ташланади.
+    """
+    if st.session_state.get("админ"):
+        return True
+    калит = админ_калити()
+    берилган = st.query_params.get("admin")
+    if калит is None or not берилган:
+        return False
+    if not hmac.compare_digest(берилган.encode("utf-8"), калит.encode("utf-8")):
+        return False
+    st.session_state.админ = True
+    del st.query_params["admin"]
+    return True
+
+# Админ кўриниши (?admin=<калит>): ҳисоблашдан кейин, скрипт охирида чизилади
+with st.sidebar:
+    админ = админми()
+    if админ:
+        with st.expander("⏱️ Диагностика (админ)"):
+            ёқилган = st.checkbox(
+                "Босқич вақтлари (барча сессиялар)",
+                value=enabled(),
+                key="metrics_enabled",
+                help="HORMON_METRICS=1 билан ҳам ёқилади; ўчиқ бўлса қўшимча харажат йўқ"
+            )
+            if ёқилган != enabled():
+                enable(ёқилган)
+            st.checkbox("cProfile (ҳар rerun)", key="profile_cpu")
+            st.checkbox("tracemalloc (ҳар rerun)", key="profile_memory")
+            
+            охирги = st.session_state.get("охирги_ўлчов")
+            if охирги is not None:
+                st.caption(f"Охирги rerun: {охирги.log_line()}")
+                if охирги.trace:
+                    st.dataframe(
+                        pd.DataFrame(
+                            [(номи, сония * 1000) for номи, сония in охирги.stages().items()],
+                            columns=["Босқич", "мс"]
+                        ),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                if охирги.memory_peak_mb is not None:
+                    st.caption(f"Хотира чўққиси: {охирги.memory_peak_mb:.1f} МБ")
+                    st.code("\n".join(охирги.memory_top), language=None)
+                if охирги.profile_text:
+                    st.code(охирги.profile_text, language=None)
             
+            жами = metrics.snapshot()["stages"]
+            if жами:
+                st.markdown("**Жараён бўйича (ишга туширилгандан бери)**")
+                st.dataframe(
+                    pd.DataFrame([
+                        (номи, қиймат["count"], қиймат["total_s"] * 1000 / қиймат["count"], қиймат["max_s"] * 1000)
+                        for номи, қиймат in sorted(жами.items())
+                    ], columns=["Босқич", "Сони", "Ўртача, мс", "Энг кўп, мс"]),
+                    hide_index=True,
+                    use_container_width=True
+                )
             st.download_button(
-                label="⚙️ JSON конфигурация",
-                data=config_json,
-                file_name=f"{st.session_state.гормон_номи}_конфигурация.json",
-                mime="application/json",
-                use_container_width=True,
-                key="download_config"
+                "📈 Prometheus матни",
+                data=prometheus_text(),
+                file_name="kalibrovka_metrics.txt",
+                mime="text/plain",
+                key="download_metrics"
+            )
+    
+    if админ:
+        with st.expander("🛠️ Хотира (админ)"):
+            омбор_маълумоти = омбор.info()
+            st.metric(
+                "Омбор",
+                f"{омбор_маълумоти['bytes'] / 2**20:.1f} / {омбор_маълумоти['max_bytes'] / 2**20:.0f} МБ"
+            )
+            st.caption(
+                f"Натижалар: {омбор_маълумоти['entries']}, сессиялар: {омбор_маълумоти['sessions']}, "
+                f"сессия чегараси: {омбор_маълумоти['session_bytes'] / 2**20:.0f} МБ, "
+                f"TTL: {омбор_маълумоти['ttl']:.0f} с"
+            )
+            st.caption(
+                f"Кэш: {омбор_маълумоти['hits']} топилди, {омбор_маълумоти['misses']} топилмади, "
+                f"{омбор_маълумоти['evictions']} чиқарилди, {омбор_маълумоти['expirations']} муддати ўтди"
+            )
+            реестр_маълумоти = реестр.info()
+            st.caption(
+                f"Эгри чизиқлар реестри: {реестр_маълумоти['size']} / {реестр_маълумоти['maxsize']}, "
+                f"{реестр_маълумоти['hits']} топилди, {реестр_маълумоти['disk_hits']} дискдан, "
+                f"{реестр_маълумоти['fits']} мосланди, {реестр_маълумоти['evictions']} чиқарилди"
+                + (f" (диск: {реестр_маълумоти['path']})" if реестр_маълумоти['path'] else "")
+            )
+            сессиялар = pd.DataFrame(омбор.sessions(), columns=["session", "results", "bytes", "shared", "idle_s"])
+            st.dataframe(
+                pd.DataFrame({
+                    "Сессия": сессиялар["session"] + np.where(сессиялар["session"] == сессия_калити(), " (сиз)", ""),
+                    "Натижалар": сессиялар["results"],
+                    "МБ": сессиялар["bytes"] / 2**20,
+                    "Бўлишилган": сессиялар["shared"],
+                    "Кутиш, с": сессиялар["idle_s"].round(),
+                }),
+                hide_index=True,
+                use_container_width=True
             )
-        
-        # Натижаларни кўриш
-        st.markdown("### 👁️ Натижаларни кўриш")
-        st.dataframe(st.session_state.results_df, use_container_width=True)
-        
-    else:
-        st.markdown('<div class="warning-box">ℹ️ Аввало ҳисоблаш амалиётини бажаринг.</div>', unsafe_allow_html=True)
 
 # Футер
 st.markdown("---")
@@ -0,0 +1,230 @@
+# kalibrovka/__init__.py
+"""
+Гормон калибровка ядроси - Streamlit'сиз ишлатиш учун
+
+Импорт вақтида фақат NumPy юкланади (ва ядро: engine, logistic, batch);
+қолган қисмлар (экспорт, хизмат, тарих, архив, қайта ишлаш ...) биринчи
+мурожаатда ўз модулидан юкланади - масалан, kalibrovka.RunHistory
+sqlite3'ни, kalibrovka.start_server эса asyncio'ни фақат шунда юклайди.
+"""
+import importlib
+
+from .engine import (
+    УСУЛЛАР,
+    ПАСТКИ,
+    НОРМАЛ,
+    ЮКОРИ,
+    ҲОЛАТ_НОМЛАРИ,
+    CalibrationCurve,
+    standards_hash,
+    content_hash,
+    fit_curve,
+    curve_cache_info,
+    clear_curve_cache,
+    evaluate,
+    classify,
+    интерполяция,
+    статистика_ҳисоблаш,
+)
+from .logistic import (
+    ЛОГИСТИК_УСУЛЛАР,
+    FitInfo,
+    FitWarning,
+    LogisticFitter,
+    fit_logistic,
+    fit_logistic_batch,
+    logistic_forward,
+    logistic_inverse,
+    summarize_fits,
+)
+from .batch import (
+    interpolate_batch,
+    classify_batch,
+    fit_plates,
+)
+
+# Талаб бўйича юкланадиган номлар: ном -> модуль
+_LAZY = {
+    "BootstrapCI": "uncertainty",
+    "bootstrap_ci": "uncertainty",
+    "Analyte": "multiplex",
+    "MultiplexResult": "multiplex",
+    "evaluate_multiplex": "multiplex",
+    "multiplex_table": "multiplex",
+    "build_multiplex_config": "multiplex",
+    "validate_multiplex_config": "multiplex",
+    "multiplex_from_config": "multiplex",
+    "results_table": "results",
+    "status_labels": "results",
+    "format_concentrations": "results",
+    "formatted_table": "results",
+    "filter_results": "results",
+    "cached_artifact": "export",
+    "check_excel_support": "export",
+    "export_to_csv": "export",
+    "export_to_excel": "export",
+    "export_to_excel_openpyxl": "export",
+    "build_config": "export",
+    "config_to_json": "export",
+    "load_config": "export",
+    "ConfigError": "export",
+    "validate_config": "export",
+    "curve_from_config": "export",
+    "parse_columns": "inputs",
+    "parse_columns_report": "inputs",
+    "LookupTable": "lut",
+    "compile_lut": "lut",
+    "load_lut": "lut",
+    "stream_file": "stream",
+    "PlateResult": "reprocess",
+    "ConfigSource": "reprocess",
+    "collect_plates": "reprocess",
+    "check_plates": "reprocess",
+    "process_plate": "reprocess",
+    "reprocess_plates": "reprocess",
+    "results_frame": "reprocess",
+    "summary_frame": "reprocess",
+    "ResultArchive": "archive",
+    "save_archive": "archive",
+    "archive_bytes": "archive",
+    "load_archive": "archive",
+    "CurveRegistry": "registry",
+    "default_registry": "registry",
+    "registry_key": "registry",
+    "MemoryBudgetError": "store",
+    "ResultStore": "store",
+    "StoredResult": "store",
+    "default_store": "store",
+    "Update": "incremental",
+    "curve_reusable": "incremental",
+    "changed_rows": "incremental",
+    "patch_result": "incremental",
+    "update_result": "incremental",
+    "RunHistory": "history",
+    "RunRecord": "history",
+    "default_history": "history",
+    "CalibrationService": "service",
+    "InProcessClient": "service",
+    "start_server": "service",
+    "Capture": "instrument",
+    "prometheus_text": "instrument",
+    "ExportBackend": "backends",
+    "ExportUnavailable": "backends",
+    "probe_backends": "backends",
+    "get_backend": "backends",
+    "available_formats": "backends",
+    "export_results": "backends",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+__all__ = [
+    "УСУЛЛАР",
+    "ПАСТКИ",
+    "НОРМАЛ",
+    "ЮКОРИ",
+    "ҲОЛАТ_НОМЛАРИ",
+    "CalibrationCurve",
+    "standards_hash",
+    "content_hash",
+    "fit_curve",
+    "curve_cache_info",
+    "clear_curve_cache",
+    "evaluate",
+    "classify",
+    "интерполяция",
+    "статистика_ҳисоблаш",
+    "ЛОГИСТИК_УСУЛЛАР",
+    "FitInfo",
+    "FitWarning",
+    "LogisticFitter",
+    "fit_logistic",
+    "fit_logistic_batch",
+    "logistic_forward",
+    "logistic_inverse",
+    "summarize_fits",
+    "interpolate_batch",
+    "classify_batch",
+    "fit_plates",
+    "BootstrapCI",
+    "bootstrap_ci",
+    "Analyte",
+    "MultiplexResult",
+    "evaluate_multiplex",
+    "multiplex_table",
+    "build_multiplex_config",
+    "validate_multiplex_config",
+    "multiplex_from_config",
+    "results_table",
+    "status_labels",
+    "format_concentrations",
+    "formatted_table",
+    "filter_results",
+    "cached_artifact",
+    "check_excel_support",
+    "export_to_csv",
+    "export_to_excel",
+    "export_to_excel_openpyxl",
+    "build_config",
+    "config_to_json",
+    "load_config",
+    "ConfigError",
+    "validate_config",
+    "curve_from_config",
+    "parse_columns",
+    "parse_columns_report",
+    "LookupTable",
+    "compile_lut",
+    "load_lut",
+    "stream_file",
+    "PlateResult",
+    "ConfigSource",
+    "collect_plates",
+    "check_plates",
+    "process_plate",
+    "reprocess_plates",
+    "results_frame",
+    "summary_frame",
+    "ResultArchive",
+    "save_archive",
+    "archive_bytes",
+    "load_archive",
+    "CurveRegistry",
+    "default_registry",
+    "registry_key",
+    "MemoryBudgetError",
+    "ResultStore",
+    "StoredResult",
+    "default_store",
+    "Update",
+    "curve_reusable",
+    "changed_rows",
+    "patch_result",
+    "update_result",
+    "RunHistory",
+    "RunRecord",
+    "default_history",
+    "CalibrationService",
+    "InProcessClient",
+    "start_server",
+    "Capture",
+    "prometheus_text",
+    "ExportBackend",
+    "ExportUnavailable",
+    "probe_backends",
+    "get_backend",
+    "available_formats",
+    "export_results",
+]
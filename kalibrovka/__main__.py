@@ -0,0 +1,271 @@
+# kalibrovka/__main__.py
+"""
+Буйруқ сатри: python -m kalibrovka <буйруқ> ...
+"""
+import argparse
+import sys
+import time
+
+from .engine import УСУЛЛАР, fit_curve
+from .export import load_config, curve_from_config
+from .lut import compile_lut, load_lut
+from .stream import DEFAULT_CHUNKSIZE, DEFAULT_COLUMN, stream_file
+
+
+def _parse_standards(text):
+    """"0.1:1,0.2:2,..." кўринишидаги стандартлар"""
+    оптик, концентрация = [], []
+    for pair in text.split(","):
+        od, conc = pair.split(":")
+        оптик.append(float(od))
+        концентрация.append(float(conc))
+    return оптик, концентрация
+
+
+def _curve_from_args(args):
+    if args.config:
+        config_data = load_config(args.config)
+        return curve_from_config(config_data, args.method), config_data.get("улчов_бирлиги", "")
+    if args.standards:
+        оптик, концентрация = _parse_standards(args.standards)
+        return fit_curve(оптик, концентрация, args.method or "linear"), ""
+    raise SystemExit("--config ёки --standards керак")
+
+
+def _add_curve_arguments(parser):
+    parser.add_argument("--config", help="Экспорт бўлимидан олинган JSON конфигурация")
+    parser.add_argument("--standards", help='Стандартлар: "0.1:1,0.2:2,..."')
+    parser.add_argument("--method", choices=УСУЛЛАР, help="Интерполяция усули (конфигурациядагини алмаштиради)")
+
+
+def cmd_stream(args):
+    if args.lut_file:
+        curve, улчов_бирлиги = load_lut(args.lut_file), ""
+    else:
+        curve, улчов_бирлиги = _curve_from_args(args)
+        if args.lut:
+            curve = compile_lut(curve)
+    stats = stream_file(
+        curve, args.input, args.output,
+        column=args.column,
+        chunksize=args.chunksize,
+        улчов_бирлиги=args.unit or улчов_бирлиги,
+    )
+
+    rss = stats["peak_rss_mb"]
+    print(f"Қаторлар: {stats['rows']}")
+    print(f"Вақт: {stats['seconds']:.2f} с")
+    print(f"Тезлик: {stats['rows_per_second']:,.0f} қатор/с")
+    print(f"RSS чўққиси: {rss:.1f} МБ" if rss is not None else "RSS чўққиси: номаълум")
+    return 0
+
+
+def cmd_lut(args):
+    curve, _ = _curve_from_args(args)
+    lut = compile_lut(curve, args.max_error)
+
+    output = args.output
+    if output is None:
+        base = args.config[:-5] if args.config and args.config.endswith(".json") else "curve"
+        output = base + ".lut.npz"
+    lut.save(output)
+
+    print(f"Жадвал: {output}")
+    print(f"Катаклар: {lut.cells}")
+    print(f"Хатолик чегараси: {lut.error_bound:.3g}")
+    return 0
+
+
+def cmd_reprocess(args):
+    from .reprocess import check_plates, collect_plates, reprocess_plates, results_frame, summary_frame
+    from .results import formatted_table
+
+    plates = list(collect_plates(args.configs))
+    start = time.perf_counter()
+    if args.check:
+        errors = check_plates(plates)
+        for номи, error in errors:
+            print(f"ХАТОЛИК: {номи}: {error}")
+        print(f"Текширилди: {len(plates)}, хатоликлар: {len(errors)} ({time.perf_counter() - start:.2f} с)")
+        return 1 if errors else 0
+
+    results = reprocess_plates(plates, workers=args.workers, chunksize=args.chunksize, усул=args.method)
+    seconds = time.perf_counter() - start
+
+    failed = [r for r in results if not r.ok]
+    for result in failed:
+        print(f"ХАТОЛИК: {result.номи}: {result.error}")
+    if args.output and args.output.lower().endswith(".kres"):
+        from .archive import save_archive
+
+        rows = save_archive(args.output, results)
+        print(f"Натижалар: {args.output} ({rows} қатор)")
+    elif args.output:
+        df = results_frame(results)
+        if args.output.lower().endswith((".parquet", ".pq")):
+            df.to_parquet(args.output, index=False)
+        else:
+            formatted_table(df).to_csv(args.output, index=False, encoding="utf-8-sig")
+        print(f"Натижалар: {args.output} ({len(df)} қатор)")
+
+    if args.summary:
+        summary_frame(results).to_csv(args.summary, index=False, encoding="utf-8-sig")
+        print(f"Ҳисобот: {args.summary}")
+    if args.history:
+        from .history import RunHistory, RunRecord
+
+        history = RunHistory(args.history)
+        ids = history.write([RunRecord.from_plate(r) for r in results if r.ok])
+        history.close()
+        print(f"Тарих: {args.history} ({len(ids)} ҳисоблаш)")
+
+    print(f"Пластиналар: {len(results)}, хатоликлар: {len(failed)}")
+    print(f"Вақт: {seconds:.2f} с ({len(results) / seconds if seconds > 0 else 0:,.1f} пластина/с)")
+    return 1 if failed else 0
+
+
+def cmd_history(args):
+    from .history import RunHistory
+
+    history = RunHistory(args.db)
+    start = time.perf_counter()
+    if args.flagged:
+        rows = history.flagged(args.flagged, гормон_номи=args.hormone, since=args.since, until=args.until,
+                               limit=args.limit)
+        seconds = time.perf_counter() - start
+        for row in rows:
+            conc = "N/A" if row["conc"] is None else f"{row['conc']:.4f}"
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created']))}  "
+                  f"#{row['run_id']}  {row['hormone']}  {row['lot'] or '-'}  "
+                  f"бемор {row['well']}: OD {row['od']:.4f}, {conc}")
+    else:
+        rows = history.runs(гормон_номи=args.hormone, лот=args.lot, усул=args.method, since=args.since,
+                            until=args.until, min_high=args.min_high, min_low=args.min_low, limit=args.limit)
+        seconds = time.perf_counter() - start
+        for row in rows:
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created']))}  "
+                  f"#{row['id']}  {row['hormone']}  {row['lot'] or '-'}  {row['method']}  "
+                  f"беморлар {row['n_total']}, пастки {row['low_fraction']:.1%}, юкори {row['high_fraction']:.1%}")
+    history.close()
+    print(f"Топилди: {len(rows)} ({seconds * 1000:.1f} мс)")
+    return 0
+
+
+def cmd_serve(args):
+    from .service import serve
+
+    print(f"Хизмат: http://{args.host}:{args.port}/calibrate (тўхтатиш: Ctrl+C)", flush=True)
+    serve(args.host, args.port)
+    return 0
+
+
+def _int_list(text):
+    return [int(float(v)) for v in text.split(",")]
+
+
+def cmd_bench(args):
+    from . import bench
+
+    report = bench.run_suite(
+        cases=args.cases.split(",") if args.cases else None,
+        methods=args.methods.split(",") if args.methods else None,
+        standards=args.standards,
+        sizes=args.sizes,
+        repeat=args.repeat,
+        seed=args.seed,
+        memory=not args.no_memory,
+        progress=lambda result: print(bench.format_result(result), flush=True),
+    )
+    if args.output:
+        bench.save_results(report, args.output)
+        print(f"Натижалар: {args.output}")
+
+    if not args.baseline:
+        return 0
+
+    rows = bench.compare(report, bench.load_results(args.baseline), args.tolerance)
+    regressions = [row for row in rows if row["regression"]]
+    for row in regressions:
+        memory = f", хотира ×{row['memory_ratio']:.2f}" if row["memory_ratio"] else ""
+        print(
+            f"РЕГРЕССИЯ: {row['case']} {row['method']} {row['standards']} ст. "
+            f"{row['patients']} бем. - вақт ×{row['time_ratio']:.2f}{memory}"
+        )
+    print(f"Солиштирилди: {len(rows)}, регрессиялар: {len(regressions)}")
+    return 1 if regressions else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m kalibrovka", description="Гормон калибровка тизими")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("stream", help="CSV/Parquet файлни оқимли ҳисоблаш")
+    p.add_argument("input", help="Кириш файли (.csv ёки .parquet)")
+    p.add_argument("output", help="Натижа файли (.csv ёки .parquet)")
+    _add_curve_arguments(p)
+    p.add_argument("--column", default=DEFAULT_COLUMN, help="Оптик зичлик устуни номи")
+    p.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Бўлакдаги қаторлар сони")
+    p.add_argument("--unit", help="Ўлчов бирлиги")
+    p.add_argument("--lut", action="store_true", help="Эгри чизиқни жадвалга айлантириб ҳисоблаш")
+    p.add_argument("--lut-file", help="Сақланган жадвал (.lut.npz) орқали ҳисоблаш")
+    p.set_defaults(func=cmd_stream)
+
+    p = sub.add_parser("lut", help="Эгри чизиқни жадвалга айлантириб сақлаш")
+    _add_curve_arguments(p)
+    p.add_argument("--max-error", type=float, help="Рухсат этилган абсолют хатолик")
+    p.add_argument("--output", help="Натижа файли (стандарт: <конфигурация>.lut.npz)")
+    p.set_defaults(func=cmd_lut)
+
+    p = sub.add_parser("reprocess", help="Пластиналарни (JSON конфигурациялар) параллел қайта ҳисоблаш")
+    p.add_argument("configs", nargs="+", help="JSON конфигурация файллари, каталоглар ёки zip архивлар")
+    p.add_argument("--method", choices=УСУЛЛАР, help="Интерполяция усули (конфигурациядагини алмаштиради)")
+    p.add_argument("--workers", type=int, help="Процесслар сони (стандарт: CPU сони)")
+    p.add_argument("--chunksize", type=int, help="Бир вазифадаги пластиналар сони")
+    p.add_argument("--output", help="Умумий натижа файли (.csv, .parquet ёки .kres архив)")
+    p.add_argument("--summary", help="Пластиналар бўйича ҳисобот (CSV: ҳолатлар сони, хатоликлар)")
+    p.add_argument("--history", help="Натижаларни тарих базасига (SQLite) ёзиш")
+    p.add_argument("--check", action="store_true", help="Ҳисобламасдан фақат схемани текшириш")
+    p.set_defaults(func=cmd_reprocess)
+
+    p = sub.add_parser("history", help="Ҳисоблашлар тарихидан сўров")
+    p.add_argument("db", help="Тарих базаси (SQLite)")
+    p.add_argument("--hormone", help="Гормон номи")
+    p.add_argument("--lot", help="Лот рақами")
+    p.add_argument("--method", choices=УСУЛЛАР, help="Интерполяция усули")
+    p.add_argument("--since", help="Бошланиш санаси (ISO, масалан 2024-05-01)")
+    p.add_argument("--until", help="Тугаш санаси (кирмайди)")
+    p.add_argument("--min-high", type=float, help="Юкори беморлар улуши, камида (0.1 = 10%%)")
+    p.add_argument("--min-low", type=float, help="Пастки беморлар улуши, камида")
+    p.add_argument("--flagged", choices=("high", "low"), help="Ҳисоблашлар ўрнига диапазондан ташқари беморлар")
+    p.add_argument("--limit", type=int, default=100, help="Қаторлар чегараси (стандарт: 100)")
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("serve", help="HTTP/JSON калибровка хизмати")
+    p.add_argument("--host", default="127.0.0.1", help="Манзил (стандарт: 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="Порт (стандарт: 8765)")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("bench", help="Тезлик ўлчовлари (JSON натижа, baseline билан солиштириш)")
+    p.add_argument("--cases", help="Ҳолатлар: interpolate,batch,batch_loop,results,plot,excel (стандарт: ҳаммаси)")
+    p.add_argument("--methods", help="Усуллар, вергул билан (стандарт: ҳаммаси)")
+    p.add_argument("--standards", type=_int_list, default=[5, 8, 12], help="Стандартлар сони: 5,8,12")
+    p.add_argument("--sizes", type=_int_list, default=[10, 1000, 100000, 10000000],
+                   help="Беморлар сони: 10,1000,1e5,1e7")
+    p.add_argument("--repeat", type=int, default=5, help="Ҳар бир ўлчов учун такрорлар")
+    p.add_argument("--seed", type=int, default=0, help="Синтетик маълумотлар seed'и")
+    p.add_argument("--no-memory", action="store_true", help="Хотира чўққисини ўлчамаслик (тезроқ)")
+    p.add_argument("--output", help="Натижаларни JSON файлга сақлаш")
+    p.add_argument("--baseline", help="Олдинги JSON натижа билан солиштириш")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Рухсат этилган секинлашиш (0.25 = 25%%)")
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+# kalibrovka/archive.py
+"""
+Натижаларнинг ихчам бинар архиви (.kres)
+
+Файл тузилиши (little-endian):
+
+    8 байт   сеҳрли белги b"KALIBRV\\0"
+    2 байт   формат версияси (uint16)
+    4 байт   сарлавҳа узунлиги (uint32)
+    ...      JSON сарлавҳа (UTF-8): версия, қаторлар сони, устунлар
+             (dtype, offset), пластиналар метамаълумоти (стандартлар,
+             усул, ўлчов бирлиги, қаторлар оралиғи)
+    ...      устунлар, ҳар бири 64 байтга текисланган:
+             оптик_зичлик float64, концентрация float64,
+             сақлаш_холати int8, пластина uint32
+
+Устунлар np.memmap орқали ўқилади - файл хотирага нусхаланмайди, катта
+архивдан кесим олиш (slicing) дарҳол бажарилади.
+"""
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+MAGIC = b"KALIBRV\0"
+ARCHIVE_VERSION = 1
+ALIGNMENT = 64
+
+# Устунлар ва уларнинг тури (ёзиш тартибида)
+COLUMNS = (
+    ("оптик_зичлик", "<f8"),
+    ("концентрация", "<f8"),
+    ("сақлаш_холати", "i1"),
+    ("пластина", "<u4"),
+)
+
+_PREFIX = len(MAGIC) + 2 + 4
+
+# Пластина метамаълумотида сақланадиган майдонлар
+_META_FIELDS = ("номи", "гормон_номи", "улчов_бирлиги", "лот", "усул", "стандартлар", "сақлаш_вақти")
+
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _plate_arrays(plate):
+    """PlateResult ёки луғатдан (метамаълумот, {устун: массив})"""
+    get = plate.get if isinstance(plate, dict) else lambda name, default=None: getattr(plate, name, default)
+    meta = {name: get(name) for name in _META_FIELDS if get(name) is not None}
+    стандартлар = meta.get("стандартлар")
+    if стандартлар is not None:
+        meta["стандартлар"] = np.asarray(стандартлар, dtype=float).tolist()
+    arrays = {
+        name: np.asarray(get(name), dtype=dtype).ravel()
+        for name, dtype in COLUMNS if name != "пластина"
+    }
+    if len(set(map(len, arrays.values()))) > 1:
+        raise ValueError("Пластина устунлари узунлиги мос эмас")
+    return meta, arrays
+
+
+def save_archive(target, plates, meta=None):
+    """
+    Пластиналар натижаларини архивга ёзиш
+
+    plates - PlateResult объектлари (хатолик билан тугаганлари ташланади)
+    ёки "оптик_зичлик", "концентрация", "сақлаш_холати" ва ихтиёрий
+    метамаълумот ("гормон_номи", "улчов_бирлиги", "лот", "усул", "стандартлар",
+    ...) калитли луғатлар. target - файл йўли ёки ёзиладиган бинар объект.
+    Қайтаради: ёзилган қаторлар сони.
+    """
+    items = []
+    for plate in plates:
+        if getattr(plate, "error", None) is not None:
+            continue
+        items.append(_plate_arrays(plate))
+
+    пластиналар = []
+    start = 0
+    for plate_meta, arrays in items:
+        stop = start + len(arrays["оптик_зичлик"])
+        пластиналар.append(dict(plate_meta, start=start, stop=stop))
+        start = stop
+    rows = start
+
+    # Сарлавҳа узунлиги offset'ларга боғлиқ, offset'лар эса сарлавҳага -
+    # шунинг учун маълумотлар сарлавҳа учун ажратилган жойдан кейин
+    # текисланиб жойлашади ва сарлавҳа бўш жой билан тўлдирилади
+    header = {
+        "version": ARCHIVE_VERSION,
+        "rows": rows,
+        "meta": meta or {},
+        "plates": пластиналар,
+        "columns": {},
+    }
+    sizes = {name: rows * np.dtype(dtype).itemsize for name, dtype in COLUMNS}
+    header_len = len(json.dumps(header, ensure_ascii=False).encode("utf-8")) + 256 * len(COLUMNS)
+    offset = _align(_PREFIX + header_len)
+    for name, dtype in COLUMNS:
+        header["columns"][name] = {"dtype": dtype, "offset": offset}
+        offset = _align(offset + sizes[name])
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    encoded += b" " * (header_len - len(encoded))
+
+    own = isinstance(target, (str, os.PathLike))
+    f = open(target, "wb") if own else target
+    try:
+        base = f.tell() if not own else 0
+        f.write(MAGIC)
+        f.write(np.uint16(ARCHIVE_VERSION).astype("<u2").tobytes())
+        f.write(np.uint32(header_len).astype("<u4").tobytes())
+        f.write(encoded)
+        for name, dtype in COLUMNS:
+            f.write(b"\0" * (base + header["columns"][name]["offset"] - f.tell()))
+            for plate_index, (_, arrays) in enumerate(items):
+                if name == "пластина":
+                    f.write(np.full(len(arrays["оптик_зичлик"]), plate_index, dtype=dtype).tobytes())
+                else:
+                    f.write(arrays[name].tobytes())
+    finally:
+        if own:
+            f.close()
+    return rows
+
+
+def archive_bytes(plates, meta=None):
+    """Архив байтлари (юклаб олиш тугмаси учун)"""
+    import io
+
+    output = io.BytesIO()
+    save_archive(output, plates, meta)
+    return output.getvalue()
+
+
+def _read_header(f):
+    prefix = f.read(_PREFIX)
+    if len(prefix) < _PREFIX or prefix[:len(MAGIC)] != MAGIC:
+        raise ValueError("Бу .kres архиви эмас")
+    version = int(np.frombuffer(prefix, "<u2", 1, len(MAGIC))[0])
+    if version != ARCHIVE_VERSION:
+        raise ValueError(f"Архив версияси {version} қўллаб-қувватланмайди")
+    header_len = int(np.frombuffer(prefix, "<u4", 1, len(MAGIC) + 2)[0])
+    return json.loads(f.read(header_len).decode("utf-8"))
+
+
+@dataclass
+class ResultArchive:
+    """
+    Очилган архив: устунлар np.memmap (фақат ўқиш учун)
+
+    archive.концентрация[10_000:20_000] каби кесимлар файлдан нусхасиз
+    олинади. Пластина бўйича кесим учун plate(i).
+    """
+    path: str
+    meta: dict
+    plates: list
+    оптик_зичлик: np.ndarray
+    концентрация: np.ndarray
+    сақлаш_холати: np.ndarray
+    пластина: np.ndarray
+
+    def __len__(self):
+        return len(self.оптик_зичлик)
+
+    def plate(self, index):
+        """i-пластина: (метамаълумот, оптик, концентрация, ҳолат) - кесимлар"""
+        info = self.plates[index]
+        s = slice(info["start"], info["stop"])
+        return info, self.оптик_зичлик[s], self.концентрация[s], self.сақлаш_холати[s]
+
+    def config(self, index):
+        """i-пластина учун JSON конфигурация (Экспорт бўлимидаги шакл)"""
+        from .export import build_config
+
+        info, оптик, _, _ = self.plate(index)
+        return build_config(
+            info.get("гормон_номи", ""),
+            info.get("улчов_бирлиги", ""),
+            info.get("стандартлар", []),
+            np.asarray(оптик).tolist(),
+            info.get("усул", "linear"),
+            info.get("сақлаш_вақти"),
+            info.get("лот"),
+        )
+
+    def статистика(self):
+        from .engine import статистика_ҳисоблаш
+
+        return статистика_ҳисоблаш(self.сақлаш_холати)
+
+    def to_frame(self, start=None, stop=None):
+        """
+        Натижалар жадвали (pandas) - форматлаш фақат шу ерда
+
+        Катта архивларда start/stop билан фақат керакли қисм олинади.
+        """
+        import pandas as pd
+
+        from .results import status_labels
+
+        s = slice(start, stop)
+        номлар = [info.get("номи") or info.get("гормон_номи") or f"#{i + 1}"
+                  for i, info in enumerate(self.plates)]
+        пластина = np.asarray(self.пластина[s])
+        if номлар and len(set(номлар)) == len(номлар):
+            пластина = pd.Categorical.from_codes(пластина, номлар)
+        else:
+            пластина = пластина + 1
+        return pd.DataFrame({
+            "Пластина": пластина,
+            "Оптик зичлик": np.asarray(self.оптик_зичлик[s]),
+            "Концентрация": np.asarray(self.концентрация[s]),
+            "Ҳолат": status_labels(np.asarray(self.сақлаш_холати[s])),
+        })
+
+
+def load_archive(path, mmap=True):
+    """
+    Архивни очиш
+
+    mmap=True бўлса устунлар файлга np.memmap орқали боғланади (нусхасиз,
+    дарҳол); mmap=False бўлса хотирага ўқилади.
+    """
+    with open(path, "rb") as f:
+        header = _read_header(f)
+
+    rows = header["rows"]
+    columns = {}
+    for name, dtype in COLUMNS:
+        spec = header["columns"][name]
+        if rows == 0:
+            columns[name] = np.empty(0, dtype=spec["dtype"])
+        elif mmap:
+            columns[name] = np.memmap(path, dtype=spec["dtype"], mode="r",
+                                      offset=spec["offset"], shape=(rows,))
+        else:
+            columns[name] = np.fromfile(path, dtype=spec["dtype"], count=rows,
+                                        offset=spec["offset"])
+
+    return ResultArchive(os.fspath(path), header["meta"], header["plates"], **columns)
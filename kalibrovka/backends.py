@@ -0,0 +1,80 @@
+# kalibrovka/backends.py
+"""
+Экспорт ёзувчилари реестри
+
+Қайси кутубхоналар ўрнатилгани жараён бошида бир марта текширилади
+(модул импорт қилинмайди, фақат топилади) ва жараён давомида кэшланади.
+Сўровларга хизмат қилаётганда тармоқ ёки subprocess ишлатилмайди - ёзувчи
+бўлмаса формат шунчаки мавжуд эмас деб қаралади.
+"""
+import importlib.util
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .export import export_to_csv, export_to_excel, export_to_excel_openpyxl
+
+
+@dataclass(frozen=True)
+class ExportBackend:
+    """Битта формат учун ёзувчи"""
+    формат: str
+    номи: str
+    модуль: str
+    writer: object
+    mime: str
+    кенгайтма: str
+
+    def write(self, results_df, статистика, гормон_номи):
+        return self.writer(results_df, статистика, гормон_номи)
+
+
+def _write_csv(results_df, статистика, гормон_номи):
+    return export_to_csv(results_df)
+
+
+_XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Ҳар бир формат учун ёзувчилар - афзал кўрилгани биринчи
+BACKENDS = (
+    ExportBackend("xlsx", "xlsxwriter", "xlsxwriter", export_to_excel, _XLSX_MIME, "xlsx"),
+    ExportBackend("xlsx", "openpyxl", "openpyxl", export_to_excel_openpyxl, _XLSX_MIME, "xlsx"),
+    ExportBackend("csv", "csv", "pandas", _write_csv, "text/csv", "csv"),
+)
+
+
+class ExportUnavailable(LookupError):
+    """Сўралган формат учун ўрнатилган ёзувчи йўқ"""
+
+
+@lru_cache(maxsize=None)
+def probe_backends():
+    """
+    Мавжуд ёзувчилар: формат -> ExportBackend (афзал кўрилгани)
+
+    Натижа жараён давомида кэшланади.
+    """
+    мавжуд = {}
+    for backend in BACKENDS:
+        if backend.формат in мавжуд:
+            continue
+        if importlib.util.find_spec(backend.модуль) is not None:
+            мавжуд[backend.формат] = backend
+    return мавжуд
+
+
+def get_backend(формат):
+    """Формат учун ёзувчи; мавжуд бўлмаса None"""
+    return probe_backends().get(формат)
+
+
+def available_formats():
+    """Мавжуд форматлар ва уларнинг ёзувчилари: {"xlsx": "xlsxwriter", ...}"""
+    return {формат: backend.номи for формат, backend in probe_backends().items()}
+
+
+def export_results(формат, results_df, статистика, гормон_номи):
+    """Натижаларни берилган форматда байтларга ёзиш"""
+    backend = get_backend(формат)
+    if backend is None:
+        raise ExportUnavailable(f"'{формат}' формати учун ёзувчи ўрнатилмаган")
+    return backend.write(results_df, статистика, гормон_номи)
@@ -0,0 +1,190 @@
+# kalibrovka/batch.py
+"""
+Кўп пластинали (batch) интерполяция
+
+Стандартлар N×k, беморлар N×m массивлар кўринишида берилади; қисқа
+пластиналар NaN билан тўлдирилади (padding).
+"""
+import numpy as np
+
+from .engine import УСУЛЛАР, ПАСТКИ, ЮКОРИ, fit_curve
+
+# Бир бўлакда ишланадиган бемор катаклари сони (кэшга сиғиши учун)
+_CHUNK_ELEMENTS = 1 << 14
+
+
+def _as_2d(a):
+    a = np.asarray(a, dtype=float)
+    if a.ndim == 1:
+        a = a[None, :]
+    if a.ndim != 2:
+        raise ValueError("Массив N×k шаклида бўлиши керак")
+    return a
+
+
+def _prepare_standards(оптик_стандарт, концентрация_стандарт):
+    """
+    Ҳар бир пластина стандартларини тартиблаш (NaN охирига тушади)
+
+    Қайтаради: x, y (N×k) ва ҳар пластинадаги ҳақиқий стандартлар сони.
+    """
+    x = _as_2d(оптик_стандарт)
+    y = _as_2d(концентрация_стандарт)
+    if x.shape != y.shape:
+        raise ValueError("Стандартлар массивлари шакли мос эмас")
+
+    # Концентрацияси йўқ стандартни ҳам padding деб ҳисоблаймиз
+    x = np.where(np.isnan(y), np.nan, x)
+    # Одатда стандартлар аллақачон ўсиш тартибида - argsort шарт эмас
+    # (NaN солиштирувда False беради, padding бор пластина тартибланади)
+    if not np.all(x[:, 1:] >= x[:, :-1]):
+        tartib = np.argsort(x, axis=1, kind='stable')
+        x = np.take_along_axis(x, tartib, axis=1)
+        y = np.take_along_axis(y, tartib, axis=1)
+    return x, y, np.count_nonzero(~np.isnan(x), axis=1)
+
+
+def _bounds(x, n_valid):
+    """Тартибланган стандартлардан ҳар пластина учун [min, max] оптик зичлик"""
+    rows = np.arange(x.shape[0])
+    max_val = np.where(n_valid > 0, x[rows, np.maximum(n_valid, 1) - 1], np.nan)
+    return x[:, 0], max_val
+
+
+def _linear_batch(x, y, n_valid, od):
+    """
+    Барча пластиналар учун чизиқли интерполяция/экстраполяция ва ҳолат
+
+    interp1d(kind='linear', fill_value="extrapolate") билан бит-бабит бир
+    хил натижа: ўша сегмент танланади ва амаллар ўша тартибда бажарилади.
+    """
+    N, k = x.shape
+    m = od.shape[1]
+    концентрация = np.empty(od.shape, dtype=float)
+    сақлаш_холати = np.empty(od.shape, dtype=np.int8)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = np.full(x.shape, np.nan)
+        slope[:, :-1] = (y[:, 1:] - y[:, :-1]) / (x[:, 1:] - x[:, :-1])
+    xf, yf, sf = x.ravel(), y.ravel(), slope.ravel()
+
+    min_val, max_val = _bounds(x, n_valid)
+    min_val, max_val = min_val[:, None], max_val[:, None]
+    last = (np.maximum(n_valid, 2) - 2)[:, None]
+    base = (np.arange(N, dtype=np.intp) * k)[:, None]
+    ҳисоблагич = np.int8 if k < 128 else np.intp
+
+    satr = max(1, _CHUNK_ELEMENTS // max(1, m))
+    # Солиштириш натижалари учун буфер - ҳар бўлакда қайта ажратилмайди
+    белги_буфер = np.empty((min(satr, N), m), dtype=bool)
+    for s in range(0, N, satr):
+        e = min(N, s + satr)
+        o = od[s:e]
+        xs = x[s:e]
+        белги = белги_буфер[:e - s]
+
+        # Сегмент индекси: searchsorted(side='left') ни 1..n-1 га қисиш
+        # билан бир хил, лекин k та вектор солиштириш орқали. Ҳисоблагич
+        # int8 да - intp дан 8 марта кам хотира ўтказади
+        lo = np.zeros(o.shape, dtype=ҳисоблагич)
+        for j in range(1, k - 1):
+            np.less(xs[:, j:j + 1], o, out=белги)
+            lo += белги
+        np.minimum(lo, last[s:e], out=lo, casting='unsafe')
+        lo = lo.astype(np.intp)
+        lo += base[s:e]
+
+        # Натижа тўғридан-тўғри чиқиш массивига ёзилади
+        натижа = концентрация[s:e]
+        np.take(xf, lo, out=натижа)
+        np.subtract(o, натижа, out=натижа)
+        натижа *= np.take(sf, lo)
+        натижа += np.take(yf, lo)
+
+        ҳолат = сақлаш_холати[s:e]
+        np.greater(o, max_val[s:e], out=ҳолат, casting='unsafe')
+        np.less(o, min_val[s:e], out=белги)
+        ҳолат -= белги
+
+    return концентрация, сақлаш_холати
+
+
+def classify_batch(оптик_стандарт, оптик_беморлар):
+    """
+    Ҳолат кодлари (N×m, int8): -1 пастки, 0 нормал, 1 юкори
+    """
+    x = _as_2d(оптик_стандарт)
+    od = _as_2d(оптик_беморлар)
+
+    # fmin/fmax padding (NaN) ни эътиборсиз қолдиради
+    min_val = np.fmin.reduce(x, axis=1)[:, None]
+    max_val = np.fmax.reduce(x, axis=1)[:, None]
+
+    сақлаш_холати = np.zeros(od.shape, dtype=np.int8)
+    сақлаш_холати[od < min_val] = ПАСТКИ
+    сақлаш_холати[od > max_val] = ЮКОРИ
+    return сақлаш_холати
+
+
+def interpolate_batch(оптик_стандарт, концентрация_стандарт, оптик_беморлар, усул='linear'):
+    """
+    N та пластинани битта ўтишда ҳисоблаш
+
+    Қайтаради: (концентрация N×m, сақлаш_холати N×m). Padding (NaN)
+    катаклари учун концентрация NaN бўлади. Иккитадан кам стандарти бор
+    пластина NaN қайтаради - бутун ишни тўхтатмайди.
+    """
+    if усул not in УСУЛЛАР:
+        raise ValueError("Номаълум интерполяция усули")
+
+    x, y, n_valid = _prepare_standards(оптик_стандарт, концентрация_стандарт)
+    od = _as_2d(оптик_беморлар)
+    if x.shape[0] != od.shape[0]:
+        raise ValueError("Стандартлар ва беморлар пластиналар сони мос эмас")
+
+    if усул == 'linear':
+        with np.errstate(invalid='ignore'):
+            концентрация, сақлаш_холати = _linear_batch(x, y, n_valid, od)
+        концентрация[n_valid < 2] = np.nan
+        return концентрация, сақлаш_холати
+
+    # Бошқа усуллар ҳар пластина учун алоҳида мосланади (кэш орқали)
+    концентрация = np.full(od.shape, np.nan)
+    for i, curve in enumerate(_fit_sorted(x, y, n_valid, усул)):
+        if curve is not None:
+            концентрация[i] = curve(od[i])
+
+    концентрация[np.isnan(od)] = np.nan
+    сақлаш_холати = classify_batch(x, od)
+
+    return концентрация, сақлаш_холати
+
+
+def _fit_sorted(x, y, n_valid, усул):
+    curves = []
+    бошланғич = энг_яхши_sse = None
+    for i in range(x.shape[0]):
+        n = n_valid[i]
+        try:
+            curve = fit_curve(x[i, :n], y[i, :n], усул, бошланғич, энг_яхши_sse) if n >= 2 else None
+        except ValueError:
+            curve = None
+        if curve is not None and curve.маълумот is not None and curve.маълумот.converged:
+            бошланғич = curve.параметрлар
+            sse = curve.маълумот.sse
+            энг_яхши_sse = sse if энг_яхши_sse is None else min(энг_яхши_sse, sse)
+        curves.append(curve)
+    return curves
+
+
+def fit_plates(оптик_стандарт, концентрация_стандарт, усул='linear'):
+    """
+    Ҳар бир пластина учун эгри чизиқ (мослаб бўлмаса None)
+
+    4PL/5PL учун олдинги пластинанинг параметрлари кейингисига илиқ старт
+    бўлади; мослаш вақти ва итерациялар curve.маълумот да.
+    """
+    if усул not in УСУЛЛАР:
+        raise ValueError("Номаълум интерполяция усули")
+
+    return _fit_sorted(*_prepare_standards(оптик_стандарт, концентрация_стандарт), усул)
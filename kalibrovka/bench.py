@@ -0,0 +1,360 @@
+# kalibrovka/bench.py
+"""
+Тезлик ўлчовлари (benchmark): интерполяция, batch, натижалар жадвали, график, Excel
+
+Синтетик пластиналар детерминистик (seed бўйича) яратилади. Натижа JSON
+кўринишида сақланади ва олдинги натижа (baseline) билан солиштирилади.
+
+    python -m kalibrovka bench --output bench.json
+    python -m kalibrovka bench --baseline bench.json
+"""
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from .engine import УСУЛЛАР, clear_curve_cache, fit_curve, интерполяция, статистика_ҳисоблаш
+
+BENCH_VERSION = 1
+
+DEFAULT_STANDARDS = (5, 8, 12)
+DEFAULT_SIZES = (10, 1_000, 100_000, 10_000_000)
+DEFAULT_REPEAT = 5
+
+# Солиштиришда рухсат этилган секинлашиш (0.25 = 25%)
+DEFAULT_TOLERANCE = 0.25
+
+# Бу ҳолатлар учун беморлар сонининг юқори чегараси: график браузерга
+# юборилади, Excel варағида эса 1 048 576 қатордан ортиқ бўлмайди
+CASE_LIMITS = {
+    "batch": 1_000_000,
+    "batch_loop": 1_000_000,
+    "plot": 1_000_000,
+    "excel": 1_048_575,
+}
+
+# batch ҳолатларида битта пластинадаги беморлар сони
+BATCH_WELLS = 96
+
+# Синтетик пластина учун 4PL "ҳақиқий" параметрлари: a, d, c, b
+_TRUE_PARAMS = (0.05, 2.5, 20.0, 1.2)
+
+
+def make_plate(n_standards, n_patients, seed=0):
+    """
+    Синтетик пластина: стандартлар ва беморлар оптик зичлиги
+
+    Стандартлар 4PL эгри чизиғидан олинади (концентрация 0.5..200,
+    логарифмик қадам) ва бироз шовқин қўшилади - барча усуллар учун
+    мос. Беморларнинг ~10% диапазондан ташқарида бўлади.
+    Қайтаради: (оптик_стандарт, концентрация_стандарт, оптик_беморлар).
+    """
+    rng = np.random.default_rng(seed)
+    a, d, c, b = _TRUE_PARAMS
+
+    концентрация = np.geomspace(0.5, 200.0, n_standards)
+    оптик = d + (a - d) / (1.0 + (концентрация / c) ** b)
+    оптик = оптик * (1.0 + rng.normal(0.0, 0.005, n_standards))
+    оптик = np.maximum.accumulate(оптик)
+
+    span = оптик[-1] - оптик[0]
+    беморлар = rng.uniform(оптик[0] - 0.05 * span, оптик[-1] + 0.05 * span, n_patients)
+    return оптик, концентрация, беморлар
+
+
+def _case_interpolate(plate, усул):
+    оптик, концентрация, беморлар = plate
+
+    def setup():
+        clear_curve_cache()
+
+    def run():
+        интерполяция(оптик, концентрация, беморлар, усул)
+
+    return setup, run
+
+
+def make_plates(plate, seed=0):
+    """
+    Бир пластинани BATCH_WELLS катакли N та пластинага бўлиш
+
+    Ҳар пластина стандартларига алоҳида шовқин қўшилади (эгри чизиқлар
+    ҳар хил бўлсин); охирги пластина NaN билан тўлдирилади.
+    Қайтаради: (оптик N×k, концентрация N×k, беморлар N×BATCH_WELLS).
+    """
+    оптик, концентрация, беморлар = plate
+    n = max(1, -(-len(беморлар) // BATCH_WELLS))
+    rng = np.random.default_rng(seed)
+
+    x = оптик * (1.0 + rng.normal(0.0, 0.005, (n, len(оптик))))
+    x = np.maximum.accumulate(x, axis=1)
+    y = np.broadcast_to(концентрация, x.shape)
+    od = np.full(n * BATCH_WELLS, np.nan)
+    od[:len(беморлар)] = беморлар
+    return x, y, od.reshape(n, BATCH_WELLS)
+
+
+def _case_batch(plate, усул):
+    from .batch import interpolate_batch
+
+    x, y, od = make_plates(plate)
+
+    def setup():
+        clear_curve_cache()
+
+    def run():
+        interpolate_batch(x, y, od, усул)
+
+    return setup, run
+
+
+def _case_batch_loop(plate, усул):
+    # Солиштириш учун: ўша пластиналар интерполяция билан биттадан
+    x, y, od = make_plates(plate)
+    rows = [(x[i], y[i], od[i][~np.isnan(od[i])]) for i in range(len(od))]
+
+    def setup():
+        clear_curve_cache()
+
+    def run():
+        for оптик, концентрация, беморлар in rows:
+            интерполяция(оптик, концентрация, беморлар, усул)
+
+    return setup, run
+
+
+def _case_results(plate, усул):
+    from .results import results_table
+
+    оптик, концентрация, беморлар = plate
+    натижа, ҳолат = интерполяция(оптик, концентрация, беморлар, усул)
+
+    def run():
+        results_table(беморлар, натижа, ҳолат, "нг/мл")
+
+    return None, run
+
+
+def _case_plot(plate, усул):
+    from .plot import create_calibration_plot
+
+    оптик, концентрация, беморлар = plate
+    curve = fit_curve(оптик, концентрация, усул)
+    натижа, ҳолат = интерполяция(оптик, концентрация, беморлар, усул)
+
+    def run():
+        create_calibration_plot(оптик, концентрация, беморлар, натижа,
+                                "Бенчмарк", "нг/мл", ҳолат, curve=curve).to_json()
+
+    return None, run
+
+
+def _case_excel(plate, усул):
+    from .export import export_to_excel
+    from .results import results_table
+
+    оптик, концентрация, беморлар = plate
+    натижа, ҳолат = интерполяция(оптик, концентрация, беморлар, усул)
+    results_df = results_table(беморлар, натижа, ҳолат, "нг/мл")
+    статистика = статистика_ҳисоблаш(ҳолат)
+
+    def run():
+        export_to_excel(results_df, статистика, "Бенчмарк")
+
+    return None, run
+
+
+# Ҳолат номи -> (plate, усул) дан (setup, run) қурувчи функция
+CASES = {
+    "interpolate": _case_interpolate,
+    "batch": _case_batch,
+    "batch_loop": _case_batch_loop,
+    "results": _case_results,
+    "plot": _case_plot,
+    "excel": _case_excel,
+}
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q))
+
+
+def _peak_memory_mb(setup, run):
+    """Битта ишга туширишда Python/NumPy ажратган хотира чўққиси (МБ)"""
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def measure(setup, run, n_patients, repeat=DEFAULT_REPEAT, memory=True):
+    """
+    Битта ҳолатни ўлчаш
+
+    Вақт tracemalloc'сиз ўлчанади; хотира чўққиси алоҳида ишга туширишда
+    олинади. setup() ҳар бир такрордан олдин чақирилади ва вақтга
+    қўшилмайди.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    median = _percentile(times, 50)
+    return {
+        "repeat": repeat,
+        "min_s": min(times),
+        "mean_s": float(np.mean(times)),
+        "p50_s": median,
+        "p90_s": _percentile(times, 90),
+        "p99_s": _percentile(times, 99),
+        "rows_per_second": n_patients / median if median > 0 else None,
+        "peak_mb": _peak_memory_mb(setup, run) if memory else None,
+    }
+
+
+def _environment():
+    import importlib.metadata as metadata
+
+    versions = {}
+    for package in ("numpy", "scipy", "pandas", "plotly", "xlsxwriter"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "packages": versions,
+    }
+
+
+def run_suite(cases=None, methods=None, standards=DEFAULT_STANDARDS, sizes=DEFAULT_SIZES,
+              repeat=DEFAULT_REPEAT, seed=0, memory=True, progress=None):
+    """
+    Барча ҳолат × усул × стандартлар сони × беморлар сони комбинацияларини ўлчаш
+
+    progress(result) ҳар бир ўлчовдан кейин чақирилади (масалан, чоп этиш
+    учун). Бажариб бўлмайдиган комбинациялар "skipped" сабаби билан
+    ёзилади.
+    """
+    cases = list(cases or CASES)
+    methods = list(methods or УСУЛЛАР)
+    for name in cases:
+        if name not in CASES:
+            raise ValueError(f"Номаълум ҳолат: {name}")
+    for усул in methods:
+        if усул not in УСУЛЛАР:
+            raise ValueError(f"Номаълум интерполяция усули: {усул}")
+
+    results = []
+    for n_patients in sizes:
+        for n_standards in standards:
+            plate = make_plate(n_standards, n_patients, seed)
+            for name in cases:
+                for усул in methods:
+                    result = {
+                        "case": name,
+                        "method": усул,
+                        "standards": n_standards,
+                        "patients": n_patients,
+                    }
+                    limit = CASE_LIMITS.get(name)
+                    if limit is not None and n_patients > limit:
+                        result["skipped"] = f"беморлар сони {limit} дан кўп"
+                    else:
+                        try:
+                            setup, run = CASES[name](plate, усул)
+                            result.update(measure(setup, run, n_patients, repeat, memory))
+                        except (ImportError, ValueError) as e:
+                            result["skipped"] = f"{type(e).__name__}: {e}"
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+            del plate
+
+    return {
+        "version": BENCH_VERSION,
+        "created": datetime.now().isoformat(),
+        "seed": seed,
+        "environment": _environment(),
+        "results": results,
+    }
+
+
+def _key(result):
+    return (result["case"], result["method"], result["standards"], result["patients"])
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Жорий ўлчовларни baseline билан солиштириш
+
+    Медиана вақти ёки хотира чўққиси (1+tolerance) мартадан кўп ошган
+    комбинациялар регрессия ҳисобланади. Қайтаради: луғатлар рўйхати
+    (регрессиялар олдин).
+    """
+    old = {_key(r): r for r in baseline["results"] if "skipped" not in r}
+    rows = []
+    for r in current["results"]:
+        base = old.get(_key(r))
+        if base is None or "skipped" in r:
+            continue
+        time_ratio = r["p50_s"] / base["p50_s"] if base["p50_s"] > 0 else None
+        memory_ratio = None
+        if r.get("peak_mb") and base.get("peak_mb"):
+            memory_ratio = r["peak_mb"] / base["peak_mb"]
+        regression = any(
+            ratio is not None and ratio > 1.0 + tolerance
+            for ratio in (time_ratio, memory_ratio)
+        )
+        rows.append({
+            "case": r["case"],
+            "method": r["method"],
+            "standards": r["standards"],
+            "patients": r["patients"],
+            "p50_s": r["p50_s"],
+            "baseline_p50_s": base["p50_s"],
+            "time_ratio": time_ratio,
+            "memory_ratio": memory_ratio,
+            "regression": regression,
+        })
+    rows.sort(key=lambda row: not row["regression"])
+    return rows
+
+
+def save_results(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_result(result):
+    """Битта ўлчов учун қисқа матн қатори"""
+    head = f"{result['case']:<12} {result['method']:<10} {result['standards']:>3} ст. {result['patients']:>10} бем."
+    if "skipped" in result:
+        return f"{head}  ўтказиб юборилди ({result['skipped']})"
+    speed = result["rows_per_second"]
+    peak = result["peak_mb"]
+    return (
+        f"{head}  p50 {result['p50_s'] * 1000:10.2f} мс"
+        f"  p90 {result['p90_s'] * 1000:10.2f} мс"
+        f"  {speed:14,.0f} қатор/с"
+        + (f"  {peak:9.1f} МБ" if peak is not None else "")
+    )
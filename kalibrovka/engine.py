@@ -0,0 +1,292 @@
+# kalibrovka/engine.py
+"""
+Калибровка ҳисоблаш ядроси: мослаш, баҳолаш, таснифлаш
+"""
+import hashlib
+from dataclasses import dataclass, field
+from functools import partial
+
+import numpy as np
+
+from .cache import LRUCache
+from .instrument import count, timed
+from .logistic import ЛОГИСТИК_УСУЛЛАР, fit_logistic, logistic_inverse
+
+# Интерполяция усуллари (UI'даги selectbox тартибида)
+УСУЛЛАР = ("linear", "spline", "quadratic") + ЛОГИСТИК_УСУЛЛАР
+
+# Ҳолат кодлари
+ПАСТКИ = -1
+НОРМАЛ = 0
+ЮКОРИ = 1
+
+ҲОЛАТ_НОМЛАРИ = {
+    НОРМАЛ: "✅ Нормал",
+    ПАСТКИ: "⚠️ Пастки",
+    ЮКОРИ: "⚠️ Юкори",
+}
+
+# Кэшда сақланадиган эгри чизиқлар сони
+CURVE_CACHE_SIZE = 256
+
+# interp1d учун kind қийматлари (linear - ўз ядроси, SciPy'сиз)
+_INTERP_KIND = {
+    "spline": "cubic",
+    "quadratic": "quadratic",
+}
+
+
+class LinearInterpolator:
+    """
+    Бўлакли-чизиқли интерполяция ва четки сегментлар бўйича экстраполяция
+
+    interp1d(kind='linear', fill_value="extrapolate") билан бит-бабит бир
+    хил натижа: ўша сегмент танланади ва амаллар ўша тартибда бажарилади.
+    Объект яратиш фақат қиялик массивини ҳисоблайди - кичик пластиналар
+    учун interp1d текширувларидан анча тез.
+    """
+    __slots__ = ("x", "y", "slope", "_ички")
+
+    def __init__(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if x.shape != y.shape or x.ndim != 1:
+            raise ValueError("Стандартлар массивлари шакли мос эмас")
+        if x.size < 2:
+            raise ValueError("Чизиқли интерполяция учун камида 2 та стандарт керак")
+        self.x = x
+        self.y = y
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.slope = (y[1:] - y[:-1]) / (x[1:] - x[:-1])
+        # Ички тугунлар бўйича searchsorted сегмент индексини дарҳол 0..n-2
+        # оралиғида беради - interp1d'даги clip(1, n-1) - 1 билан бир хил
+        self._ички = x[1:-1]
+
+    def __call__(self, x_new):
+        x_new = np.asarray(x_new, dtype=float)
+        lo = np.searchsorted(self._ички, x_new)
+        # Такрорланган OD'лар (нол кенгликдаги сегмент) - inf/NaN, огоҳлантиришсиз
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.asarray(np.take(self.slope, lo) * (x_new - np.take(self.x, lo)) + np.take(self.y, lo))
+
+
+@dataclass(frozen=True)
+class CalibrationCurve:
+    """
+    Мосланган калибровка қийшиқ чизиғи
+
+    Тартибланган оптик зичлик/концентрация жуфтлари ва усул - ўзгармас
+    ва hash қилинадиган объект. Интерполятор биринчи чақирувда бир марта
+    қурилади ва кейинги баҳолашларда қайта ишлатилади.
+
+    4PL/5PL учун параметрлар объект яратилганда мосланади; параметрлар ва
+    мослаш маълумоти солиштиришда ҳисобга олинмайди.
+    """
+    оптик: tuple
+    концентрация: tuple
+    усул: str = 'linear'
+    параметрлар: tuple = field(default=None, compare=False)
+    маълумот: object = field(default=None, repr=False, compare=False, hash=False)
+    _f: object = field(default=None, init=False, repr=False, compare=False, hash=False)
+
+    @classmethod
+    def from_standards(cls, оптик_зичлик_стандарт, концентрация_стандарт, усул='linear', бошланғич=None,
+                       энг_яхши_sse=None):
+        """
+        Стандартларни тартиблаб, эгри чизиқ объектини яратиш
+
+        бошланғич - логистик усуллар учун илиқ старт параметрлари;
+        энг_яхши_sse - олдинги пластиналардаги энг кичик SSE (fit_logistic).
+        """
+        if усул not in УСУЛЛАР:
+            raise ValueError("Номаълум интерполяция усули")
+
+        x, y = _тартиблаш(оптик_зичлик_стандарт, концентрация_стандарт)
+        if усул in ЛОГИСТИК_УСУЛЛАР:
+            натижа = fit_logistic(y, x, усул, бошланғич, энг_яхши_sse=энг_яхши_sse)
+            return cls(tuple(x.tolist()), tuple(y.tolist()), усул,
+                       натижа.параметрлар, натижа.маълумот)
+        return cls(tuple(x.tolist()), tuple(y.tolist()), усул)
+
+    @property
+    def логистик(self):
+        return self.усул in ЛОГИСТИК_УСУЛЛАР
+
+    @property
+    def калит(self):
+        """Стандартлар ва усул бўйича контент hash"""
+        return standards_hash(self.оптик, self.концентрация, self.усул)
+
+    @property
+    def min_od(self):
+        return self.оптик[0] if self.оптик else np.nan
+
+    @property
+    def max_od(self):
+        return self.оптик[-1] if self.оптик else np.nan
+
+    def _interpolator(self):
+        f = self._f
+        if f is None and self.логистик:
+            f = partial(logistic_inverse, self.параметрлар)
+            object.__setattr__(self, '_f', f)
+        elif f is None and self.усул == 'linear':
+            f = LinearInterpolator(self.оптик, self.концентрация)
+            object.__setattr__(self, '_f', f)
+        elif f is None:
+            # SciPy фақат spline/quadratic учун керак - импорт вақтида юкланмайди
+            from scipy.interpolate import interp1d
+
+            f = interp1d(
+                np.asarray(self.оптик, dtype=float),
+                np.asarray(self.концентрация, dtype=float),
+                kind=_INTERP_KIND[self.усул],
+                fill_value="extrapolate",
+            )
+            object.__setattr__(self, '_f', f)
+        return f
+
+    def __call__(self, оптик_зичлик_беморлар):
+        """Концентрацияни ҳисоблаш"""
+        return self._interpolator()(np.asarray(оптик_зичлик_беморлар, dtype=float))
+
+    def classify(self, оптик_зичлик_беморлар):
+        """Беморлар ҳолатини стандартлар диапазонига нисбатан аниқлаш"""
+        return classify(self.оптик, оптик_зичлик_беморлар)
+
+
+def _тартиблаш(оптик_зичлик_стандарт, концентрация_стандарт):
+    """Стандартларни оптик зичлик бўйича тартиблаш"""
+    x = np.asarray(оптик_зичлик_стандарт, dtype=float)
+    y = np.asarray(концентрация_стандарт, dtype=float)
+    tartib = np.argsort(x, kind='stable')
+    return x[tartib], y[tartib]
+
+
+def standards_hash(оптик_зичлик_стандарт, концентрация_стандарт, усул=''):
+    """
+    Стандартлар (тартибланган ҳолда) ва усул бўйича контент hash
+    """
+    x, y = _тартиблаш(оптик_зичлик_стандарт, концентрация_стандарт)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(усул.encode('utf-8'))
+    h.update(b'\0')
+    h.update(x.tobytes())
+    h.update(y.tobytes())
+    return h.hexdigest()
+
+
+def content_hash(*parts):
+    """
+    Ихтиёрий маълумотлар учун контент hash
+
+    Сонлар/массивлар float64 байтлари, матнлар UTF-8 кўринишида
+    ҳисобга олинади. Маълумот ўзгарганини аниқлаш учун ишлатилади.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            h.update(b's')
+            h.update(part.encode('utf-8'))
+        elif part is None:
+            h.update(b'n')
+        else:
+            a = np.asarray(part, dtype=float)
+            h.update(b'a')
+            h.update(str(a.shape).encode('ascii'))
+            h.update(np.ascontiguousarray(a).tobytes())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+_curve_cache = LRUCache(CURVE_CACHE_SIZE)
+
+
+def fit_curve(оптик_зичлик_стандарт, концентрация_стандарт, усул='linear', бошланғич=None,
+              энг_яхши_sse=None):
+    """
+    Стандартлар бўйича калибровка эгри чизиғини олиш
+
+    Бир хил стандартлар ва усул учун кэшдаги тайёр объект қайтарилади.
+    бошланғич - 4PL/5PL учун олдинги пластина параметрлари (илиқ старт),
+    энг_яхши_sse - олдинги пластиналардаги энг кичик SSE. Илиқ стартли
+    мослаш олдинги пластинага боғлиқ - у кэшга ёзилмайди (кэшда совуқ
+    мослаш бўлса ўша қайтарилади).
+    """
+    if усул not in УСУЛЛАР:
+        raise ValueError("Номаълум интерполяция усули")
+
+    def fit():
+        curve = CalibrationCurve.from_standards(оптик_зичлик_стандарт, концентрация_стандарт, усул, бошланғич,
+                                                энг_яхши_sse)
+        curve._interpolator()
+        count("curve_fits")
+        return curve
+
+    калит = standards_hash(оптик_зичлик_стандарт, концентрация_стандарт, усул)
+    if бошланғич is not None and усул in ЛОГИСТИК_УСУЛЛАР:
+        curve = _curve_cache.get(калит)
+        return curve if curve is not None else fit()
+    return _curve_cache.get_or_create(калит, fit)
+
+
+def curve_cache_info():
+    """Эгри чизиқлар кэши статистикаси"""
+    return _curve_cache.info()
+
+
+def clear_curve_cache():
+    """Эгри чизиқлар кэшини тозалаш"""
+    _curve_cache.clear()
+
+
+def evaluate(f, оптик_зичлик_беморлар):
+    """
+    Калибровка функцияси орқали концентрацияни ҳисоблаш
+    """
+    return f(np.asarray(оптик_зичлик_беморлар, dtype=float))
+
+
+def classify(оптик_зичлик_стандарт, оптик_зичлик_беморлар):
+    """
+    Беморлар ҳолатини аниқлаш: -1 пастки, 0 нормал, 1 юкори диапазон
+    """
+    оптик_зичлик_стандарт = np.asarray(оптик_зичлик_стандарт, dtype=float)
+    оптик_зичлик_беморлар = np.asarray(оптик_зичлик_беморлар, dtype=float)
+
+    сақлаш_холати = np.zeros(оптик_зичлик_беморлар.shape, dtype=int)
+    if len(оптик_зичлик_стандарт) > 0:
+        min_val = оптик_зичлик_стандарт.min()
+        max_val = оптик_зичлик_стандарт.max()
+        сақлаш_холати[оптик_зичлик_беморлар < min_val] = ПАСТКИ
+        сақлаш_холати[оптик_зичлик_беморлар > max_val] = ЮКОРИ
+
+    return сақлаш_холати
+
+
+@timed("interpolate")
+def интерполяция(оптик_зичлик_стандарт, концентрация_стандарт, оптик_зичлик_беморлар, усул='linear'):
+    """
+    Интерполяция функцияси
+
+    Хатолик бўлса ValueError кўтарилади - UI уни ўзи кўрсатади.
+    """
+    curve = fit_curve(оптик_зичлик_стандарт, концентрация_стандарт, усул)
+    концентрация_беморлар = curve(оптик_зичлик_беморлар)
+    сақлаш_холати = curve.classify(оптик_зичлик_беморлар)
+
+    return концентрация_беморлар, сақлаш_холати
+
+
+def статистика_ҳисоблаш(сақлаш_холати):
+    """
+    Ҳолатлар бўйича статистика
+    """
+    сақлаш_холати = np.asarray(сақлаш_холати)
+
+    return {
+        "Жами беморлар": int(сақлаш_холати.size),
+        "Нормал диапазонда": int(np.sum(сақлаш_холати == НОРМАЛ)),
+        "Пастки диапазон": int(np.sum(сақлаш_холати == ПАСТКИ)),
+        "Юкори диапазон": int(np.sum(сақлаш_холати == ЮКОРИ)),
+    }
@@ -0,0 +1,293 @@
+# kalibrovka/export.py
+"""
+Натижаларни экспорт қилиш: CSV, Excel, JSON конфигурация
+
+pandas, xlsxwriter ва openpyxl функциялар ичида юкланади; қайси ёзувчи
+мавжудлиги backends модулида бир марта аниқланади.
+"""
+import io
+import json
+import math
+from datetime import datetime
+
+from .cache import LRUCache
+from .instrument import timed
+
+# Хотирада сақланадиган экспорт файллари сони
+ARTIFACT_CACHE_SIZE = 32
+
+_artifact_cache = LRUCache(ARTIFACT_CACHE_SIZE)
+
+
+class ConfigError(ValueError):
+    """Конфигурация схемага мос эмас"""
+
+
+def cached_artifact(калит, формат, builder):
+    """
+    Экспорт файлини натижа hash'и бўйича бир марта қуриш
+
+    builder() фақат шу калит ва формат учун файл ҳали қурилмаган бўлса
+    чақирилади; кейинги сўровлар тайёр байтларни олади.
+    """
+    return _artifact_cache.get_or_create((калит, формат), builder)
+
+
+def check_excel_support():
+    """Excel экспортни қўллаб-қувватлашни текшириш (натижа кэшланган)"""
+    from .backends import get_backend
+
+    return get_backend("xlsx") is not None
+
+
+@timed("export_csv")
+def export_to_csv(results_df):
+    """CSV байтлари (Excel учун BOM билан, концентрациялар "%.4f" / "N/A")"""
+    from .results import formatted_table
+
+    return formatted_table(results_df).to_csv(index=False).encode('utf-8-sig')
+
+
+def _column_values(series):
+    """
+    Устун қийматлари: сонлар сон бўлиб, қолганлари матн бўлиб ёзилади
+
+    NaN катаклар "N/A" матни бўлади.
+    """
+    from .results import MISSING_TEXT
+
+    if series.dtype.kind == 'f':
+        return [MISSING_TEXT if v != v else v for v in series.tolist()]
+    if series.dtype.kind in 'biu':
+        return series.tolist()
+    return series.astype(str).tolist()
+
+
+@timed("export_excel")
+def export_to_excel(results_df, статистика, гормон_номи):
+    """
+    Excel файл яратиш
+
+    Маълумотлар устун-устун ёзилади; ҳолат ранглари ҳар бир катак учун
+    эмас, бутун устунга шартли формат қоидалари билан берилади.
+    xlsxwriter бўлмаса ImportError кўтарилади.
+    """
+    import xlsxwriter
+
+    from .results import concentration_columns, status_columns
+
+    output = io.BytesIO()
+
+    workbook = xlsxwriter.Workbook(output, {'in_memory': True, 'nan_inf_to_errors': True})
+    try:
+        # Сарлавҳа формати
+        header_format = workbook.add_format({
+            'bold': True,
+            'border': 1,
+            'bg_color': '#2E86AB',
+            'color': 'white',
+            'align': 'center'
+        })
+
+        # Ҳолат формати (шартли форматлаш учун фақат ранг ва чегара)
+        normal_format = workbook.add_format({
+            'bg_color': '#d4edda',
+            'border': 1
+        })
+
+        warning_format = workbook.add_format({
+            'bg_color': '#fff3cd',
+            'border': 1
+        })
+
+        center_format = workbook.add_format({'align': 'center'})
+        concentration_format = workbook.add_format({'num_format': '0.0000'})
+
+        # Натижаларни ёзиш
+        worksheet = workbook.add_worksheet('Натижалар')
+        worksheet.write_row(0, 0, [str(c) for c in results_df.columns], header_format)
+        for col_num, column in enumerate(results_df.columns):
+            worksheet.write_column(1, col_num, _column_values(results_df[column]))
+
+        # Концентрациялар сон бўлиб қолади, кўриниши катак формати орқали
+        for column in concentration_columns(results_df):
+            col_idx = results_df.columns.get_loc(column)
+            worksheet.set_column(col_idx, col_idx, 18, concentration_format)
+
+        # Ҳолатларга ранг бериш - ҳар бир катакни қайта ёзиш ўрнига
+        # бутун устун учун иккита шартли формат қоидаси
+        for column in status_columns(results_df) if len(results_df) > 0 else []:
+            col_idx = results_df.columns.get_loc(column)
+            last_row = len(results_df)
+            worksheet.set_column(col_idx, col_idx, 14, center_format)
+            worksheet.conditional_format(1, col_idx, last_row, col_idx, {
+                'type': 'text',
+                'criteria': 'containing',
+                'value': '✅',
+                'format': normal_format
+            })
+            worksheet.conditional_format(1, col_idx, last_row, col_idx, {
+                'type': 'text',
+                'criteria': 'containing',
+                'value': '⚠️',
+                'format': warning_format
+            })
+
+        # Статистикани ёзиш
+        stats_sheet = workbook.add_worksheet('Статистика')
+        stats_sheet.write_row(0, 0, ['Параметр', 'Қиймат'], header_format)
+        stats_sheet.write_column(1, 0, list(статистика.keys()))
+        stats_sheet.write_column(1, 1, list(статистика.values()))
+    finally:
+        workbook.close()
+
+    return output.getvalue()
+
+
+@timed("export_excel")
+def export_to_excel_openpyxl(results_df, статистика, гормон_номи):
+    """
+    Excel файл яратиш (openpyxl орқали - xlsxwriter бўлмаганда)
+
+    Формат xlsxwriter вариантидаги билан бир хил: ҳолат ранглари устун
+    бўйича шартли формат қоидалари.
+    """
+    from openpyxl import Workbook
+    from openpyxl.formatting.rule import Rule
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.styles.differential import DifferentialStyle
+    from openpyxl.utils import get_column_letter
+
+    from .results import concentration_columns, status_columns
+
+    workbook = Workbook()
+    border = Border(*(Side(style='thin'),) * 4)
+    header_fill = PatternFill('solid', start_color='2E86AB', end_color='2E86AB')
+    header_font = Font(bold=True, color='FFFFFF')
+
+    def write_header(sheet, names):
+        sheet.append(names)
+        for cell in sheet[1]:
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.border = border
+            cell.alignment = Alignment(horizontal='center')
+
+    # Натижаларни ёзиш
+    worksheet = workbook.active
+    worksheet.title = 'Натижалар'
+    write_header(worksheet, [str(c) for c in results_df.columns])
+    columns = [_column_values(results_df[c]) for c in results_df.columns]
+    for row in zip(*columns):
+        worksheet.append(row)
+
+    # Концентрациялар сон бўлиб қолади, кўриниши катак формати орқали
+    for column in concentration_columns(results_df):
+        col_num = results_df.columns.get_loc(column) + 1
+        worksheet.column_dimensions[get_column_letter(col_num)].width = 18
+        for (cell,) in worksheet.iter_rows(min_row=2, min_col=col_num, max_col=col_num):
+            cell.number_format = '0.0000'
+
+    # Ҳолатларга ранг бериш
+    for column in status_columns(results_df) if len(results_df) > 0 else []:
+        letter = get_column_letter(results_df.columns.get_loc(column) + 1)
+        cells = f"{letter}2:{letter}{len(results_df) + 1}"
+        for text, color in (('✅', 'D4EDDA'), ('⚠️', 'FFF3CD')):
+            style = DifferentialStyle(
+                fill=PatternFill('solid', start_color=color, end_color=color, bgColor=color),
+                border=border
+            )
+            rule = Rule(type='containsText', operator='containsText', text=text, dxf=style)
+            rule.formula = [f'NOT(ISERROR(SEARCH("{text}",{letter}2)))']
+            worksheet.conditional_formatting.add(cells, rule)
+
+    # Статистикани ёзиш
+    stats_sheet = workbook.create_sheet('Статистика')
+    write_header(stats_sheet, ['Параметр', 'Қиймат'])
+    for item in статистика.items():
+        stats_sheet.append(list(item))
+
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def build_config(гормон_номи, улчов_бирлиги, стандартлар, беморлар, усул, сақлаш_вақти=None, лот=None):
+    """JSON конфигурация луғати (Экспорт бўлимидаги шакл; лот ихтиёрий)"""
+    config_data = {
+        "гормон_номи": гормон_номи,
+        "улчов_бирлиги": улчов_бирлиги,
+        "стандартлар": стандартлар,
+        "беморлар": беморлар,
+        "интерполяция_усули": усул,
+        "сақлаш_вақти": сақлаш_вақти or datetime.now().isoformat()
+    }
+    if лот:
+        config_data["лот"] = лот
+    return config_data
+
+
+def config_to_json(config_data):
+    """Конфигурацияни JSON матнига ўтказиш"""
+    return json.dumps(config_data, indent=2, ensure_ascii=False)
+
+
+def load_config(path):
+    """JSON конфигурация файлини ўқиш"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _is_number(value):
+    # bool int'нинг вориси - JSON'даги true/false сон эмас
+    return type(value) is float or type(value) is int
+
+
+def validate_config(config_data):
+    """
+    Конфигурация схемасини текшириш (Экспорт бўлимидаги шакл)
+
+    Мажбурий: стандартлар (камида 2 та [оптик, концентрация] жуфтлиги,
+    чекли сонлар) ва беморлар (сонлар рўйхати). Матн майдонлари ва
+    интерполяция усули берилган бўлса текширилади. Хато бўлса биринчи
+    топилган муаммо билан ConfigError. Қайтаради: config_data.
+    """
+    from .engine import УСУЛЛАР
+
+    if not isinstance(config_data, dict):
+        raise ConfigError("JSON объект кутилган эди")
+    for майдон in ("стандартлар", "беморлар"):
+        if майдон not in config_data:
+            raise ConfigError(f"Майдон йўқ: {майдон}")
+    for майдон in ("гормон_номи", "улчов_бирлиги", "лот", "сақлаш_вақти"):
+        if not isinstance(config_data.get(майдон) or "", str):
+            raise ConfigError(f"{майдон} матн бўлиши керак")
+
+    усул = config_data.get("интерполяция_усули", "linear")
+    if усул not in УСУЛЛАР:
+        raise ConfigError(f"Номаълум интерполяция усули: {усул}")
+
+    стандартлар = config_data["стандартлар"]
+    if not isinstance(стандартлар, list) or not all(
+        isinstance(x, list) and len(x) == 2 and _is_number(x[0]) and _is_number(x[1])
+        and math.isfinite(x[0]) and math.isfinite(x[1])
+        for x in стандартлар
+    ):
+        raise ConfigError("Стандартлар [[оптик, концентрация], ...] кўринишидаги чекли сонлар бўлиши керак")
+    if len(стандартлар) < 2:
+        raise ConfigError("Камида 2 та стандарт керак")
+
+    беморлар = config_data["беморлар"]
+    if not isinstance(беморлар, list) or not all(map(_is_number, беморлар)):
+        raise ConfigError("Беморлар сонлар рўйхати бўлиши керак")
+    return config_data
+
+
+def curve_from_config(config_data, усул=None):
+    """Конфигурациядаги стандартлар бўйича калибровка эгри чизиғи"""
+    from .engine import fit_curve
+
+    стандартлар = config_data["стандартлар"]
+    оптик = [x[0] for x in стандартлар]
+    концентрация = [x[1] for x in стандартлар]
+    return fit_curve(оптик, концентрация, усул or config_data.get("интерполяция_усули", "linear"))
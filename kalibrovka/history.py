@@ -0,0 +1,424 @@
+# kalibrovka/history.py
+"""
+Ўтган ҳисоблашлар тарихи (SQLite, индексланган сўровлар)
+
+Ҳар бир ҳисоблаш (run) учун стандартлар, мосланган параметрлар,
+беморлар натижалари ва ҳолатлар статистикаси сақланади. Сўровлар
+гормон, сана, лот ва ҳолат улуши бўйича индекслардан ўтади, масалан:
+"ўтган ойдаги Юкори 10% дан кўп бўлган барча TSH ҳисоблашлари".
+
+Ёзиш ҳисоблаш йўлини секинлаштирмайди: record() ёзувни навбатга қўяди,
+алоҳида thread уларни бўлаклаб (битта транзакцияда) ёзади. Ўқиш ҳар бир
+thread'нинг ўз уланиши орқали (WAL режими - ёзиш ўқишни тўсмайди).
+
+    HORMON_HISTORY_DB   база файли (берилмаса тарих ўчиқ)
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+from .engine import ПАСТКИ, НОРМАЛ, ЮКОРИ, статистика_ҳисоблаш
+from .instrument import count
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+# Битта транзакциядаги энг кўп ҳисоблашлар сони
+BATCH_SIZE = 256
+
+# Навбатдаги ёзувлар шу вақтдан (с) кўп кутмайди
+FLUSH_INTERVAL = 1.0
+
+# Сўров натижасидаги қаторлар чегараси (стандарт)
+DEFAULT_LIMIT = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id            INTEGER PRIMARY KEY,
+    created       REAL NOT NULL,
+    hormone       TEXT NOT NULL,
+    unit          TEXT NOT NULL,
+    lot           TEXT NOT NULL,
+    method        TEXT NOT NULL,
+    source        TEXT,
+    result_key    TEXT,
+    standards     TEXT NOT NULL,
+    params        TEXT,
+    n_total       INTEGER NOT NULL,
+    n_normal      INTEGER NOT NULL,
+    n_low         INTEGER NOT NULL,
+    n_high        INTEGER NOT NULL,
+    low_fraction  REAL NOT NULL,
+    high_fraction REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_hormone_created ON runs (hormone, created, high_fraction, low_fraction);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+CREATE INDEX IF NOT EXISTS runs_lot ON runs (lot, created);
+CREATE INDEX IF NOT EXISTS runs_high ON runs (high_fraction);
+CREATE INDEX IF NOT EXISTS runs_low ON runs (low_fraction);
+
+CREATE TABLE IF NOT EXISTS results (
+    run_id  INTEGER NOT NULL,
+    well    INTEGER NOT NULL,
+    od      REAL,
+    conc    REAL,
+    status  INTEGER NOT NULL,
+    PRIMARY KEY (run_id, well)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_flagged ON results (status, run_id) WHERE status != 0;
+"""
+
+_RUN_COLUMNS = ("id", "created", "hormone", "unit", "lot", "method", "source", "result_key",
+                "n_total", "n_normal", "n_low", "n_high", "low_fraction", "high_fraction")
+
+_ҲОЛАТ_КОДЛАРИ = {"low": ПАСТКИ, "normal": НОРМАЛ, "high": ЮКОРИ}
+
+
+@dataclass
+class RunRecord:
+    """Тарихга ёзиладиган битта ҳисоблаш"""
+    гормон_номи: str
+    улчов_бирлиги: str
+    лот: str
+    усул: str
+    стандартлар: list
+    оптик_зичлик: np.ndarray
+    концентрация: np.ndarray
+    сақлаш_холати: np.ndarray
+    параметрлар: dict = None
+    манба: str = None
+    натижа_калити: str = None
+    вақт: float = None
+
+    @classmethod
+    def from_result(cls, натижа, гормон_номи, лот="", манба=None, натижа_калити=None, вақт=None):
+        """Омбордаги натижадан (StoredResult)"""
+        return cls(
+            гормон_номи, натижа.улчов_бирлиги, лот, натижа.усул,
+            np.column_stack([натижа.оптик_зичлик_стандарт, натижа.концентрация_стандарт]).tolist(),
+            натижа.оптик_зичлик_беморлар, натижа.концентрация_беморлар, натижа.сақлаш_холати,
+            curve_params(натижа.эгри_чизиқ), манба, натижа_калити, вақт,
+        )
+
+    @classmethod
+    def from_plate(cls, plate, вақт=None):
+        """Қайта ҳисобланган пластинадан (reprocess.PlateResult)"""
+        return cls(
+            plate.гормон_номи, plate.улчов_бирлиги, plate.лот, plate.усул,
+            [list(map(float, x)) for x in plate.стандартлар],
+            plate.оптик_зичлик, plate.концентрация, plate.сақлаш_холати,
+            манба=plate.номи, вақт=вақт if вақт is not None else plate.сақлаш_вақти,
+        )
+
+
+def curve_params(curve):
+    """Эгри чизиқнинг мосланган параметрлари ва мослаш маълумоти (JSON учун)"""
+    if curve is None or curve.параметрлар is None:
+        return None
+    маълумот = curve.маълумот
+    return {
+        "параметрлар": [float(p) for p in curve.параметрлар],
+        "маълумот": asdict(маълумот) if маълумот is not None else None,
+    }
+
+
+def _timestamp(value):
+    """None, unix вақт, datetime, date ёки ISO матн -> unix вақт"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime.combine(value, datetime.min.time())
+    return value.timestamp()
+
+
+def _record_time(value):
+    """Ёзув вақти; ўқиб бўлмаса (масалан, "01.05.2024") - жорий вақт"""
+    try:
+        вақт = _timestamp(value)
+    except (TypeError, ValueError, OverflowError, OSError):
+        logger.warning("Ҳисоблаш вақти ўқилмади (%r) - жорий вақт ёзилади", value)
+        вақт = None
+    return вақт or time.time()
+
+
+def _row(record):
+    """runs жадвали қатори ва беморлар қаторлари"""
+    сақлаш_холати = np.asarray(record.сақлаш_холати, dtype=np.int8)
+    статистика = статистика_ҳисоблаш(сақлаш_холати)
+    жами = статистика["Жами беморлар"]
+    пастки = статистика["Пастки диапазон"]
+    юкори = статистика["Юкори диапазон"]
+    run = (
+        _record_time(record.вақт),
+        (record.гормон_номи or "").strip(),
+        (record.улчов_бирлиги or "").strip(),
+        (record.лот or "").strip(),
+        record.усул,
+        record.манба,
+        record.натижа_калити,
+        json.dumps(record.стандартлар),
+        json.dumps(record.параметрлар, ensure_ascii=False) if record.параметрлар is not None else None,
+        жами,
+        статистика["Нормал диапазонда"],
+        пастки,
+        юкори,
+        пастки / жами if жами else 0.0,
+        юкори / жами if жами else 0.0,
+    )
+    # NaN концентрация SQLite'да NULL бўлиб сақланади
+    wells = list(zip(
+        range(1, жами + 1),
+        np.asarray(record.оптик_зичлик, dtype=float).tolist(),
+        np.asarray(record.концентрация, dtype=float).tolist(),
+        сақлаш_холати.tolist(),
+    ))
+    return run, wells
+
+
+class RunHistory:
+    """
+    Ҳисоблашлар тарихи: навбат орқали бўлаклаб ёзиш, индексланган ўқиш
+
+    record() дарҳол қайтади; flush() навбатдагилар ёзилгунча кутади.
+    Ёзиш хатоси ҳисоблашни тўхтатмайди - логга ёзилади ва errors
+    ҳисоблагичи оширилади.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = os.fspath(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writer = None
+        self._closed = False
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        with connection:
+            connection.executescript(_SCHEMA)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._local.connection = connection
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def _connection(self):
+        """Жорий thread'нинг ўқиш уланиши"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    # Ёзиш
+
+    def record(self, record):
+        """Ҳисоблашни навбатга қўйиш (ёзиш орқа thread'да)"""
+        if self._closed:
+            raise RuntimeError("Тарих ёпилган")
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="kalibrovka-history", daemon=True)
+                self._writer.start()
+        self._queue.put(record)
+
+    def write(self, records):
+        """
+        Ҳисоблашларни жорий thread'да дарҳол ёзиш; қайтаради: run id'лар
+
+        Қаторга айлантириб бўлмайдиган ёзув логга ёзилади ва ташлаб
+        юборилади (errors) - қолганлари шу транзакцияда ёзилади.
+        """
+        rows = []
+        for record in records:
+            try:
+                rows.append(_row(record))
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                logger.exception("Тарих ёзуви ташлаб юборилди (%s)", getattr(record, "манба", None))
+
+        connection = self._connection()
+        ids = []
+        with connection:
+            for run, wells in rows:
+                cursor = connection.execute(
+                    "INSERT INTO runs (created, hormone, unit, lot, method, source, result_key, standards,"
+                    " params, n_total, n_normal, n_low, n_high, low_fraction, high_fraction)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    run,
+                )
+                run_id = cursor.lastrowid
+                connection.executemany(
+                    "INSERT INTO results (run_id, well, od, conc, status) VALUES (?, ?, ?, ?, ?)",
+                    [(run_id,) + well for well in wells],
+                )
+                ids.append(run_id)
+        with self._lock:
+            self.written += len(ids)
+            self.batches += 1
+        count("history_runs", len(ids))
+        return ids
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Навбатдагиларни бир транзакцияга йиғиш (ёки flush_interval кутиш)
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+            records = [r for r in batch if r is not None]
+            try:
+                if records:
+                    self.write(records)
+            except Exception:
+                with self._lock:
+                    self.errors += len(records)
+                logger.exception("Тарихга ёзишда хатолик (%d ҳисоблаш)", len(records))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                self._local.connection.close()
+                return
+
+    def flush(self):
+        """Навбатдаги барча ёзувлар базага тушгунча кутиш"""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        """Навбатни ёзиб, орқа thread'ни тўхтатиш"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    # Ўқиш
+
+    def runs(self, гормон_номи=None, лот=None, усул=None, since=None, until=None,
+             min_high=None, min_low=None, limit=DEFAULT_LIMIT):
+        """
+        Ҳисоблашлар рўйхати (энг янгиси биринчи)
+
+        since/until - unix вақт, datetime, date ёки ISO матн (until
+        кирмайди). min_high/min_low - Юкори/Пастки беморлар улуши (0.1 =
+        10%), шундан кам бўлмаганлар. Қайтаради: луғатлар рўйхати.
+        """
+        where, args = [], []
+        for column, value in (("hormone", гормон_номи), ("lot", лот), ("method", усул)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value.strip())
+        for condition, value in (("created >= ?", _timestamp(since)), ("created < ?", _timestamp(until)),
+                                 ("high_fraction >= ?", min_high), ("low_fraction >= ?", min_low)):
+            if value is not None:
+                where.append(condition)
+                args.append(value)
+        sql = f"SELECT {', '.join(_RUN_COLUMNS)} FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        return [dict(zip(_RUN_COLUMNS, row)) for row in self._connection().execute(sql, args)]
+
+    def run(self, run_id):
+        """Битта ҳисоблаш: стандартлар, параметрлар ва беморлар массивлари (йўқ бўлса None)"""
+        connection = self._connection()
+        row = connection.execute(
+            f"SELECT {', '.join(_RUN_COLUMNS)}, standards, params FROM runs WHERE id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        run = dict(zip(_RUN_COLUMNS, row))
+        run["standards"] = json.loads(row[-2])
+        run["params"] = json.loads(row[-1]) if row[-1] is not None else None
+        wells = connection.execute(
+            "SELECT od, conc, status FROM results WHERE run_id = ? ORDER BY well", (run_id,)
+        ).fetchall()
+        od, conc, status = zip(*wells) if wells else ((), (), ())
+        run["od"] = np.array(od, dtype=float)
+        run["conc"] = np.array([np.nan if c is None else c for c in conc], dtype=float)
+        run["status"] = np.array(status, dtype=np.int8)
+        return run
+
+    def flagged(self, status="high", гормон_номи=None, since=None, until=None, limit=DEFAULT_LIMIT):
+        """
+        Диапазондан ташқаридаги беморлар (status: "high" ёки "low")
+
+        Қайтаради: (run_id, created, hormone, lot, well, od, conc) луғатлари.
+        """
+        code = _ҲОЛАТ_КОДЛАРИ[status]
+        if code == НОРМАЛ:
+            raise ValueError('status "high" ёки "low" бўлиши керак')
+        where, args = ["r.status = ?"], [code]
+        for condition, value in (("u.hormone = ?", гормон_номи and гормон_номи.strip()),
+                                 ("u.created >= ?", _timestamp(since)),
+                                 ("u.created < ?", _timestamp(until))):
+            if value is not None:
+                where.append(condition)
+                args.append(value)
+        sql = ("SELECT r.run_id, u.created, u.hormone, u.lot, r.well, r.od, r.conc"
+               " FROM results r JOIN runs u ON u.id = r.run_id"
+               f" WHERE {' AND '.join(where)} ORDER BY u.created DESC, r.well")
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        columns = ("run_id", "created", "hormone", "lot", "well", "od", "conc")
+        return [dict(zip(columns, row)) for row in self._connection().execute(sql, args)]
+
+    def info(self):
+        connection = self._connection()
+        runs, results = connection.execute(
+            "SELECT (SELECT COUNT(*) FROM runs), (SELECT COALESCE(SUM(n_total), 0) FROM runs)"
+        ).fetchone()
+        with self._lock:
+            return {
+                "path": self.path,
+                "runs": runs,
+                "results": results,
+                "pending": self._queue.unfinished_tasks,
+                "written": self.written,
+                "batches": self.batches,
+                "errors": self.errors,
+            }
+
+
+@lru_cache(maxsize=1)
+def default_history():
+    """Жараён учун ягона тарих; HORMON_HISTORY_DB берилмаса None"""
+    path = os.environ.get("HORMON_HISTORY_DB")
+    return RunHistory(path) if path else None
@@ -0,0 +1,190 @@
+# kalibrovka/incremental.py
+"""
+Инкрементал қайта ҳисоблаш: битта қиймат ўзгарганда фақат унга боғлиқ қисм
+
+Боғлиқликлар:
+
+    стандартлар, усул ─► эгри чизиқ ─┐
+    беморлар OD ─────────────────────┴─► концентрация, ҳолат ─► статистика
+                                                    └─► жадвал, график, экспорт
+
+Олдинги натижа (StoredResult) асосида:
+
+    стандартлар ва усул ўзгармаган   эгри чизиқ қайта ишлатилади; фақат
+                                     ўзгарган (ёки қўшилган) беморлар
+                                     ҳисобланади, статистика шу қаторлар
+                                     бўйича тузатилади
+    стандартлар ўзгарган             эгри чизиқ бир марта мосланади,
+                                     беморлар битта векторли ўтишда
+
+Жадвал, график ва экспорт файллари натижа калити бўйича кэшланади - янги
+натижа уларни ўз-ўзидан бекор қилади; графикнинг беморларга боғлиқ
+бўлмаган қисми (макет) plot модулида алоҳида кэшланади.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import НОРМАЛ, ПАСТКИ, ЮКОРИ, fit_curve
+from .instrument import count, timed
+from .store import StoredResult, _frozen
+
+# Ўзгарган қаторлар шу улушдан кўп бўлса - тўлиқ векторли ўтиш
+PATCH_FRACTION = 0.5
+
+_СТАТИСТИКА_КАЛИТЛАРИ = (
+    (НОРМАЛ, "Нормал диапазонда"),
+    (ПАСТКИ, "Пастки диапазон"),
+    (ЮКОРИ, "Юкори диапазон"),
+)
+
+
+@dataclass(frozen=True)
+class Update:
+    """
+    Янгиланиш тури
+
+    тур: "same" (ҳеч нарса ҳисобланмади), "rows" (эгри чизиқ қайта
+    ишлатилди, қаторлар - ҳисобланган беморлар индекслари), "patients"
+    (эгри чизиқ қайта ишлатилди, барча беморлар), "curve" (эгри чизиқ
+    қайта мосланди).
+    """
+    тур: str
+    қаторлар: np.ndarray = None
+    seconds: float = 0.0
+
+    @property
+    def сони(self):
+        """Қайта ҳисобланган беморлар сони (None - барчаси)"""
+        return None if self.қаторлар is None else int(self.қаторлар.size)
+
+
+def _bits(a):
+    return np.ascontiguousarray(a, dtype=np.float64).view(np.int64)
+
+
+def _same(a, b):
+    """Массивлар бит бўйича тенгми (NaN ҳам тенг)"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    return a.shape == b.shape and bool(np.array_equal(_bits(a), _bits(b)))
+
+
+def curve_reusable(олдинги, оптик_стандарт, концентрация_стандарт, усул):
+    """Олдинги натижанинг эгри чизиғи янги стандартлар учун ҳам тўғрими"""
+    return (
+        олдинги is not None
+        and олдинги.эгри_чизиқ is not None
+        and олдинги.усул == усул
+        and _same(олдинги.оптик_зичлик_стандарт, оптик_стандарт)
+        and _same(олдинги.концентрация_стандарт, концентрация_стандарт)
+    )
+
+
+def changed_rows(олдинги_оптик, оптик):
+    """
+    Қайта ҳисобланиши керак бўлган беморлар индекслари
+
+    Умумий қисмда қиймати (бит бўйича) ўзгарганлар ва охирига
+    қўшилганлар. Охиридан олинган қаторлар ҳисоблашни талаб қилмайди.
+    """
+    олдинги_оптик = np.asarray(олдинги_оптик, dtype=np.float64)
+    оптик = np.asarray(оптик, dtype=np.float64)
+    n = min(олдинги_оптик.size, оптик.size)
+    ўзгарган = np.flatnonzero(_bits(олдинги_оптик[:n]) != _bits(оптик[:n]))
+    if оптик.size > n:
+        ўзгарган = np.concatenate([ўзгарган, np.arange(n, оптик.size)])
+    return ўзгарган
+
+
+def _patch_statistics(статистика, эски, янги, жами):
+    """Статистикани олиб ташланган (эски) ва қўшилган (янги) ҳолатлар бўйича тузатиш"""
+    статистика = dict(статистика)
+    статистика["Жами беморлар"] = int(жами)
+    for ҳолат, калит in _СТАТИСТИКА_КАЛИТЛАРИ:
+        статистика[калит] += int(np.count_nonzero(янги == ҳолат)) - int(np.count_nonzero(эски == ҳолат))
+    return статистика
+
+
+@timed("incremental")
+def patch_result(олдинги, оптик_беморлар, улчов_бирлиги=None):
+    """
+    Эгри чизиғи ўзгармаган натижани янги беморлар OD'си учун янгилаш
+
+    Фақат changed_rows() қаторлари олдинги эгри чизиқ орқали
+    ҳисобланади; қолганлари олдинги натижадан нусхаланади (ҳар бир
+    қийматнинг ўзи тўлиқ ҳисоблашдагидек). Олдинги натижа ўзгармайди.
+    Қайтаради: (StoredResult, Update).
+    """
+    start = time.perf_counter()
+    оптик = np.asarray(оптик_беморлар, dtype=np.float64).ravel()
+    улчов_бирлиги = олдинги.улчов_бирлиги if улчов_бирлиги is None else улчов_бирлиги
+    curve = олдинги.эгри_чизиқ
+    қаторлар = changed_rows(олдинги.оптик_зичлик_беморлар, оптик)
+    n_old = олдинги.оптик_зичлик_беморлар.size
+
+    if қаторлар.size == 0 and оптик.size == n_old:
+        # Фақат бирлик (ёки ҳеч нарса) ўзгарган - массивлар бўлишилади
+        натижа = StoredResult(
+            олдинги.оптик_зичлик_стандарт, олдинги.концентрация_стандарт,
+            олдинги.оптик_зичлик_беморлар, олдинги.концентрация_беморлар, олдинги.сақлаш_холати,
+            улчов_бирлиги, олдинги.усул, curve, олдинги.статистика,
+        )
+        return натижа, Update("same", қаторлар, time.perf_counter() - start)
+
+    if қаторлар.size > PATCH_FRACTION * оптик.size:
+        # Кўп қатор ўзгарган - битта векторли ўтиш арзонроқ
+        натижа = StoredResult.create(
+            олдинги.оптик_зичлик_стандарт, олдинги.концентрация_стандарт, оптик,
+            curve(оптик), curve.classify(оптик), улчов_бирлиги, олдинги.усул, curve,
+        )
+        count("incremental_full")
+        return натижа, Update("patients", None, time.perf_counter() - start)
+
+    n = min(n_old, оптик.size)
+    концентрация = np.empty(оптик.size, dtype=np.float64)
+    ҳолат = np.empty(оптик.size, dtype=np.int8)
+    концентрация[:n] = олдинги.концентрация_беморлар[:n]
+    ҳолат[:n] = олдинги.сақлаш_холати[:n]
+
+    эски = np.concatenate([олдинги.сақлаш_холати[қаторлар[қаторлар < n_old]],
+                           олдинги.сақлаш_холати[оптик.size:]])
+    if қаторлар.size:
+        қийматлар = оптик[қаторлар]
+        концентрация[қаторлар] = curve(қийматлар)
+        ҳолат[қаторлар] = curve.classify(қийматлар)
+
+    ҳолат = _frozen(ҳолат, np.int8)
+    натижа = StoredResult(
+        олдинги.оптик_зичлик_стандарт, олдинги.концентрация_стандарт,
+        _frozen(оптик, np.float64), _frozen(концентрация, np.float64), ҳолат,
+        улчов_бирлиги, олдинги.усул, curve,
+        _patch_statistics(олдинги.статистика, эски, ҳолат[қаторлар], оптик.size),
+    )
+    count("incremental_rows", int(қаторлар.size))
+    return натижа, Update("rows", қаторлар, time.perf_counter() - start)
+
+
+def update_result(олдинги, оптик_стандарт, концентрация_стандарт, оптик_беморлар,
+                  улчов_бирлиги="", усул="linear", fit=None):
+    """
+    Янги киритилган маълумотлар учун натижа, олдингисидан имкон қадар фойдаланиб
+
+    олдинги - шу сессиянинг олдинги натижаси ёки None. fit(оптик,
+    концентрация, усул) - эгри чизиқ манбаи (масалан, лот реестри);
+    берилмаса fit_curve. Мослаш хатоси чақирувчига узатилади.
+    Қайтаради: (StoredResult, Update).
+    """
+    if curve_reusable(олдинги, оптик_стандарт, концентрация_стандарт, усул):
+        return patch_result(олдинги, оптик_беморлар, улчов_бирлиги)
+
+    start = time.perf_counter()
+    fit = fit or fit_curve
+    curve = fit(оптик_стандарт, концентрация_стандарт, усул)
+    оптик = np.asarray(оптик_беморлар, dtype=np.float64).ravel()
+    натижа = StoredResult.create(
+        оптик_стандарт, концентрация_стандарт, оптик,
+        curve(оптик), curve.classify(оптик), улчов_бирлиги, усул, curve,
+    )
+    return натижа, Update("curve", None, time.perf_counter() - start)
@@ -0,0 +1,111 @@
+# kalibrovka/inputs.py
+"""
+Нусхаланган (paste) матн ёки юкланган файлдан сон устунларини ўқиш
+"""
+import re
+
+import numpy as np
+
+# Таб ёки нуқтали вергул бўлса - улар ажратувчи, вергул эса ўнлик белги
+# бўлиши мумкин (масалан, "0,15;1,2"). Акс ҳолда вергул, у ҳам бўлмаса бўшлиқ;
+# вергул бўйича устунлар ортиқча чиқса ("0,15 1,2") вергул ўнлик белги.
+# Битта устун кутилса вергул фақат ўнлик белги бўла олмайдиган ҳолда
+# ажратувчи: бир нечта вергул, нуқта ёки вергулдан кейин бўшлиқ бор ва
+# барча бўлаклар сон ("0.1,0.2", "0.1, 0.2", "1,2,3"); "0,15" - 0.15.
+_STRONG_SEP = re.compile(r"[\t;]+")
+_COMMA_SEP = re.compile(r",")
+_SPACE_SEP = re.compile(r"\s+")
+
+
+def _separator(line, ncols, csv=False):
+    """
+    Қатор учун ажратувчи
+
+    csv=True - сарлавҳаси вергул билан ажратилган файл (вергул доим
+    ажратувчи).
+    """
+    if _STRONG_SEP.search(line):
+        return _STRONG_SEP
+    if "," in line and (csv or (ncols > 1 and line.count(",") < ncols)
+                        or (ncols == 1 and _comma_list(line))):
+        return _COMMA_SEP
+    return _SPACE_SEP
+
+
+def _comma_list(line):
+    """Вергул билан ажратилган сонлар рўйхатими (ўнлик вергулли битта сон эмас)"""
+    if not (line.count(",") > 1 or "." in line or ", " in line):
+        return False
+    return all(_to_float(t) is not None and "," not in t for t in _tokens(line, _COMMA_SEP))
+
+
+def _tokens(line, separator):
+    tokens = [t.strip().strip('"') for t in separator.split(line)]
+    return [t for t in tokens if t]
+
+
+def _to_float(token):
+    try:
+        return float(token.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def parse_columns(data, ncols=1, names=None):
+    """
+    Матндан ncols та сон устунини ўқиш (parse_columns_report'нинг массиви)
+    """
+    return parse_columns_report(data, ncols, names)[0]
+
+
+def parse_columns_report(data, ncols=1, names=None):
+    """
+    Матндан ncols та сон устунини ўқиш
+
+    data - матн ёки байтлар (CSV/TXT файл мазмуни). Сарлавҳада names
+    устунлари бўлса ўшалар олинади, акс ҳолда биринчи ncols та устун.
+    Сон бўлмаган қаторлар (сарлавҳа, изоҳ) ташлаб юборилади. ncols=1 да
+    фақат сонлардан иборат қатордаги барча сонлар олинади (жадвалдан ётиқ
+    нусхаланган қатор учун). Сарлавҳасиз матнда ncols=1 бўлса вергул
+    ўнлик белги: "0,15" - 0.15; "0.1,0.2,0.3" эса учта сон.
+    Қайтаради: ((қаторлар, ncols) массив, ташлаб юборилган қаторлар сони).
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig", errors="replace")
+
+    rows = []
+    skipped = 0
+    indices = None
+    csv = False
+    for line in data.splitlines():
+        line = line.strip().lstrip("\ufeff")
+        if not line:
+            continue
+
+        if indices is None and names:
+            header = _tokens(line, _separator(line, ncols, csv=True))
+            if all(n in header for n in names):
+                indices = [header.index(n) for n in names]
+                csv = _separator(line, ncols, csv=True) is _COMMA_SEP
+                continue
+
+        tokens = _tokens(line, _separator(line, ncols, csv))
+        numbers = [_to_float(t) for t in tokens]
+
+        if indices is not None:
+            values = [numbers[j] if j < len(numbers) else None for j in indices]
+        elif ncols == 1:
+            if numbers and all(v is not None for v in numbers):
+                rows.extend([v] for v in numbers)
+            else:
+                skipped += 1
+            continue
+        else:
+            values = numbers[:ncols]
+
+        if len(values) == ncols and all(v is not None for v in values):
+            rows.append(values)
+        else:
+            skipped += 1
+
+    return np.array(rows, dtype=float).reshape(-1, ncols), skipped
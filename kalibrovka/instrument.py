@@ -0,0 +1,316 @@
+# kalibrovka/instrument.py
+"""
+Ички ўлчовлар: босқич вақтлари, ҳисоблагичлар ва Prometheus матни
+
+Ўлчовлар жараён учун битта. Ўчиқ ҳолатда stage() умумий бўш контекст
+қайтаради ва timed() билан ўралган функция фақат битта текширувдан
+ўтади - қўшимча харажат сезилмайди. Ёқиш: HORMON_METRICS=1 ёки enable().
+
+Жорий thread'да Capture бошланган бўлса, босқичлар унга ҳам ёзилади -
+масалан, Streamlit'нинг битта қайта ишга тушириши (rerun) учун тақсимот.
+Capture шу вақт ичида ихтиёрий cProfile ва tracemalloc маълумотини ҳам
+йиғади.
+"""
+import contextvars
+import functools
+import io
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Prometheus кўрсаткичлари олд қўшимчаси
+PREFIX = "kalibrovka"
+
+# Профиль ҳисоботидаги қаторлар сони
+PROFILE_LINES = 30
+MEMORY_LINES = 10
+
+_NOOP = nullcontext()
+_enabled = os.environ.get("HORMON_METRICS", "").lower() in ("1", "true", "yes", "on")
+_trace = contextvars.ContextVar("kalibrovka_trace", default=None)
+
+
+class Metrics:
+    """Босқичлар бўйича вақт (сони, жами, энг катта) ва ҳисоблагичлар"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+
+    def observe(self, name, seconds):
+        with self._lock:
+            item = self._stages.get(name)
+            if item is None:
+                self._stages[name] = [1, seconds, seconds]
+            else:
+                item[0] += 1
+                item[1] += seconds
+                if seconds > item[2]:
+                    item[2] = seconds
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "stages": {
+                    name: {"count": c, "total_s": total, "max_s": top}
+                    for name, (c, total, top) in self._stages.items()
+                },
+                "counters": dict(self._counters),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+
+metrics = Metrics()
+
+
+def enable(on=True):
+    """Ўлчовларни жараён бўйича ёқиш/ўчириш"""
+    global _enabled
+    _enabled = bool(on)
+
+
+def enabled():
+    return _enabled
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        metrics.observe(self.name, seconds)
+        trace = _trace.get()
+        if trace is not None:
+            trace.append((self.name, seconds))
+        return False
+
+
+def stage(name):
+    """Босқич вақтини ўлчайдиган контекст (ўчиқ бўлса бўш контекст)"""
+    if not _enabled:
+        return _NOOP
+    return _Stage(name)
+
+
+def count(name, n=1):
+    """Ҳисоблагични ошириш (ўчиқ бўлса ҳеч нарса қилмайди)"""
+    if _enabled:
+        metrics.incr(name, n)
+
+
+def timed(name):
+    """Функцияни босқич сифатида ўлчайдиган декоратор"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Capture:
+    """
+    Битта иш (масалан, rerun) учун ўлчов: босқичлар тақсимоти ва
+    ихтиёрий cProfile / tracemalloc
+
+    start() ва finish() алоҳида чақирилади - Streamlit скрипти битта
+    блокка ўралмайди. finish() чақирилмай қолса (st.rerun), кейинги
+    Capture олдингисини abort() билан ёпиши мумкин.
+    """
+
+    def __init__(self, name="rerun", profile=False, memory=False):
+        self.name = name
+        self.profile = profile
+        self.memory = memory
+        self.trace = []
+        self.seconds = None
+        self.profile_text = None
+        self.memory_peak_mb = None
+        self.memory_top = None
+        self._token = None
+        self._profiler = None
+        self._tracing_memory = False
+        self._start = None
+
+    def start(self):
+        self._token = _trace.set(self.trace)
+        if self.memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing_memory = True
+            tracemalloc.reset_peak()
+        if self.profile:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Бошқа профилловчи ишлаяпти (масалан, бошқа сессияда)
+                self._profiler = None
+        self._start = time.perf_counter()
+        return self
+
+    def _stop(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._token is not None:
+            try:
+                _trace.reset(self._token)
+            except ValueError:
+                # Бошқа thread'да бошланган (Streamlit rerun'и янги thread'да)
+                pass
+            self._token = None
+
+    def abort(self):
+        """Натижасиз ёпиш (профилловчи ва tracemalloc тўхтатилади)"""
+        self._stop()
+        self._profiler = None
+        if self._tracing_memory:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._tracing_memory = False
+
+    def finish(self):
+        """Ўлчовни якунлаш; ёқилган бўлса бир қатор лог ёзилади"""
+        self.seconds = time.perf_counter() - self._start
+        self._stop()
+        if _enabled:
+            metrics.observe(self.name, self.seconds)
+        if self._profiler is not None:
+            import pstats
+
+            output = io.StringIO()
+            pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            self.profile_text = output.getvalue()
+            self._profiler = None
+        if self.memory:
+            import tracemalloc
+
+            if tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                self.memory_peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+                self.memory_top = [str(s) for s in snapshot.statistics("lineno")[:MEMORY_LINES]]
+            if self._tracing_memory:
+                tracemalloc.stop()
+                self._tracing_memory = False
+        if _enabled:
+            logger.info("%s", self.log_line())
+        return self
+
+    def stages(self):
+        """Босқичлар бўйича жами вақт (биринчи учраш тартибида)"""
+        жами = {}
+        for name, seconds in self.trace:
+            жами[name] = жами.get(name, 0.0) + seconds
+        return жами
+
+    def log_line(self):
+        """Битта қатор: "rerun 84.1ms interpolate=1.2ms plot=30.5ms ..." """
+        parts = [f"{self.name} {self.seconds * 1000:.1f}ms"]
+        parts += [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.stages().items()]
+        return " ".join(parts)
+
+
+def _cache_infos():
+    """Кэшлар статистикаси (фақат юкланган модуллар ва яратилган объектлар)"""
+    infos = {}
+    engine = sys.modules.get(__package__ + ".engine")
+    if engine is not None:
+        infos["curve"] = engine.curve_cache_info()
+    for module, attr, name in (("plot", "_figure_cache", "figure"),
+                               ("plot", "_layout_cache", "layout"),
+                               ("export", "_artifact_cache", "artifact"),
+                               ("uncertainty", "_ci_cache", "ci")):
+        mod = sys.modules.get(f"{__package__}.{module}")
+        if mod is not None:
+            infos[name] = getattr(mod, attr).info()
+    registry = sys.modules.get(__package__ + ".registry")
+    if registry is not None and registry.default_registry.cache_info().currsize:
+        infos["registry"] = registry.default_registry().info()
+    store = sys.modules.get(__package__ + ".store")
+    if store is not None and store.default_store.cache_info().currsize:
+        infos["store"] = store.default_store().info()
+    return infos
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(extra=None):
+    """
+    Prometheus матн форматидаги кўрсаткичлар
+
+    extra - қўшимча {ном: сон} (масалан, HTTP хизмати кўрсаткичлари),
+    номларга PREFIX қўшилади; "_total" билан тугаганлари counter.
+    """
+    snapshot = metrics.snapshot()
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{PREFIX}_{name}{{{label_text}}} {value}" if label_text
+                         else f"{PREFIX}_{name} {value}")
+
+    stages = snapshot["stages"]
+    family("stage_seconds_total", "counter", "Босқичда ўтган жами вақт",
+           [({"stage": n}, f"{s['total_s']:.9f}") for n, s in sorted(stages.items())])
+    family("stage_calls_total", "counter", "Босқич чақирувлари сони",
+           [({"stage": n}, s["count"]) for n, s in sorted(stages.items())])
+    family("stage_seconds_max", "gauge", "Босқичнинг энг узоқ чақируви",
+           [({"stage": n}, f"{s['max_s']:.9f}") for n, s in sorted(stages.items())])
+    for name, value in sorted(snapshot["counters"].items()):
+        family(f"{name}_total", "counter", name, [({}, value)])
+
+    infos = _cache_infos()
+    for key, kind, help_text in (("hits", "counter", "Кэшдан топилганлар"),
+                                 ("misses", "counter", "Кэшда топилмаганлар"),
+                                 ("evictions", "counter", "Кэшдан чиқарилганлар"),
+                                 ("size", "gauge", "Кэшдаги элементлар")):
+        family(f"cache_{key}" + ("_total" if kind == "counter" else ""), kind, help_text,
+               [({"cache": n}, info[key]) for n, info in infos.items() if key in info])
+    if "registry" in infos:
+        family("registry_fits_total", "counter", "Реестрда мосланган эгри чизиқлар",
+               [({}, infos["registry"]["fits"])])
+        family("registry_disk_hits_total", "counter", "Реестрда дискдан олинганлар",
+               [({}, infos["registry"]["disk_hits"])])
+    if "store" in infos:
+        family("store_bytes", "gauge", "Натижалар омбори ҳажми", [({}, infos["store"]["bytes"])])
+        family("store_sessions", "gauge", "Омбордаги сессиялар", [({}, infos["store"]["sessions"])])
+
+    for name, value in sorted((extra or {}).items()):
+        family(name, "counter" if name.endswith("_total") else "gauge", name, [({}, value)])
+    return "\n".join(lines) + "\n"
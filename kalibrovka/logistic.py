@@ -0,0 +1,429 @@
+# kalibrovka/logistic.py
+"""
+4PL/5PL логистик эгри чизиқлар (иммуноанализ тўпламлари учун)
+
+Модель: OD = d + (a - d) / (1 + (x / c)^b)^g, бу ерда x - концентрация.
+4PL учун g = 1. Параметрлар Левенберг-Марквардт усули билан NumPy'да
+мосланади (SciPy керак эмас); тескари ҳисоблаш (OD -> концентрация)
+аналитик ва беморлар бўйича векторлаштирилган.
+"""
+import time
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+from .instrument import count
+
+ЛОГИСТИК_УСУЛЛАР = ("4pl", "5pl")
+
+# Мослаш учун зарур энг кам стандартлар сони
+_MIN_STANDARDS = {"4pl": 4, "5pl": 5}
+
+MAX_ITER = 200
+TOL = 1e-10
+
+# Градиент тўхтатиш мезони: ||J^T r||_inf <= GTOL * (1 + SSE)
+GTOL = 1e-8
+
+# Илиқ старт SSE'си шу пайтгача кўрилган энг яхши SSE'дан шунча марта
+# катта бўлса - совуқ стартдан қайта уринилади
+WARM_SSE_RATIO = 100.0
+
+
+class FitWarning(RuntimeWarning):
+    """Логистик мослаш яқинлашмади (тўхтаб қолди ёки итерациялар тугади)"""
+
+
+@dataclass(frozen=True)
+class FitInfo:
+    """Мослаш жараёни ҳақида маълумот"""
+    iterations: int
+    seconds: float
+    converged: bool
+    sse: float
+    warm_start: bool
+    # Демпфирлаш қадамни яхшилай олмади, градиент эса катта
+    stalled: bool = False
+
+
+@dataclass(frozen=True)
+class LogisticFit:
+    """Мослаш натижаси: параметрлар (a, b, c, d[, g]) ва маълумот"""
+    параметрлар: tuple
+    маълумот: FitInfo
+
+
+def _split(theta):
+    """Ички параметрлар -> a, b, c, d, g"""
+    a, d, lc, lb = theta[:4]
+    lg = theta[4] if len(theta) > 4 else 0.0
+    return a, np.exp(lb), np.exp(lc), d, np.exp(lg)
+
+
+def _to_theta(параметрлар, усул):
+    a, b, c, d = параметрлар[:4]
+    theta = [a, d, np.log(c), np.log(b)]
+    if усул == "5pl":
+        g = параметрлар[4] if len(параметрлар) > 4 else 1.0
+        theta.append(np.log(g))
+    return np.array(theta, dtype=float)
+
+
+def _from_theta(theta):
+    a, b, c, d, g = (float(v) for v in _split(theta))
+    return (a, b, c, d, g) if len(theta) > 4 else (a, b, c, d)
+
+
+def _degenerate(theta):
+    """Параметрлар бузилганми: b, c ёки g нол (log ости underflow) ёки чексиз эмас"""
+    a, b, c, d, g = _split(np.asarray(theta, dtype=float))
+    return not (np.isfinite([a, b, c, d, g]).all() and b > 0 and c > 0 and g > 0)
+
+
+def _model(theta, lx):
+    """Модель қиймати ва Якобиан (ички параметрлар бўйича)"""
+    a, b, c, d, g = _split(theta)
+    lxc = lx - np.log(c)
+    with np.errstate(invalid='ignore', over='ignore'):
+        u = np.exp(b * lxc)
+        ulxc = np.where(np.isfinite(lxc), u * lxc, 0.0)
+    D = 1.0 + u
+    Dg = D ** -g
+    Dg1 = Dg / D
+
+    f = d + (a - d) * Dg
+    J = np.empty((lx.size, len(theta)))
+    J[:, 0] = Dg
+    J[:, 1] = 1.0 - Dg
+    J[:, 2] = g * b * (a - d) * u * Dg1
+    J[:, 3] = -g * b * (a - d) * Dg1 * ulxc
+    if len(theta) > 4:
+        J[:, 4] = -g * (a - d) * np.log(D) * Dg
+    return f, J
+
+
+def _initial_theta(x, y, усул):
+    """Совуқ старт учун бошланғич тахмин"""
+    tartib = np.argsort(x)
+    x, y = x[tartib], y[tartib]
+    span = y[-1] - y[0]
+    a = y[0] - 0.05 * span
+    d = y[-1] + 0.05 * span
+    positive = x[x > 0]
+    c = float(np.median(positive)) if positive.size else 1.0
+    theta = [a, d, np.log(c), 0.0]
+    if усул == "5pl":
+        theta.append(0.0)
+    return np.array(theta, dtype=float)
+
+
+def _small_gradient(grad, sse):
+    return np.max(np.abs(grad), axis=-1) <= GTOL * (1.0 + sse)
+
+
+def _levenberg_marquardt(theta, lx, y, max_iter, tol):
+    """
+    Левенберг-Марквардт итерациялари
+
+    Қайтаради: (theta, итерациялар, sse, яқинлашди, тўхтаб_қолди).
+    Яқинлашди - қадам, SSE ўсиши ёки градиент мезони бажарилди;
+    демпфирлаш фойда бермаса фақат градиент кичик бўлгандагина.
+    """
+    f, J = _model(theta, lx)
+    r = y - f
+    sse = float(r @ r)
+    lam = 1e-3
+    iterations = 0
+    converged = False
+
+    while iterations < max_iter:
+        iterations += 1
+        A = J.T @ J
+        grad = J.T @ r
+        diag = np.diag(np.diag(A)) + 1e-12 * np.eye(len(theta))
+
+        while True:
+            try:
+                step = np.linalg.solve(A + lam * diag, grad)
+            except np.linalg.LinAlgError:
+                step = None
+            if step is not None:
+                theta_new = theta + step
+                f_new, J_new = _model(theta_new, lx)
+                r_new = y - f_new
+                sse_new = float(r_new @ r_new)
+                if np.isfinite(sse_new) and sse_new <= sse:
+                    break
+            lam *= 10.0
+            if lam > 1e12:
+                # Яхшилаб бўлмайди: градиент кичик бўлса минимумдамиз,
+                # акс ҳолда мослаш тўхтаб қолган
+                minimum = bool(np.isfinite(sse) and _small_gradient(grad, sse))
+                return theta, iterations, sse, minimum, not minimum
+
+        small_step = np.linalg.norm(step) <= tol * (np.linalg.norm(theta) + tol)
+        small_gain = sse - sse_new <= tol * max(sse, tol)
+        theta, J, r, sse = theta_new, J_new, r_new, sse_new
+        lam = max(lam * 0.3, 1e-12)
+        if small_step or small_gain:
+            converged = True
+            break
+
+    return theta, iterations, sse, converged, False
+
+
+def fit_logistic(концентрация, оптик, усул="4pl", бошланғич=None, max_iter=MAX_ITER, tol=TOL,
+                 энг_яхши_sse=None):
+    """
+    Логистик эгри чизиқни мослаш
+
+    бошланғич - олдинги пластина параметрлари (илиқ старт). Илиқ старт
+    яқинлашмаса, бузилган параметрлар берса ёки SSE'си энг_яхши_sse'дан
+    (олдинги пластиналардаги энг кичик SSE) WARM_SSE_RATIO марта катта
+    бўлса, совуқ стартдан қайта уринилади. Натижа яқинлашмаса FitWarning
+    чиқарилади (маълумот: converged=False, stalled); бузилган параметрлар
+    (b ёки c нол ёки чексиз эмас) - ValueError.
+    """
+    if усул not in ЛОГИСТИК_УСУЛЛАР:
+        raise ValueError("Номаълум логистик усул")
+
+    x = np.asarray(концентрация, dtype=float)
+    y = np.asarray(оптик, dtype=float)
+    if x.size < _MIN_STANDARDS[усул]:
+        raise ValueError(f"{усул} учун камида {_MIN_STANDARDS[усул]} та стандарт керак")
+    if np.any(x < 0):
+        raise ValueError("Логистик модел учун концентрация манфий бўлмаслиги керак")
+
+    with np.errstate(divide='ignore'):
+        lx = np.log(x)
+
+    start = time.perf_counter()
+    warm = бошланғич is not None
+    theta0 = _to_theta(бошланғич, усул) if warm else _initial_theta(x, y, усул)
+    theta, iterations, sse, converged, stalled = _levenberg_marquardt(theta0, lx, y, max_iter, tol)
+
+    ёмон = (энг_яхши_sse is not None
+            and not sse <= WARM_SSE_RATIO * max(энг_яхши_sse, tol))
+    if warm and (not converged or ёмон or _degenerate(theta)):
+        cold = _levenberg_marquardt(_initial_theta(x, y, усул), lx, y, max_iter, tol)
+        iterations += cold[1]
+        if _degenerate(cold[0]):
+            better = False
+        elif _degenerate(theta) or not converged:
+            better = cold[3] or cold[2] < sse
+        else:
+            # Илиқ старт яқинлашган, лекин SSE катта - фақат аниқ яхшироғи
+            better = cold[2] < sse
+        if _degenerate(theta) or better:
+            theta, _, sse, converged, stalled = cold
+            warm = False
+
+    if _degenerate(theta):
+        raise ValueError(f"{усул} мослаш бузилган параметрлар берди (b ёки c нол ёки чексиз)")
+
+    if not converged:
+        сабаб = "тўхтаб қолди" if stalled else f"{iterations} итерацияда яқинлашмади"
+        warnings.warn(f"{усул} мослаш {сабаб} (SSE={sse:.3g})", FitWarning, stacklevel=2)
+
+    count("logistic_iterations", iterations)
+    info = FitInfo(
+        iterations=iterations,
+        seconds=time.perf_counter() - start,
+        converged=bool(converged),
+        sse=sse,
+        warm_start=warm,
+        stalled=bool(stalled),
+    )
+    return LogisticFit(_from_theta(theta), info)
+
+
+def _model_batch(theta, lx):
+    """_model'нинг B та параметрлар тўплами учун шакли: f (B×n), J (B×n×p)"""
+    a, b, c, d, g = (np.reshape(v, (-1, 1)) for v in _split(theta.T))
+    lxc = lx - np.log(c)
+    with np.errstate(invalid='ignore', over='ignore'):
+        u = np.exp(b * lxc)
+        ulxc = np.where(np.isfinite(lxc), u * lxc, 0.0)
+    D = 1.0 + u
+    Dg = D ** -g
+    Dg1 = Dg / D
+
+    f = d + (a - d) * Dg
+    J = np.empty(f.shape + (theta.shape[1],))
+    J[..., 0] = Dg
+    J[..., 1] = 1.0 - Dg
+    J[..., 2] = g * b * (a - d) * u * Dg1
+    J[..., 3] = -g * b * (a - d) * Dg1 * ulxc
+    if theta.shape[1] > 4:
+        J[..., 4] = -g * (a - d) * np.log(D) * Dg
+    return f, J
+
+
+def _solve_batch(A, b):
+    """B та p×p тизимни ечиш; махсус (singular) тизимлар учун NaN"""
+    try:
+        return np.linalg.solve(A, b[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        step = np.full(b.shape, np.nan)
+        for i in range(len(A)):
+            try:
+                step[i] = np.linalg.solve(A[i], b[i])
+            except np.linalg.LinAlgError:
+                pass
+        return step
+
+
+def fit_logistic_batch(концентрация, оптик, усул="4pl", бошланғич=None, max_iter=MAX_ITER, tol=TOL):
+    """
+    Битта концентрациялар тўплами ва B та OD қатори (B×n) учун мослаш
+
+    Левенберг-Марквардт қадамлари барча қаторлар учун бирга (массив
+    амаллари билан) бажарилади; яқинлашган қаторлар кейинги қадамларда
+    ҳисобланмайди. бошланғич - барча қаторлар учун илиқ старт.
+    Қайтаради: (параметрлар B×p, яқинлашди B).
+    """
+    if усул not in ЛОГИСТИК_УСУЛЛАР:
+        raise ValueError("Номаълум логистик усул")
+
+    x = np.asarray(концентрация, dtype=float)
+    Y = np.atleast_2d(np.asarray(оптик, dtype=float))
+    if x.size < _MIN_STANDARDS[усул]:
+        raise ValueError(f"{усул} учун камида {_MIN_STANDARDS[усул]} та стандарт керак")
+    if np.any(x < 0):
+        raise ValueError("Логистик модел учун концентрация манфий бўлмаслиги керак")
+
+    with np.errstate(divide='ignore'):
+        lx = np.log(x)
+
+    if бошланғич is not None:
+        theta = np.tile(_to_theta(бошланғич, усул), (len(Y), 1))
+    else:
+        theta = np.array([_initial_theta(x, y, усул) for y in Y])
+    f, J = _model_batch(theta, lx)
+    r = Y - f
+    sse = np.einsum('ij,ij->i', r, r)
+    lam = np.full(len(Y), 1e-3)
+    active = np.isfinite(sse)
+    converged = np.zeros(len(Y), dtype=bool)
+    eye = np.eye(theta.shape[1])
+
+    for _ in range(max_iter):
+        i = np.flatnonzero(active)
+        if i.size == 0:
+            break
+        Jt = J[i].transpose(0, 2, 1)
+        A = Jt @ J[i]
+        grad = (Jt @ r[i][..., None])[..., 0]
+        diag = A * eye + 1e-12 * eye
+        step = _solve_batch(A + lam[i, None, None] * diag, grad)
+
+        theta_new = theta[i] + step
+        f_new, J_new = _model_batch(theta_new, lx)
+        r_new = Y[i] - f_new
+        sse_new = np.einsum('ij,ij->i', r_new, r_new)
+        with np.errstate(invalid='ignore'):
+            ok = np.isfinite(sse_new) & (sse_new <= sse[i])
+
+        # Рад этилган қадам - lambda ошади; жуда катта бўлса градиент
+        # кичик бўлгандагина минимумдамиз (акс ҳолда тўхтаб қолган)
+        rad = i[~ok]
+        lam[rad] *= 10.0
+        тўхтаган = lam[rad] > 1e12
+        stuck = rad[тўхтаган]
+        active[stuck] = False
+        with np.errstate(invalid='ignore'):
+            converged[stuck] = np.isfinite(sse[stuck]) & _small_gradient(grad[~ok][тўхтаган], sse[stuck])
+
+        acc = i[ok]
+        step, sse_new = step[ok], sse_new[ok]
+        small_step = np.linalg.norm(step, axis=1) <= tol * (np.linalg.norm(theta[acc], axis=1) + tol)
+        small_gain = sse[acc] - sse_new <= tol * np.maximum(sse[acc], tol)
+        theta[acc], J[acc], r[acc], sse[acc] = theta_new[ok], J_new[ok], r_new[ok], sse_new
+        lam[acc] = np.maximum(lam[acc] * 0.3, 1e-12)
+        done = acc[small_step | small_gain]
+        converged[done] = True
+        active[done] = False
+
+    a, b, c, d, g = _split(theta.T)
+    параметрлар = np.column_stack((a, b, c, d, g) if усул == "5pl" else (a, b, c, d))
+    return параметрлар, converged
+
+
+def _parameters(параметрлар):
+    """(a, b, c, d[, g]) -> float64 скалярлар: Python float'да 1.0 / 0.0 истисно беради"""
+    p = np.asarray(параметрлар, dtype=np.float64)
+    return p[0], p[1], p[2], p[3], (p[4] if p.size > 4 else np.float64(1.0))
+
+
+def logistic_forward(параметрлар, концентрация):
+    """Концентрация -> OD"""
+    a, b, c, d, g = _parameters(параметрлар)
+    x = np.asarray(концентрация, dtype=float)
+    with np.errstate(invalid='ignore', over='ignore', divide='ignore'):
+        return d + (a - d) / (1.0 + (x / c) ** b) ** g
+
+
+def logistic_inverse(параметрлар, оптик):
+    """
+    OD -> концентрация (аналитик, векторлаштирилган)
+
+    Асимптоталардан ташқаридаги OD учун NaN қайтарилади; бузилган
+    параметрлар (масалан, b = 0) ҳам истисно эмас, inf/NaN беради.
+    """
+    a, b, c, d, g = _parameters(параметрлар)
+    y = np.asarray(оптик, dtype=float)
+    with np.errstate(invalid='ignore', over='ignore', divide='ignore'):
+        return c * (((a - d) / (y - d)) ** (1.0 / g) - 1.0) ** (1.0 / b)
+
+
+class LogisticFitter:
+    """
+    Пластиналар кетма-кетлиги учун илиқ стартли мослагич
+
+    Ҳар бир яқинлашган мослашнинг параметрлари кейинги пластина учун
+    бошланғич нуқта бўлади; энг кичик SSE илиқ стартни текшириш учун
+    сақланади.
+    """
+
+    def __init__(self, усул="4pl", max_iter=MAX_ITER, tol=TOL):
+        if усул not in ЛОГИСТИК_УСУЛЛАР:
+            raise ValueError("Номаълум логистик усул")
+        self.усул = усул
+        self.max_iter = max_iter
+        self.tol = tol
+        self.параметрлар = None
+        self.энг_яхши_sse = None
+        self.history = []
+
+    def fit(self, концентрация, оптик):
+        натижа = fit_logistic(концентрация, оптик, self.усул, self.параметрлар,
+                              self.max_iter, self.tol, self.энг_яхши_sse)
+        if натижа.маълумот.converged:
+            self.параметрлар = натижа.параметрлар
+            sse = натижа.маълумот.sse
+            self.энг_яхши_sse = sse if self.энг_яхши_sse is None else min(self.энг_яхши_sse, sse)
+        self.history.append(натижа.маълумот)
+        return натижа
+
+    def report(self):
+        return summarize_fits(self.history)
+
+
+def summarize_fits(маълумотлар):
+    """Мослашлар бўйича йиғма: вақт ва итерациялар"""
+    маълумотлар = [m for m in маълумотлар if m is not None]
+    if not маълумотлар:
+        return {"fits": 0}
+
+    iterations = np.array([m.iterations for m in маълумотлар])
+    seconds = np.array([m.seconds for m in маълумотлар])
+    return {
+        "fits": len(маълумотлар),
+        "converged": int(sum(m.converged for m in маълумотлар)),
+        "warm_starts": int(sum(m.warm_start for m in маълумотлар)),
+        "total_seconds": float(seconds.sum()),
+        "mean_seconds": float(seconds.mean()),
+        "mean_iterations": float(iterations.mean()),
+        "max_iterations": int(iterations.max()),
+    }
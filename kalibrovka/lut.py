@@ -0,0 +1,188 @@
+# kalibrovka/lut.py
+"""
+Ўзгармас эгри чизиқлар учун жадвал (lookup table) режими
+
+Мосланган эгри чизиқ стандартларнинг [min, max] оптик зичлик оралиғида
+зич, бир текис қадамли жадвалга айлантирилади. Бемор OD си индекс ҳисоби
+ва иккита қўшни қиймат орасидаги чизиқли аралаштириш орқали топилади;
+оралиқдан ташқаридаги қийматлар аниқ экстраполяция йўлига қайтади.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .engine import CalibrationCurve
+
+# Жадвал ўлчами чегаралари (катаклар сони)
+MIN_CELLS = 256
+MAX_CELLS = 1 << 24
+
+# Бир бўлакда ишланадиган қийматлар сони (кэшга сиғиши учун)
+_CHUNK = 1 << 16
+
+LUT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class LookupTable:
+    """
+    Эгри чизиқнинг жадвалли кўриниши
+
+    error_bound - текширув нуқталарида (стандартлар, катак ўртаси ва
+    чораклари) ўлчанган энг катта абсолют хатолик; у compile_lut га
+    берилган max_error дан ошмайди.
+    """
+    curve: CalibrationCurve
+    x0: float
+    dx: float
+    values: np.ndarray = field(repr=False, compare=False)
+    error_bound: float = 0.0
+    _a: np.ndarray = field(default=None, init=False, repr=False, compare=False)
+    _b: np.ndarray = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Ҳар катак учун чизиқ: v = a[i] + b[i] * od. Охирги элемент
+        # od == max ҳолати учун (индекс катаклар сонига тенг бўлганда).
+        grid = self.x0 + self.dx * np.arange(len(self.values))
+        slope = np.append(np.diff(self.values) / self.dx, 0.0)
+        object.__setattr__(self, '_b', slope)
+        object.__setattr__(self, '_a', self.values - slope * grid)
+
+    @property
+    def cells(self):
+        return len(self.values) - 1
+
+    @property
+    def min_od(self):
+        return self.curve.min_od
+
+    @property
+    def max_od(self):
+        return self.curve.max_od
+
+    def _lookup(self, od, out, t, i):
+        """Оралиқ ичидаги қийматлар: индекс + чизиқли аралаштириш"""
+        inv = 1.0 / self.dx
+        np.multiply(od, inv, out=t)
+        t -= self.x0 * inv
+        with np.errstate(invalid='ignore'):
+            np.copyto(i, t, casting='unsafe')
+        np.take(self._b, i, out=t, mode='clip')
+        t *= od
+        np.take(self._a, i, out=out, mode='clip')
+        out += t
+
+    def __call__(self, оптик_зичлик_беморлар):
+        """Концентрацияни жадвал орқали ҳисоблаш"""
+        od = np.asarray(оптик_зичлик_беморлар, dtype=float)
+        flat = od.ravel()
+        natija = np.empty(flat.shape, dtype=float)
+
+        chunk = min(_CHUNK, flat.size)
+        t = np.empty(chunk, dtype=float)
+        i = np.empty(chunk, dtype=np.intp)
+        lo, hi = self.min_od, self.max_od
+
+        for s in range(0, flat.size, chunk):
+            e = min(flat.size, s + chunk)
+            x, out = flat[s:e], natija[s:e]
+            self._lookup(x, out, t[:e - s], i[:e - s])
+
+            # Оралиқдан ташқари (ва NaN) - аниқ экстраполяция йўли
+            if not (x.min() >= lo and x.max() <= hi):
+                outside = ~((x >= lo) & (x <= hi))
+                out[outside] = self.curve(x[outside])
+
+        return natija.reshape(od.shape)
+
+    def classify(self, оптик_зичлик_беморлар):
+        return self.curve.classify(оптик_зичлик_беморлар)
+
+    def save(self, path):
+        """Жадвални .npz файлига сақлаш (JSON конфигурация ёнида)"""
+        curve = self.curve
+        np.savez(
+            path,
+            version=LUT_VERSION,
+            x0=self.x0,
+            dx=self.dx,
+            values=self.values,
+            error_bound=self.error_bound,
+            оптик=np.asarray(curve.оптик, dtype=float),
+            концентрация=np.asarray(curve.концентрация, dtype=float),
+            усул=curve.усул,
+            параметрлар=np.asarray(curve.параметрлар if curve.параметрлар is not None else [], dtype=float),
+        )
+
+
+def _table(curve, n):
+    x0, x1 = curve.min_od, curve.max_od
+    grid = np.linspace(x0, x1, n + 1)
+    return x0, (x1 - x0) / n, curve(grid)
+
+
+def _measure_error(lut):
+    """Текширув нуқталарида жадвал ва аниқ эгри чизиқ орасидаги фарқ"""
+    n = lut.cells
+    offsets = np.array([0.25, 0.5, 0.75])
+    check = (lut.x0 + (np.arange(n)[:, None] + offsets) * lut.dx).ravel()
+    check = np.concatenate([check, np.asarray(lut.curve.оптик, dtype=float)])
+    check = check[(check >= lut.min_od) & (check <= lut.max_od)]
+
+    exact = lut.curve(check)
+    approx = np.empty_like(check)
+    lut._lookup(check, approx, np.empty_like(check), np.empty(check.shape, dtype=np.intp))
+    diff = np.abs(approx - exact)
+    # NaN (масалан, логистик асимптотадан ташқари) текширувда ҳисобга олинмайди
+    return float(np.nanmax(diff)) if np.isfinite(diff).any() else 0.0
+
+
+def compile_lut(curve, max_error=None, max_cells=MAX_CELLS):
+    """
+    Эгри чизиқни жадвалга айлантириш
+
+    max_error - рухсат этилган абсолют хатолик (концентрация бирлигида);
+    берилмаса стандартлар концентрация оралиғининг 1e-6 қисми. Талаб
+    бажарилгунча катаклар сони икки баравардан оширилади.
+    """
+    if len(curve.оптик) < 2 or not curve.max_od > curve.min_od:
+        raise ValueError("Жадвал учун камида иккита ҳар хил стандарт керак")
+
+    if max_error is None:
+        span = float(np.ptp(np.asarray(curve.концентрация, dtype=float)))
+        max_error = 1e-6 * (span or 1.0)
+
+    n = MIN_CELLS
+    while True:
+        x0, dx, values = _table(curve, n)
+        lut = LookupTable(curve, x0, dx, values)
+        error = _measure_error(lut)
+        if error <= max_error:
+            return LookupTable(curve, x0, dx, values, error)
+        if n * 2 > max_cells:
+            raise ValueError(
+                f"{max_cells} катакда ҳам хатолик {error:.3g} > {max_error:.3g}"
+            )
+        n *= 2
+
+
+def load_lut(path):
+    """Сақланган жадвални ўқиш"""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["version"]) != LUT_VERSION:
+            raise ValueError("Жадвал версияси мос эмас")
+
+        параметрлар = data["параметрлар"]
+        curve = CalibrationCurve(
+            tuple(data["оптик"].tolist()),
+            tuple(data["концентрация"].tolist()),
+            str(data["усул"]),
+            tuple(параметрлар.tolist()) if параметрлар.size else None,
+        )
+        return LookupTable(
+            curve,
+            float(data["x0"]),
+            float(data["dx"]),
+            data["values"],
+            float(data["error_bound"]),
+        )
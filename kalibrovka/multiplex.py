@@ -0,0 +1,247 @@
+# kalibrovka/multiplex.py
+"""
+Кўп аналитли пластиналар: битта пластинада бир неча гормон (TSH, FT4, FT3)
+
+Ҳар бир аналитнинг ўз стандартлари, интерполяция усули ва ўлчов
+бирлиги бор; ҳар бир беморда ҳар бир аналит учун битта OD ўқиши
+(беморлар m×A массив). Барча аналитлар бир ўтишда мосланади ва
+ҳисобланади: чизиқли аналитлар batch ядросида бирга, қолганлари ўз
+эгри чизиғи орқали. Натижа - битта кенг жадвал (бемор - бир қатор) ва
+битта экспорт.
+
+Конфигурация (JSON) шакли:
+
+    {"аналитлар": [{"гормон_номи": "TSH", "улчов_бирлиги": "мкМЕ/мл",
+                    "лот": "", "интерполяция_усули": "linear",
+                    "стандартлар": [[оптик, концентрация], ...]}, ...],
+     "беморлар": [[OD_TSH, OD_FT4, OD_FT3], ...]}
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property
+
+import numpy as np
+
+from .batch import _linear_batch
+from .engine import УСУЛЛАР, fit_curve, статистика_ҳисоблаш
+from .export import ConfigError, _is_number, validate_config
+from .instrument import timed
+
+
+@dataclass(frozen=True)
+class Analyte:
+    """Битта аналит: номи, бирлиги, стандартлари ва усули"""
+    гормон_номи: str
+    улчов_бирлиги: str
+    стандартлар: tuple
+    усул: str = "linear"
+    лот: str = ""
+
+    @classmethod
+    def create(cls, гормон_номи, улчов_бирлиги, стандартлар, усул="linear", лот=""):
+        стандартлар = tuple((float(od), float(conc)) for od, conc in стандартлар)
+        return cls((гормон_номи or "").strip(), (улчов_бирлиги or "").strip(), стандартлар, усул,
+                   (лот or "").strip())
+
+    @property
+    def оптик(self):
+        return np.array([x[0] for x in self.стандартлар], dtype=float)
+
+    @property
+    def концентрация(self):
+        return np.array([x[1] for x in self.стандартлар], dtype=float)
+
+
+@dataclass(eq=False)
+class MultiplexResult:
+    """
+    Барча аналитлар натижаси: массивлар m×A (устун - аналит)
+
+    results_df ва статистика биринчи мурожаатда қурилади.
+    """
+    аналитлар: tuple
+    оптик_зичлик: np.ndarray
+    концентрация: np.ndarray
+    сақлаш_холати: np.ndarray
+    эгри_чизиқлар: tuple
+
+    @cached_property
+    def results_df(self):
+        return multiplex_table(self)
+
+    @cached_property
+    def статистика(self):
+        """Аналитлар бўйича ҳолатлар ("TSH: Нормал диапазонда" ...)"""
+        статистика = {}
+        for i, analyte in enumerate(self.аналитлар):
+            for калит, қиймат in статистика_ҳисоблаш(self.сақлаш_холати[:, i]).items():
+                статистика[f"{analyte.гормон_номи}: {калит}"] = қиймат
+        return статистика
+
+    @property
+    def nbytes(self):
+        """Тахминий хотира ҳажми (ResultStore учун)"""
+        arrays = (self.оптик_зичлик, self.концентрация, self.сақлаш_холати)
+        return sum(a.nbytes for a in arrays) + 8 * len(self.оптик_зичлик)
+
+    def analyte_result(self, i):
+        """i-аналит натижаси алоҳида StoredResult сифатида (график, тарих учун)"""
+        from .store import StoredResult
+
+        analyte = self.аналитлар[i]
+        return StoredResult.create(
+            analyte.оптик, analyte.концентрация,
+            self.оптик_зичлик[:, i], self.концентрация[:, i], self.сақлаш_холати[:, i],
+            analyte.улчов_бирлиги, analyte.усул, self.эгри_чизиқлар[i],
+        )
+
+
+def _check_analytes(аналитлар):
+    номлар = [a.гормон_номи for a in аналитлар]
+    if not аналитлар:
+        raise ValueError("Камида битта аналит керак")
+    if any(not номи for номи in номлар):
+        raise ValueError("Аналит номи бўш")
+    if len(set(номлар)) != len(номлар):
+        raise ValueError("Аналитлар номлари такрорланмаслиги керак")
+    for analyte in аналитлар:
+        if analyte.усул not in УСУЛЛАР:
+            raise ValueError(f"Номаълум интерполяция усули: {analyte.усул}")
+        if len(analyte.стандартлар) < 2:
+            raise ValueError(f"{analyte.гормон_номи}: камида 2 та стандарт керак")
+
+
+@timed("multiplex")
+def evaluate_multiplex(аналитлар, оптик_беморлар, fit=None):
+    """
+    Барча аналитларни битта ўтишда мослаш ва ҳисоблаш
+
+    оптик_беморлар - m×A (устунлар аналитлар тартибида). fit(analyte) -
+    эгри чизиқ манбаи (масалан, лот реестри); берилмаса fit_curve
+    (жараён кэши). Чизиқли аналитлар битта batch чақирувида ҳисобланади.
+    Қайтаради: MultiplexResult.
+    """
+    аналитлар = tuple(аналитлар)
+    _check_analytes(аналитлар)
+    оптик = np.asarray(оптик_беморлар, dtype=float)
+    if оптик.ndim == 1 and len(аналитлар) == 1:
+        оптик = оптик[:, None]
+    if оптик.ndim != 2 or оптик.shape[1] != len(аналитлар):
+        raise ValueError("Беморлар OD'си m×A шаклида бўлиши керак (A - аналитлар сони)")
+
+    if fit is None:
+        def fit(analyte):
+            return fit_curve(analyte.оптик, analyte.концентрация, analyte.усул)
+    эгри_чизиқлар = tuple(fit(analyte) for analyte in аналитлар)
+
+    концентрация = np.empty(оптик.shape, dtype=float)
+    сақлаш_холати = np.empty(оптик.shape, dtype=np.int8)
+
+    чизиқли = [i for i, analyte in enumerate(аналитлар) if analyte.усул == 'linear']
+    if чизиқли:
+        # Тартибланган стандартлар (эгри чизиқдан) NaN билан тўлдирилади
+        k = max(len(эгри_чизиқлар[i].оптик) for i in чизиқли)
+        x = np.full((len(чизиқли), k), np.nan)
+        y = np.full((len(чизиқли), k), np.nan)
+        n_valid = np.empty(len(чизиқли), dtype=np.intp)
+        for row, i in enumerate(чизиқли):
+            n = len(эгри_чизиқлар[i].оптик)
+            x[row, :n] = эгри_чизиқлар[i].оптик
+            y[row, :n] = эгри_чизиқлар[i].концентрация
+            n_valid[row] = n
+        with np.errstate(invalid='ignore'):
+            c, s = _linear_batch(x, y, n_valid, np.ascontiguousarray(оптик[:, чизиқли].T))
+        концентрация[:, чизиқли] = c.T
+        сақлаш_холати[:, чизиқли] = s.T
+
+    for i, curve in enumerate(эгри_чизиқлар):
+        if аналитлар[i].усул != 'linear':
+            концентрация[:, i] = curve(оптик[:, i])
+            сақлаш_холати[:, i] = curve.classify(оптик[:, i])
+
+    return MultiplexResult(аналитлар, оптик, концентрация, сақлаш_холати, эгри_чизиқлар)
+
+
+def multiplex_table(натижа):
+    """
+    Кенг натижалар жадвали: "Бемор №", кейин ҳар бир аналит учун
+    "Оптик зичлик <номи>", "Концентрация <номи> (<бирлик>)", "Ҳолат <номи>"
+    """
+    import pandas as pd
+
+    from .results import status_labels
+
+    columns = {"Бемор №": np.arange(1, len(натижа.оптик_зичлик) + 1)}
+    for i, analyte in enumerate(натижа.аналитлар):
+        номи = analyte.гормон_номи
+        columns[f"Оптик зичлик {номи}"] = натижа.оптик_зичлик[:, i]
+        columns[f"Концентрация {номи} ({analyte.улчов_бирлиги})"] = натижа.концентрация[:, i]
+        columns[f"Ҳолат {номи}"] = status_labels(натижа.сақлаш_холати[:, i])
+    return pd.DataFrame(columns)
+
+
+def build_multiplex_config(аналитлар, беморлар, сақлаш_вақти=None):
+    """Кўп аналитли JSON конфигурация луғати"""
+    return {
+        "аналитлар": [
+            {
+                "гормон_номи": analyte.гормон_номи,
+                "улчов_бирлиги": analyte.улчов_бирлиги,
+                "лот": analyte.лот,
+                "интерполяция_усули": analyte.усул,
+                "стандартлар": [list(x) for x in analyte.стандартлар],
+            }
+            for analyte in аналитлар
+        ],
+        "беморлар": np.asarray(беморлар, dtype=float).tolist(),
+        "сақлаш_вақти": сақлаш_вақти or datetime.now().isoformat(),
+    }
+
+
+def is_multiplex_config(config_data):
+    return isinstance(config_data, dict) and "аналитлар" in config_data
+
+
+def validate_multiplex_config(config_data):
+    """
+    Кўп аналитли конфигурацияни текшириш (хато бўлса ConfigError)
+
+    Ҳар бир аналит оддий конфигурация қоидалари бўйича текширилади;
+    беморлар - ҳар бирида аналитлар сонича OD бўлган қаторлар.
+    """
+    if not is_multiplex_config(config_data):
+        raise ConfigError("Майдон йўқ: аналитлар")
+    аналитлар = config_data["аналитлар"]
+    if not isinstance(аналитлар, list) or not аналитлар:
+        raise ConfigError("Аналитлар рўйхати бўш бўлмаслиги керак")
+    номлар = set()
+    for analyte in аналитлар:
+        if not isinstance(analyte, dict):
+            raise ConfigError("Аналит JSON объект бўлиши керак")
+        try:
+            validate_config(dict(analyte, беморлар=[]))
+        except ConfigError as e:
+            raise ConfigError(f"{analyte.get('гормон_номи') or '?'}: {e}") from None
+        номи = (analyte.get("гормон_номи") or "").strip()
+        if not номи or номи in номлар:
+            raise ConfigError("Аналитлар номлари бўш ёки такрорланган")
+        номлар.add(номи)
+
+    беморлар = config_data.get("беморлар")
+    if not isinstance(беморлар, list) or not all(
+        isinstance(row, list) and len(row) == len(аналитлар) and all(map(_is_number, row))
+        for row in беморлар
+    ):
+        raise ConfigError(f"Беморлар [[OD × {len(аналитлар)}], ...] кўринишида бўлиши керак")
+    return config_data
+
+
+def multiplex_from_config(config_data):
+    """Конфигурациядан (аналитлар, беморлар m×A)"""
+    аналитлар = tuple(
+        Analyte.create(a.get("гормон_номи"), a.get("улчов_бирлиги"), a["стандартлар"],
+                       a.get("интерполяция_усули", "linear"), a.get("лот"))
+        for a in config_data["аналитлар"]
+    )
+    беморлар = np.asarray(config_data["беморлар"], dtype=float).reshape(-1, len(аналитлар))
+    return аналитлар, беморлар
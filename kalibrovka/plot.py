@@ -0,0 +1,186 @@
+# kalibrovka/plot.py
+"""
+Калибровка графиги (Plotly)
+
+Нуқталар кўп бўлса WebGL (Scattergl) ишлатилади ва беморлар нуқталари
+серверда сийраклаштирилади - браузерга фақат кўринадиган нуқталар юборилади.
+
+Графикнинг беморларга боғлиқ бўлмаган қисми (макет, шаблон, диапазон
+чизиқлари) алоҳида кэшланади: битта бемор ўзгарганда фақат излар
+(traces) қайта қурилади.
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+from .cache import LRUCache
+from .instrument import timed
+
+# Шундан кўп бемор нуқтасида WebGL режимига ўтилади
+WEBGL_THRESHOLD = 5000
+
+# Битта ҳолат синфи учун браузерга юбориладиган энг кўп нуқталар сони
+MAX_POINTS_PER_TRACE = 20000
+
+# Сийраклаштириш тўри (экрандаги пикселларга яқин)
+DECIMATION_GRID = (1200, 600)
+
+# Мосланган эгри чизиқ учун нуқталар сони
+CURVE_SAMPLES = 400
+
+FIGURE_CACHE_SIZE = 16
+LAYOUT_CACHE_SIZE = 32
+
+_figure_cache = LRUCache(FIGURE_CACHE_SIZE)
+_layout_cache = LRUCache(LAYOUT_CACHE_SIZE)
+
+
+def decimate(x, y, max_points=MAX_POINTS_PER_TRACE, grid=DECIMATION_GRID):
+    """
+    Нуқталарни сийраклаштириш: тўрнинг ҳар бир катагидан биттадан нуқта
+
+    Четдаги (outlier) нуқталар сақланади - тасодифий танлашдан фарқли равишда
+    графикнинг кўриниши ўзгармайди. Банд катаклар max_points'дан кўп бўлса
+    тўр (ҳар бир ўқ бўйича икки марта) йириклаштирилади, текис танлаш
+    ишлатилмайди - четдаги катаклар ҳар доим қолади. Натижа детерминистик.
+    Қайтаради: танланган индекслар.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    index = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if index.size <= max_points:
+        return index
+
+    xs, ys = x[index], y[index]
+    nx, ny = grid
+
+    def cells(v, n):
+        lo, hi = v.min(), v.max()
+        scale = (n - 1) / (hi - lo) if hi > lo else 0.0
+        return ((v - lo) * scale).astype(np.int64)
+
+    cx, cy = cells(xs, nx), cells(ys, ny)
+    while True:
+        # Катакдаги биринчи нуқта; йирикроқ тўрда фақат шулар қаралади
+        _, first = np.unique(cx * ny + cy, return_index=True)
+        first = np.sort(first)
+        index, cx, cy = index[first], cx[first], cy[first]
+        if index.size <= max(max_points, 1):
+            return index
+        cx, cy = cx // 2, cy // 2
+        nx, ny = (nx + 1) // 2, (ny + 1) // 2
+
+
+def _layout(гормон_номи, улчов_бирлиги, webgl, диапазон):
+    """
+    Графикнинг макети (JSON луғат, кэшланган - ўзгартирманг)
+
+    диапазон - стандартлар OD'сининг (min, max) ёки None.
+    """
+    def build():
+        fig = go.Figure()
+        if диапазон is not None:
+            fig.add_vline(x=диапазон[0], line_dash="dash",
+                         line_color="red", opacity=0.5, annotation_text="Минимал диапазон")
+            fig.add_vline(x=диапазон[1], line_dash="dash",
+                         line_color="red", opacity=0.5, annotation_text="Максимал диапазон")
+
+        fig.update_layout(
+            title=f'{гормон_номи} калибровка қийшиқ чизиғи',
+            xaxis_title='Оптик зичлик',
+            yaxis_title=f'Концентрация ({улчов_бирлиги})',
+            height=600,
+            # Кўп нуқтада "x unified" hover браузерни секинлаштиради
+            hovermode='closest' if webgl else 'x unified',
+            template='plotly_white',
+            plot_bgcolor='rgba(240,242,246,0.8)',
+            paper_bgcolor='rgba(255,255,255,0.9)',
+            font=dict(size=14)
+        )
+        return fig.layout.to_plotly_json()
+
+    return _layout_cache.get_or_create((гормон_номи, улчов_бирлиги, webgl, диапазон), build)
+
+
+@timed("plot")
+def create_calibration_plot(оптик_зичлик_стандарт, концентрация_стандарт,
+                          оптик_зичлик_беморлар, концентрация_беморлар,
+                          гормон_номи, улчов_бирлиги, сақлаш_холати, curve=None):
+    """
+    Interactive Plotly график яратиш
+
+    curve берилса, калибровка эгри чизиғи стандартлар орасидаги синиқ чизиқ
+    эмас, мосланган функциянинг зич нуқталари билан чизилади.
+    """
+    traces = []
+
+    оптик_зичлик_беморлар = np.asarray(оптик_зичлик_беморлар, dtype=float)
+    концентрация_беморлар = np.asarray(концентрация_беморлар, dtype=float)
+    сақлаш_холати = np.asarray(сақлаш_холати)
+
+    webgl = оптик_зичлик_беморлар.size > WEBGL_THRESHOLD
+    Scatter = go.Scattergl if webgl else go.Scatter
+
+    # Калибровка қийшиқ чизиғи
+    if curve is not None and len(оптик_зичлик_стандарт) > 1:
+        finite = оптик_зичлик_беморлар[np.isfinite(оптик_зичлик_беморлар)]
+        lo = min(curve.min_od, finite.min()) if finite.size else curve.min_od
+        hi = max(curve.max_od, finite.max()) if finite.size else curve.max_od
+        grid = np.linspace(lo, hi, CURVE_SAMPLES)
+        traces.append(go.Scatter(
+            x=grid,
+            y=curve(grid),
+            mode='lines',
+            name=f'Калибровка эгри чизиғи ({curve.усул})',
+            line=dict(color='blue', width=3)
+        ))
+
+    if len(оптик_зичлик_стандарт) > 0:
+        traces.append(go.Scatter(
+            x=оптик_зичлик_стандарт,
+            y=концентрация_стандарт,
+            mode='markers' if curve is not None else 'lines+markers',
+            name='Стандартлар',
+            line=dict(color='blue', width=3),
+            marker=dict(size=10, color='blue', symbol='square')
+        ))
+
+    # Беморлар натижалари
+    colors = ['green', 'red', 'orange']
+    labels = ['Беморлар (нормал)', 'Беморлар (пастки диапазон)', 'Беморлар (юкори диапазон)']
+
+    for i, (color, label) in enumerate(zip(colors, labels)):
+        mask = сақлаш_холати == (i-1)
+        if np.any(mask):
+            x = оптик_зичлик_беморлар[mask]
+            y = концентрация_беморлар[mask]
+            if webgl:
+                keep = decimate(x, y)
+                if keep.size < x.size:
+                    label = f'{label} ({keep.size} / {x.size})'
+                x, y = x[keep], y[keep]
+            traces.append(Scatter(
+                x=x,
+                y=y,
+                mode='markers',
+                name=label,
+                marker=dict(size=6 if webgl else 12, color=color, symbol='circle',
+                          line=dict(width=0 if webgl else 2, color='white'))
+            ))
+
+    # Диапазон чизиқлари ва макет - кэшдан
+    диапазон = None
+    if len(оптик_зичлик_стандарт) > 0:
+        диапазон = (float(min(оптик_зичлик_стандарт)), float(max(оптик_зичлик_стандарт)))
+    return go.Figure(data=traces, layout=_layout(гормон_номи, улчов_бирлиги, webgl, диапазон))
+
+
+def cached_calibration_plot(калит, *args, **kwargs):
+    """
+    Натижа hash'и бўйича кэшланган график
+
+    Бир хил натижа учун график қайта қурилмайди (масалан, бўлимлар
+    алмашганда). Қайтарилган объектни ўзгартирманг - у бўлишилган.
+    """
+    return _figure_cache.get_or_create(
+        калит, lambda: create_calibration_plot(*args, **kwargs)
+    )
@@ -0,0 +1,241 @@
+# kalibrovka/registry.py
+"""
+Мосланган эгри чизиқлар реестри (кит лоти бўйича, сессиялар ўртасида)
+
+Калит: гормон номи, ўлчов бирлиги, лот рақами ва стандартлар hash'и.
+Бир хил лотни ишлатаётган техниклар эгри чизиқни қайта мосламасдан
+оладилар. Реестр жараён учун битта (Streamlit script threadлари учун
+хавфсиз); каталог берилса эгри чизиқлар дискка ҳам ёзилади ва сервер
+қайта ишга тушганда кэш иссиқ қолади.
+
+    HORMON_CURVE_REGISTRY_DIR   диск каталоги (берилмаса фақат хотирада)
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict
+from functools import lru_cache
+
+from .cache import LRUCache
+from .engine import CURVE_CACHE_SIZE, УСУЛЛАР, CalibrationCurve, standards_hash
+from .instrument import count
+from .logistic import FitInfo
+
+REGISTRY_VERSION = 1
+
+# Дискда сақланадиган эгри чизиқлар сони (энг эскилари ўчирилади)
+DEFAULT_DISK_MAXSIZE = 4096
+
+
+def registry_key(гормон_номи, улчов_бирлиги, лот, оптик_зичлик_стандарт, концентрация_стандарт, усул):
+    """Реестр калити: (гормон, бирлик, лот, стандартлар hash'и)"""
+    return (
+        (гормон_номи or "").strip(),
+        (улчов_бирлиги or "").strip(),
+        (лот or "").strip(),
+        standards_hash(оптик_зичлик_стандарт, концентрация_стандарт, усул),
+    )
+
+
+def curve_to_dict(curve):
+    """Эгри чизиқни JSON'га ёзиладиган луғатга ўтказиш"""
+    return {
+        "оптик": list(curve.оптик),
+        "концентрация": list(curve.концентрация),
+        "усул": curve.усул,
+        "параметрлар": list(curve.параметрлар) if curve.параметрлар is not None else None,
+        "маълумот": asdict(curve.маълумот) if curve.маълумот is not None else None,
+    }
+
+
+def curve_from_dict(data):
+    """Луғатдан эгри чизиқ (логистик параметрлар қайта мосланмайди)"""
+    маълумот = data.get("маълумот")
+    параметрлар = data.get("параметрлар")
+    return CalibrationCurve(
+        tuple(data["оптик"]),
+        tuple(data["концентрация"]),
+        data["усул"],
+        tuple(параметрлар) if параметрлар is not None else None,
+        FitInfo(**маълумот) if маълумот is not None else None,
+    )
+
+
+class CurveRegistry:
+    """
+    Эгри чизиқлар реестри: хотирада LRU, ихтиёрий равишда дискда
+
+    Бир калит учун бир вақтда фақат битта thread мослайди - бошқалари
+    унинг натижасини кутади (тақрорий мослаш йўқ).
+    """
+
+    def __init__(self, maxsize=CURVE_CACHE_SIZE, path=None, disk_maxsize=DEFAULT_DISK_MAXSIZE):
+        self.path = os.fspath(path) if path is not None else None
+        self.disk_maxsize = disk_maxsize
+        self._cache = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.disk_hits = 0
+        self.fits = 0
+        self.disk_errors = 0
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, key):
+        name = hashlib.blake2b("\0".join(key).encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.path, f"{name}.json")
+
+    def _disk_error(self):
+        with self._lock:
+            self.disk_errors += 1
+
+    def _load(self, key):
+        """Дискдан ўқиш (йўқ ёки бузилган бўлса None)"""
+        if self.path is None:
+            return None
+        try:
+            with open(self._file(key), encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != REGISTRY_VERSION or tuple(data["key"]) != key:
+                return None
+            return curve_from_dict(data["curve"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            self._disk_error()
+            return None
+
+    def _save(self, key, curve):
+        """Дискка атомар ёзиш (аввал вақтинчалик файл)"""
+        if self.path is None:
+            return
+        target = self._file(key)
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": REGISTRY_VERSION, "key": list(key), "curve": curve_to_dict(curve)},
+                          f, ensure_ascii=False)
+            os.replace(tmp, target)
+            self._prune()
+        except OSError:
+            self._disk_error()
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def _prune(self):
+        entries = [e for e in os.scandir(self.path) if e.name.endswith(".json")]
+        if len(entries) <= self.disk_maxsize:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.disk_maxsize]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def get(self, key):
+        """Реестрдаги эгри чизиқ (хотира, кейин диск) ёки None"""
+        curve = self._cache.get(key)
+        if curve is None:
+            curve = self._load(key)
+            if curve is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._cache.put(key, curve)
+        return curve
+
+    def get_or_fit(self, гормон_номи, улчов_бирлиги, лот, оптик_зичлик_стандарт, концентрация_стандарт,
+                   усул='linear'):
+        """
+        Эгри чизиқни реестрдан олиш ёки мослаб қўшиш
+
+        Қайтаради: (эгри_чизиқ, реестрдан_олинди). Мослаш хатоси
+        (ValueError) чақирувчига узатилади ва реестрга ёзилмайди.
+        """
+        if усул not in УСУЛЛАР:
+            raise ValueError("Номаълум интерполяция усули")
+
+        key = registry_key(гормон_номи, улчов_бирлиги, лот, оптик_зичлик_стандарт, концентрация_стандарт, усул)
+        while True:
+            curve = self.get(key)
+            if curve is not None:
+                return curve, True
+            with self._lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    break
+            # Бошқа thread мосламоқда - кутиб, натижасини оламиз
+            event.wait()
+
+        try:
+            curve = CalibrationCurve.from_standards(оптик_зичлик_стандарт, концентрация_стандарт, усул)
+            curve._interpolator()
+            with self._lock:
+                self.fits += 1
+            count("curve_fits")
+            self._cache.put(key, curve)
+            self._save(key, curve)
+            return curve, False
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def warm(self, limit=None):
+        """
+        Дискдаги энг янги эгри чизиқларни хотирага юклаш
+
+        Қайтаради: юкланганлар сони.
+        """
+        if self.path is None:
+            return 0
+        limit = self._cache.maxsize if limit is None else limit
+        entries = sorted((e for e in os.scandir(self.path) if e.name.endswith(".json")),
+                         key=lambda e: e.stat().st_mtime)[-limit:] if limit > 0 else []
+        loaded = 0
+        for entry in entries:
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") != REGISTRY_VERSION:
+                    continue
+                self._cache.put(tuple(data["key"]), curve_from_dict(data["curve"]))
+                loaded += 1
+            except (OSError, ValueError, KeyError, TypeError):
+                self._disk_error()
+        return loaded
+
+    def info(self):
+        info = self._cache.info()
+        with self._lock:
+            info.update({
+                "disk_hits": self.disk_hits,
+                "fits": self.fits,
+                "disk_errors": self.disk_errors,
+                "path": self.path,
+            })
+        return info
+
+    def clear(self, disk=False):
+        """Хотирадаги реестрни (ва disk=True бўлса дискдагини) тозалаш"""
+        self._cache.clear()
+        with self._lock:
+            self.disk_hits = 0
+            self.fits = 0
+            self.disk_errors = 0
+        if disk and self.path is not None:
+            for entry in os.scandir(self.path):
+                if entry.name.endswith(".json"):
+                    os.remove(entry.path)
+
+
+@lru_cache(maxsize=1)
+def default_registry():
+    """Жараён учун ягона реестр; диск каталоги муҳит ўзгарувчисидан"""
+    registry = CurveRegistry(path=os.environ.get("HORMON_CURVE_REGISTRY_DIR") or None)
+    registry.warm()
+    return registry
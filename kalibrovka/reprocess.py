@@ -0,0 +1,240 @@
+# kalibrovka/reprocess.py
+"""
+Бутун ишни қайта ҳисоблаш: пластиналарни процесслар пулида параллел ҳисоблаш
+
+Ҳар бир пластина - Экспорт бўлимида ёзиладиган JSON конфигурация шаклида
+(стандартлар, беморлар, интерполяция усули). Пластина конфигурация луғати
+ёки JSON файл йўли бўлиши мумкин - йўл берилса файл ишчи процессда
+ўқилади. zip архив ичидаги конфигурациялар ConfigSource сифатида (байтлар)
+узатилади ва улар ҳам ишчи процессда ўқилади. Ҳар бир конфигурация
+ҳисоблашдан олдин validate_config билан текширилади. Натижалар кириш
+тартибида қайтарилади; битта пластинадаги хатолик бутун ишни тўхтатмайди.
+"""
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import интерполяция, статистика_ҳисоблаш
+from .export import load_config, validate_config
+
+
+@dataclass
+class PlateResult:
+    """Битта пластина натижаси (хатолик бўлса error тўлдирилади)"""
+    index: int
+    номи: str
+    усул: str = None
+    гормон_номи: str = ""
+    улчов_бирлиги: str = ""
+    лот: str = ""
+    сақлаш_вақти: str = None
+    стандартлар: list = None
+    оптик_зичлик: np.ndarray = None
+    концентрация: np.ndarray = None
+    сақлаш_холати: np.ndarray = None
+    статистика: dict = None
+    error: str = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class ConfigSource:
+    """Архив ичидаги конфигурация: номи ва JSON байтлари"""
+    номи: str
+    data: bytes
+
+
+def collect_plates(paths):
+    """
+    Файллар, каталоглар ва zip архивлардаги конфигурациялар
+
+    Каталогдаги *.json ва *.zip номи бўйича тартибда олинади. zip ичидаги
+    *.json лар ConfigSource бўлиб қайтади (архив бир марта очилади).
+    """
+    for path in paths:
+        path = os.fspath(path)
+        if os.path.isdir(path):
+            yield from collect_plates(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith((".json", ".zip"))
+            )
+        elif path.lower().endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                for info in sorted(archive.infolist(), key=lambda i: i.filename):
+                    # macOS архивидаги хизмат файллари (__MACOSX/._номи.json)
+                    if (info.is_dir() or not info.filename.lower().endswith(".json")
+                            or info.filename.startswith("__MACOSX/")):
+                        continue
+                    yield ConfigSource(f"{path}/{info.filename}", archive.read(info))
+        else:
+            yield path
+
+
+def _load_plate(plate):
+    """Конфигурация луғати (файл ёки архив байтларидан) ва схемани текшириш"""
+    if isinstance(plate, ConfigSource):
+        config_data = json.loads(plate.data)
+    elif isinstance(plate, (str, os.PathLike)):
+        config_data = load_config(plate)
+    else:
+        config_data = plate
+    return validate_config(config_data)
+
+
+def check_plates(plates):
+    """
+    Ҳисобламасдан фақат ўқиш ва схемани текшириш
+
+    Қайтаради: [(номи, хатолик)] - фақат ўтмаганлар.
+    """
+    errors = []
+    for index, plate in enumerate(plates):
+        try:
+            _load_plate(plate)
+        except Exception as e:
+            errors.append((_plate_name(plate, index), f"{type(e).__name__}: {e}"))
+    return errors
+
+
+def _plate_name(plate, index):
+    if isinstance(plate, ConfigSource):
+        return plate.номи
+    if isinstance(plate, (str, os.PathLike)):
+        return os.fspath(plate)
+    if isinstance(plate, dict):
+        return plate.get("номи") or plate.get("гормон_номи") or f"#{index + 1}"
+    return f"#{index + 1}"
+
+
+def process_plate(config_data, усул=None):
+    """
+    Битта пластинани ҳисоблаш (жорий процессда)
+
+    усул берилса конфигурациядаги интерполяция усулини алмаштиради.
+    Қайтаради: (усул, оптик_зичлик, концентрация, сақлаш_холати).
+    """
+    стандартлар = config_data["стандартлар"]
+    усул = усул or config_data.get("интерполяция_усули", "linear")
+    оптик_стандарт = np.array([x[0] for x in стандартлар], dtype=float)
+    концентрация_стандарт = np.array([x[1] for x in стандартлар], dtype=float)
+    оптик_беморлар = np.array(config_data["беморлар"], dtype=float)
+
+    концентрация, сақлаш_холати = интерполяция(
+        оптик_стандарт, концентрация_стандарт, оптик_беморлар, усул
+    )
+    return усул, оптик_беморлар, концентрация, сақлаш_холати
+
+
+def _run_plate(task):
+    """Ишчи процессдаги вазифа: ҳар қандай хатолик натижага ёзилади"""
+    index, plate, усул = task
+    result = PlateResult(index, f"#{index + 1}")
+    start = time.perf_counter()
+    try:
+        result.номи = _plate_name(plate, index)
+        config_data = _load_plate(plate)
+        result.гормон_номи = config_data.get("гормон_номи", "")
+        result.улчов_бирлиги = config_data.get("улчов_бирлиги", "")
+        result.лот = config_data.get("лот", "")
+        result.сақлаш_вақти = config_data.get("сақлаш_вақти")
+        result.стандартлар = config_data["стандартлар"]
+        (result.усул, result.оптик_зичлик,
+         result.концентрация, result.сақлаш_холати) = process_plate(config_data, усул)
+        result.статистика = статистика_ҳисоблаш(result.сақлаш_холати)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def default_chunksize(n_plates, workers):
+    """Ҳар бир ишчига тахминан 4 бўлак - IPC харажати ва юкни тенглаш орасида"""
+    return max(1, n_plates // (workers * 4))
+
+
+def reprocess_plates(plates, workers=None, chunksize=None, усул=None):
+    """
+    Пластиналарни параллел қайта ҳисоблаш
+
+    plates - конфигурация луғатлари ёки JSON файл йўллари. workers=None
+    бўлса CPU сонича процесс; workers=1 бўлса пул ишлатилмайди. Натижалар
+    (PlateResult) plates тартибида қайтарилади.
+    """
+    plates = list(plates)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(plates) or 1))
+    tasks = [(i, plate, усул) for i, plate in enumerate(plates)]
+
+    if workers == 1:
+        return [_run_plate(task) for task in tasks]
+
+    if chunksize is None:
+        chunksize = default_chunksize(len(tasks), workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() кириш тартибини сақлайди
+        return list(pool.map(_run_plate, tasks, chunksize=chunksize))
+
+
+def summary_frame(results):
+    """Пластиналар бўйича қисқа ҳисобот: ҳолатлар сони ва хатоликлар"""
+    import pandas as pd
+
+    rows = []
+    for result in results:
+        статистика = result.статистика or {}
+        rows.append({
+            "Пластина": result.номи,
+            "Гормон": result.гормон_номи,
+            "Лот": result.лот,
+            "Усул": result.усул,
+            "Беморлар": статистика.get("Жами беморлар"),
+            "Нормал": статистика.get("Нормал диапазонда"),
+            "Пастки": статистика.get("Пастки диапазон"),
+            "Юкори": статистика.get("Юкори диапазон"),
+            "Хатолик": result.error or "",
+        })
+    df = pd.DataFrame(rows, columns=["Пластина", "Гормон", "Лот", "Усул", "Беморлар",
+                                     "Нормал", "Пастки", "Юкори", "Хатолик"])
+    # Хатолик қаторларида сонлар бўш қолади (float'га айланмасин)
+    return df.astype({c: "Int64" for c in ("Беморлар", "Нормал", "Пастки", "Юкори")})
+
+
+def results_frame(results):
+    """
+    Барча муваффақиятли пластиналарнинг умумий натижалар жадвали
+
+    results_table устунларига "Пластина" (номи) устуни олдидан қўшилади.
+    Жадвал пластиналар массивларини бир марта бирлаштириб қурилади -
+    ҳар пластина учун алоҳида DataFrame қурилмайди.
+    """
+    import pandas as pd
+
+    from .results import status_labels
+
+    ok = [result for result in results if result.ok]
+    if not ok:
+        return pd.DataFrame(columns=["Пластина", "Бемор №", "Оптик зичлик",
+                                     "Концентрация", "Ўлчов бирлиги", "Ҳолат"])
+
+    сони = np.array([len(result.оптик_зичлик) for result in ok])
+    # Ҳар пластинада 1 дан бошланадиган бемор рақами
+    бошланиши = np.repeat(np.cumsum(сони) - сони, сони)
+    return pd.DataFrame({
+        "Пластина": np.repeat(np.array([result.номи for result in ok], dtype=object), сони),
+        "Бемор №": np.arange(1, сони.sum() + 1) - бошланиши,
+        "Оптик зичлик": np.concatenate([np.asarray(r.оптик_зичлик, dtype=float) for r in ok]),
+        # Ҳар хил ўлчов бирликлари битта устунга тушиши учун
+        "Концентрация": np.concatenate([np.asarray(r.концентрация, dtype=float) for r in ok]),
+        "Ўлчов бирлиги": np.repeat(np.array([result.улчов_бирлиги for result in ok], dtype=object), сони),
+        "Ҳолат": status_labels(np.concatenate([np.asarray(r.сақлаш_холати, dtype=np.int8) for r in ok])),
+    })
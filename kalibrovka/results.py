@@ -0,0 +1,116 @@
+# kalibrovka/results.py
+"""
+Натижалар жадвалини қуриш (pandas функция ичида юкланади)
+
+Жадвалда концентрация float64, ҳолат эса категориал устун бўлиб
+сақланади; "%.4f" / "N/A" кўриниши фақат экранга чиқариш ва экспорт
+пайтида берилади.
+"""
+import numpy as np
+
+from .engine import ПАСТКИ, НОРМАЛ, ЮКОРИ, ҲОЛАТ_НОМЛАРИ
+from .instrument import timed
+
+# Категориялар тартиби: код + 1 = категория индекси
+_ҲОЛАТ_ТАРТИБИ = (ПАСТКИ, НОРМАЛ, ЮКОРИ)
+
+# Концентрация кўриниши (экран ва экспорт учун)
+CONCENTRATION_FORMAT = '%.4f'
+MISSING_TEXT = "N/A"
+
+
+def status_labels(сақлаш_холати):
+    """Ҳолат кодларидан категориал устун (Python циклсиз)"""
+    import pandas as pd
+
+    codes = np.asarray(сақлаш_холати, dtype=np.int8).ravel() + 1
+    return pd.Categorical.from_codes(
+        codes, categories=[ҲОЛАТ_НОМЛАРИ[c] for c in _ҲОЛАТ_ТАРТИБИ]
+    )
+
+
+def format_concentrations(концентрация):
+    """Концентрацияларни матнга ўтказиш (NaN -> "N/A")"""
+    концентрация = np.asarray(концентрация, dtype=float).ravel()
+    matn = np.char.mod(CONCENTRATION_FORMAT, концентрация).astype(object)
+    matn[np.isnan(концентрация)] = MISSING_TEXT
+    return matn
+
+
+def concentration_columns(results_df):
+    """Жадвалдаги концентрация устунлари номлари"""
+    return [c for c in results_df.columns if str(c).startswith("Концентрация")]
+
+
+def status_columns(results_df):
+    """Ҳолат устунлари ("Ҳолат" ёки кўп аналитли жадвалда "Ҳолат <номи>")"""
+    return [c for c in results_df.columns if c == "Ҳолат" or str(c).startswith("Ҳолат ")]
+
+
+def formatted_table(results_df):
+    """
+    Концентрациялари матнга ўтказилган нусха (CSV ва шу каби экспорт учун)
+
+    Асл жадвал ўзгармайди; бошқа устунлар нусхаланмайди.
+    """
+    columns = concentration_columns(results_df)
+    if not columns:
+        return results_df
+    return results_df.assign(**{
+        c: format_concentrations(results_df[c].to_numpy(dtype=float)) for c in columns
+    })
+
+
+def filter_results(results_df, ҳолатлар=None, min_концентрация=None, max_концентрация=None):
+    """
+    Натижаларни ҳолат ва концентрация оралиғи бўйича саралаш
+
+    ҳолатлар - ҳолат кодлари (масалан [ЮКОРИ]) ёки номлари. Чегаралар
+    ичига олинади; NaN концентрациялар чегара берилганда чиқарилади.
+    """
+    mask = np.ones(len(results_df), dtype=bool)
+    if ҳолатлар is not None:
+        номлар = [ҲОЛАТ_НОМЛАРИ.get(h, h) for h in ҳолатлар]
+        mask &= results_df["Ҳолат"].isin(номлар).to_numpy()
+
+    columns = concentration_columns(results_df)
+    if columns and (min_концентрация is not None or max_концентрация is not None):
+        концентрация = results_df[columns[0]].to_numpy(dtype=float)
+        with np.errstate(invalid='ignore'):
+            if min_концентрация is not None:
+                mask &= концентрация >= min_концентрация
+            if max_концентрация is not None:
+                mask &= концентрация <= max_концентрация
+    return results_df[mask]
+
+
+@timed("results_table")
+def results_table(оптик_зичлик_беморлар, концентрация_беморлар, сақлаш_холати, улчов_бирлиги, copy=True):
+    """
+    Натижалар жадвали (концентрация float64, ҳолат категориал)
+
+    1 ўлчамли массивлар - битта пластина. N×m массивлар учун "Пластина №"
+    устуни қўшилади ва padding (NaN оптик зичлик) қаторлари ташланади.
+    copy=False бўлса жадвал берилган (ўзгармас) массивлар устида қурилади.
+    """
+    import pandas as pd
+
+    оптик = np.asarray(оптик_зичлик_беморлар, dtype=float)
+    концентрация = np.asarray(концентрация_беморлар, dtype=float)
+    ҳолат = np.asarray(сақлаш_холати)
+
+    columns = {}
+    if оптик.ndim == 2:
+        N, m = оптик.shape
+        mask = ~np.isnan(оптик).ravel()
+        columns["Пластина №"] = np.repeat(np.arange(1, N + 1), m)[mask]
+        columns["Бемор №"] = np.tile(np.arange(1, m + 1), N)[mask]
+        оптик, концентрация, ҳолат = оптик.ravel()[mask], концентрация.ravel()[mask], ҳолат.ravel()[mask]
+    else:
+        columns["Бемор №"] = np.arange(1, len(оптик) + 1)
+
+    columns["Оптик зичлик"] = оптик
+    columns[f"Концентрация ({улчов_бирлиги})"] = концентрация
+    columns["Ҳолат"] = status_labels(ҳолат)
+
+    return pd.DataFrame(columns, copy=copy)
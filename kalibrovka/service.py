@@ -0,0 +1,374 @@
+# kalibrovka/service.py
+"""
+Асинхрон HTTP/JSON калибровка хизмати (LIS интеграцияси учун)
+
+Фақат стандарт кутубхона (asyncio) ишлатилади. POST /calibrate Экспорт
+бўлимидаги JSON конфигурацияни қабул қилади ва концентрация ҳамда ҳолатни
+қайтаради. Бир вақтда келган, эгри чизиғи бир хил сўровлар битта вектор
+ҳисоблашга бирлаштирилади. Мосланган эгри чизиқлар engine кэшида
+сўровлар орасида сақланади.
+
+    python -m kalibrovka serve --port 8765
+
+    GET  /health   - хизмат ишлаяптими
+    GET  /metrics  - кечикиш, навбат чуқурлиги, кэш кўрсаткичлари
+    GET  /metrics/prometheus - шу ва ички ўлчовлар Prometheus матнида
+    POST /calibrate
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from http import HTTPStatus
+
+import numpy as np
+
+from .engine import (
+    ҲОЛАТ_НОМЛАРИ,
+    УСУЛЛАР,
+    curve_cache_info,
+    fit_curve,
+    standards_hash,
+    статистика_ҳисоблаш,
+)
+from .instrument import prometheus_text, timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Бирлаштириш ойнаси: биринчи сўровдан кейин шунча кутиб, йиғилганларни
+# битта ҳисоблашда бажариш (секунд)
+BATCH_WINDOW = 0.002
+
+# Сўров танасининг энг катта ҳажми
+MAX_BODY = 64 * 1024 * 1024
+
+# Кечикиш перцентиллари учун сақланадиган охирги сўровлар сони
+LATENCY_WINDOW = 2048
+
+
+class RequestError(ValueError):
+    """Мижоз хатоси (HTTP 400)"""
+
+
+def parse_payload(payload):
+    """
+    Сўров танасини текшириш
+
+    Қайтаради: (оптик_стандарт, концентрация_стандарт, оптик_беморлар, усул).
+    """
+    if not isinstance(payload, dict):
+        raise RequestError("JSON объект кутилган эди")
+    try:
+        стандартлар = payload["стандартлар"]
+        беморлар = payload["беморлар"]
+    except KeyError as e:
+        raise RequestError(f"Майдон йўқ: {e.args[0]}") from None
+
+    усул = payload.get("интерполяция_усули", "linear")
+    if усул not in УСУЛЛАР:
+        raise RequestError(f"Номаълум интерполяция усули: {усул}")
+    шакл = "Стандартлар [[оптик, концентрация], ...], беморлар эса сонлар рўйхати бўлиши керак"
+    try:
+        стандартлар = np.asarray(стандартлар, dtype=float)
+        оптик_беморлар = np.asarray(беморлар, dtype=float).ravel()
+    except (TypeError, ValueError):
+        raise RequestError(шакл) from None
+    # Ҳар бир стандарт аниқ иккита қиймат - бошқа шакл жимгина қайта
+    # тахланмайди (масалан, уч устунли қаторлар)
+    if стандартлар.ndim != 2 or стандартлар.shape[1] != 2:
+        raise RequestError(шакл)
+    if len(стандартлар) < 2:
+        raise RequestError("Камида 2 та стандарт керак")
+    if not np.all(np.isfinite(стандартлар)):
+        raise RequestError("Стандартлар чекли сонлар бўлиши керак")
+
+    return стандартлар[:, 0], стандартлар[:, 1], оптик_беморлар, усул
+
+
+class _Batch:
+    """Битта эгри чизиқ учун йиғилаётган сўровлар"""
+
+    def __init__(self, оптик, концентрация, усул):
+        self.оптик = оптик
+        self.концентрация = концентрация
+        self.усул = усул
+        self.parts = []
+        self.futures = []
+
+
+class CalibrationService:
+    """
+    Сўровларни бирлаштирувчи калибровка хизмати
+
+    HTTP қатламидан мустақил: handle() (усул, йўл, тана) дан (статус,
+    луғат) қайтаради. Эгри чизиқни мослаш ва баҳолаш event loop'ни
+    тўсмаслиги учун потокда бажарилади.
+    """
+
+    def __init__(self, batch_window=BATCH_WINDOW):
+        self.batch_window = batch_window
+        self._pending = {}
+        # Бажарилаётган ҳисоблаш вазифалари (GC йиғиб олмаслиги учун)
+        self._tasks = set()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    async def calibrate(self, payload):
+        """Битта сўров: бошқа сўровлар билан бирлаштириб ҳисобланади"""
+        оптик, концентрация, беморлар, усул = parse_payload(payload)
+        калит = standards_hash(оптик, концентрация, усул)
+
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(калит)
+        if batch is None:
+            batch = self._pending[калит] = _Batch(оптик, концентрация, усул)
+            loop.call_later(self.batch_window, self._flush, калит)
+
+        future = loop.create_future()
+        batch.parts.append(беморлар)
+        batch.futures.append(future)
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        концентрация_беморлар, сақлаш_холати = await future
+        return {
+            "гормон_номи": payload.get("гормон_номи", ""),
+            "улчов_бирлиги": payload.get("улчов_бирлиги", ""),
+            "интерполяция_усули": усул,
+            # JSON'да NaN ва Infinity йўқ - null
+            "концентрация": [v if math.isfinite(v) else None for v in концентрация_беморлар.tolist()],
+            "ҳолат": сақлаш_холати.tolist(),
+            "ҳолат_номлари": [ҲОЛАТ_НОМЛАРИ[int(s)] for s in сақлаш_холати],
+            "статистика": статистика_ҳисоблаш(сақлаш_холати),
+        }
+
+    def _flush(self, калит):
+        batch = self._pending.pop(калит)
+        task = asyncio.ensure_future(self._evaluate(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _evaluate(self, batch):
+        self.batches += 1
+        self.batched_requests += len(batch.parts)
+        try:
+            натижалар = await asyncio.to_thread(_evaluate_batch, batch)
+        except Exception as e:
+            натижалар = [e] * len(batch.futures)
+        finally:
+            self.queue_depth -= len(batch.futures)
+
+        for future, натижа in zip(batch.futures, натижалар):
+            if future.done():
+                continue
+            if isinstance(натижа, Exception):
+                future.set_exception(натижа)
+            else:
+                future.set_result(натижа)
+
+    def metrics(self):
+        """Хизмат кўрсаткичлари (кечикиш миллисекундда)"""
+        latencies = np.array(self._latencies) * 1000.0
+        percentiles = {}
+        if latencies.size:
+            for q in (50, 90, 99):
+                percentiles[f"p{q}_ms"] = float(np.percentile(latencies, q))
+            percentiles["max_ms"] = float(latencies.max())
+        return {
+            "uptime_s": time.time() - self._started,
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency": percentiles,
+            "curve_cache": curve_cache_info(),
+        }
+
+    def prometheus(self):
+        """Хизмат ва ички ўлчовлар (босқичлар, кэшлар) Prometheus матнида"""
+        m = self.metrics()
+        extra = {
+            "http_requests_total": m["requests"],
+            "http_errors_total": m["errors"],
+            "http_batches_total": m["batches"],
+            "http_batched_requests_total": m["batched_requests"],
+            "http_queue_depth": m["queue_depth"],
+            "http_uptime_seconds": round(m["uptime_s"], 3),
+        }
+        for name, value in m["latency"].items():
+            extra[f"http_latency_{name[:-3]}_seconds"] = value / 1000.0
+        return prometheus_text(extra)
+
+    async def handle(self, method, path, body=b""):
+        """
+        Битта HTTP сўровни қайта ишлаш
+
+        Қайтаради: (HTTPStatus, JSON луғат ёки матн).
+        """
+        path = path.split("?", 1)[0]
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, self.metrics()
+        if method == "GET" and path == "/metrics/prometheus":
+            return HTTPStatus.OK, self.prometheus()
+        if path != "/calibrate":
+            return HTTPStatus.NOT_FOUND, {"error": "Топилмади"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "POST керак"}
+
+        start = time.perf_counter()
+        self.requests += 1
+        try:
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                raise RequestError("Нотўғри JSON") from None
+            return HTTPStatus.OK, await self.calibrate(payload)
+        except (RequestError, ValueError) as e:
+            self.errors += 1
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception:
+            # Тафсилотлар фақат логда - мижозга ички маълумот қайтарилмайди
+            self.errors += 1
+            logger.exception("Кутилмаган хатолик (%s %s)", method, path)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Ички хатолик"}
+        finally:
+            self._latencies.append(time.perf_counter() - start)
+
+
+@timed("service_batch")
+def _evaluate_batch(batch):
+    """Бирлаштирилган сўровлар: битта мослаш ва битта вектор баҳолаш"""
+    curve = fit_curve(batch.оптик, batch.концентрация, batch.усул)
+    чегаралар = np.cumsum([len(p) for p in batch.parts])[:-1]
+    оптик_беморлар = np.concatenate(batch.parts) if len(batch.parts) > 1 else batch.parts[0]
+
+    концентрация = np.split(curve(оптик_беморлар), чегаралар)
+    сақлаш_холати = np.split(curve.classify(оптик_беморлар), чегаралар)
+    return list(zip(концентрация, сақлаш_холати))
+
+
+class InProcessClient:
+    """
+    Тармоқсиз мижоз: сўровлар тўғридан-тўғри CalibrationService.handle() га
+
+    Синов ва интеграция текшируви учун; жавоб (статус коди, луғат).
+    """
+
+    def __init__(self, service=None):
+        self.service = service or CalibrationService()
+
+    async def get(self, path):
+        status, data = await self.service.handle("GET", path)
+        return int(status), data
+
+    async def post(self, path, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        status, data = await self.service.handle("POST", path, body)
+        return int(status), data
+
+
+async def _read_request(reader):
+    """HTTP/1.1 сўрови: (усул, йўл, сарлавҳалар, тана) ёки уланиш ёпилса None"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError("Нотўғри сўров қатори") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0) or 0)
+    if length > MAX_BODY:
+        raise RequestError("Сўров жуда катта")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def _write_response(writer, status, data, keep_alive):
+    if isinstance(data, str):
+        body = data.encode("utf-8")
+        content_type = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        content_type = "application/json; charset=utf-8"
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def _serve_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except (RequestError, ValueError) as e:
+                _write_response(writer, HTTPStatus.BAD_REQUEST, {"error": str(e)}, False)
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get("connection", "").lower() != "close"
+            status, data = await service.handle(method, path, body)
+            _write_response(writer, status, data, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    HTTP серверни ишга тушириш
+
+    port=0 бўлса бўш порт танланади (server.sockets[0].getsockname()).
+    Қайтаради: (asyncio.Server, CalibrationService).
+    """
+    service = service or CalibrationService()
+    server = await asyncio.start_server(
+        lambda r, w: _serve_connection(service, r, w), host, port
+    )
+    return server, service
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Хизматни тўхтатилгунча ишлатиш (Ctrl+C)"""
+    async def main():
+        server, _ = await start_server(host=host, port=port)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,284 @@
+# kalibrovka/store.py
+"""
+Сервер томонидаги натижалар омбори (кўп фойдаланувчили ишлатиш учун)
+
+Натижа бир марта, ихчам кўринишда (типланган массивлар) сақланади ва
+калити (киритилган маълумотлар hash'и) бўйича сессиялар орасида
+бўлишилади. Сессия ҳолатида фақат калит қолади. Омбор умумий хотира
+чегараси (LRU), ҳар бир сессия учун хотира чегараси ва TTL бўйича
+элементларни чиқаради.
+
+Созламалар муҳит ўзгарувчилари орқали:
+
+    HORMON_STORE_MEMORY_MB     умумий чегара (стандарт 1024)
+    HORMON_SESSION_MEMORY_MB   битта сессия чегараси (стандарт 256)
+    HORMON_RESULT_TTL          ишлатилмаган натижа яшаш вақти, с (стандарт 3600)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+from .engine import статистика_ҳисоблаш
+
+DEFAULT_STORE_MB = 1024
+DEFAULT_SESSION_MB = 256
+DEFAULT_TTL = 3600
+
+_MB = 1024 * 1024
+
+# results_df учун массивлардан ташқари қатор бошига қўшимча: "Бемор №"
+# (int64) ва ҳолат категорияси коди (int8)
+_TABLE_BYTES_PER_ROW = 9
+
+
+class MemoryBudgetError(MemoryError):
+    """Натижа сессия хотира чегарасига сиғмайди"""
+
+
+def _frozen(a, dtype):
+    a = np.array(a, dtype=dtype)
+    a.flags.writeable = False
+    return a
+
+
+@dataclass(eq=False)
+class StoredResult:
+    """
+    Битта ҳисоблаш натижаси (ихчам, ўзгармас массивлар)
+
+    results_df биринчи мурожаатда массивлар устида нусхасиз қурилади.
+    """
+    оптик_зичлик_стандарт: np.ndarray
+    концентрация_стандарт: np.ndarray
+    оптик_зичлик_беморлар: np.ndarray
+    концентрация_беморлар: np.ndarray
+    сақлаш_холати: np.ndarray
+    улчов_бирлиги: str = ""
+    усул: str = "linear"
+    эгри_чизиқ: object = None
+    статистика: dict = field(default=None)
+
+    @classmethod
+    def create(cls, оптик_стандарт, концентрация_стандарт, оптик_беморлар,
+               концентрация_беморлар, сақлаш_холати, улчов_бирлиги="", усул="linear", эгри_чизиқ=None):
+        сақлаш_холати = _frozen(сақлаш_холати, np.int8)
+        return cls(
+            _frozen(оптик_стандарт, np.float64),
+            _frozen(концентрация_стандарт, np.float64),
+            _frozen(оптик_беморлар, np.float64),
+            _frozen(концентрация_беморлар, np.float64),
+            сақлаш_холати,
+            улчов_бирлиги,
+            усул,
+            эгри_чизиқ,
+            статистика_ҳисоблаш(сақлаш_холати),
+        )
+
+    @property
+    def мослаш_маълумоти(self):
+        return getattr(self.эгри_чизиқ, "маълумот", None)
+
+    @cached_property
+    def results_df(self):
+        from .results import results_table
+
+        return results_table(self.оптик_зичлик_беморлар, self.концентрация_беморлар,
+                             self.сақлаш_холати, self.улчов_бирлиги, copy=False)
+
+    @property
+    def nbytes(self):
+        """Тахминий хотира ҳажми (results_df билан бирга)"""
+        arrays = (self.оптик_зичлик_стандарт, self.концентрация_стандарт,
+                  self.оптик_зичлик_беморлар, self.концентрация_беморлар, self.сақлаш_холати)
+        return sum(a.nbytes for a in arrays) + _TABLE_BYTES_PER_ROW * len(self.сақлаш_холати)
+
+
+class ResultStore:
+    """
+    TTL/LRU омбор, умумий ва сессия бўйича хотира чегаралари билан
+
+    Элемент бир неча сессияга тегишли бўлиши мумкин (бир хил маълумот -
+    бир хил калит). Сессия чегарасидан ошганда шу сессиянинг энг эски
+    натижалари ундан узилади; умумий чегарадан ошганда энг узоқ
+    ишлатилмаган элементлар чиқарилади. Чиқарилган натижа керак бўлса,
+    чақирувчи уни қайта ҳисоблайди.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_STORE_MB * _MB, session_bytes=DEFAULT_SESSION_MB * _MB,
+                 ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.session_bytes = session_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # калит -> [натижа, ҳажм, охирги мурожаат]; тартиб - мурожаат бўйича
+        self._entries = OrderedDict()
+        # сессия -> [OrderedDict калитлар, охирги мурожаат]
+        self._sessions = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _touch_session(self, session, now):
+        refs = self._sessions.get(session)
+        if refs is None:
+            refs = self._sessions[session] = [OrderedDict(), now]
+        refs[1] = now
+        return refs[0]
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        for keys, _ in self._sessions.values():
+            keys.pop(key, None)
+
+    def _expire(self, now):
+        if self.ttl is None:
+            return
+        limit = now - self.ttl
+        while self._entries:
+            key, (_, _, last) = next(iter(self._entries.items()))
+            if last > limit:
+                break
+            self._drop(key)
+            self.expirations += 1
+        for session in [s for s, (_, last) in self._sessions.items() if last <= limit]:
+            del self._sessions[session]
+
+    def _referenced(self, key):
+        return any(key in keys for keys, _ in self._sessions.values())
+
+    def _session_size(self, keys):
+        return sum(self._entries[k][1] for k in keys if k in self._entries)
+
+    def put(self, session, key, result):
+        """
+        Натижани сақлаш ва сессияга боғлаш
+
+        Натижа сессия чегарасидан катта бўлса MemoryBudgetError.
+        """
+        size = result.nbytes
+        if self.session_bytes is not None and size > self.session_bytes:
+            raise MemoryBudgetError(
+                f"Натижа {size / _MB:.1f} МБ - сессия чегараси {self.session_bytes / _MB:.1f} МБ"
+            )
+
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            if key in self._entries:
+                self._bytes -= self._entries[key][1]
+            self._entries[key] = [result, size, now]
+            self._entries.move_to_end(key)
+            self._bytes += size
+
+            keys = self._touch_session(session, now)
+            keys[key] = None
+            keys.move_to_end(key)
+            if self.session_bytes is not None:
+                while len(keys) > 1 and self._session_size(keys) > self.session_bytes:
+                    old, _ = keys.popitem(last=False)
+                    # Бошқа сессияда ишлатилмаса хотирадан ҳам чиқарилади
+                    if old in self._entries and not self._referenced(old):
+                        self._drop(old)
+                        self.evictions += 1
+
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                if oldest == key:
+                    break
+                self._drop(oldest)
+                self.evictions += 1
+        return result
+
+    def get(self, session, key):
+        """Натижа (сессияга боғланади) ёки чиқарилган бўлса None"""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            item[2] = now
+            self._entries.move_to_end(key)
+            keys = self._touch_session(session, now)
+            keys[key] = None
+            keys.move_to_end(key)
+            return item[0]
+
+    def release(self, session, key=None):
+        """Сессия боғланишини олиб ташлаш (key=None - барчаси)"""
+        with self._lock:
+            if session not in self._sessions:
+                return
+            if key is None:
+                del self._sessions[session]
+            else:
+                self._sessions[session][0].pop(key, None)
+
+    def sessions(self):
+        """Сессиялар бўйича хотира (админ кўриниши учун)"""
+        with self._lock:
+            now = self._clock()
+            owners = {}
+            for keys, _ in self._sessions.values():
+                for key in keys:
+                    owners[key] = owners.get(key, 0) + 1
+            report = []
+            for session, (keys, last) in self._sessions.items():
+                live = [k for k in keys if k in self._entries]
+                report.append({
+                    "session": session,
+                    "results": len(live),
+                    "bytes": self._session_size(live),
+                    "shared": sum(1 for k in live if owners.get(k, 0) > 1),
+                    "idle_s": now - last,
+                })
+            return sorted(report, key=lambda r: r["bytes"], reverse=True)
+
+    def info(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "session_bytes": self.session_bytes,
+                "ttl": self.ttl,
+                "sessions": len(self._sessions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sessions.clear()
+            self._bytes = 0
+
+
+def _env_number(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+@lru_cache(maxsize=1)
+def default_store():
+    """Жараён учун ягона омбор (муҳит ўзгарувчиларидан созланади)"""
+    return ResultStore(
+        max_bytes=int(_env_number("HORMON_STORE_MEMORY_MB", DEFAULT_STORE_MB) * _MB),
+        session_bytes=int(_env_number("HORMON_SESSION_MEMORY_MB", DEFAULT_SESSION_MB) * _MB),
+        ttl=_env_number("HORMON_RESULT_TTL", DEFAULT_TTL),
+    )
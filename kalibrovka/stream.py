@@ -0,0 +1,144 @@
+# kalibrovka/stream.py
+"""
+Оқимли (streaming) режим: катта CSV/Parquet файлларни бўлаклаб ҳисоблаш
+
+Файл тўлиқ хотирага юкланмайди - ҳар бир бўлак ўқилади, ҳисобланади ва
+дарҳол натижа файлига ёзилади. pandas (ва Parquet учун pyarrow) функциялар
+ичида юкланади.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from .results import status_labels
+
+# Бир бўлакдаги қаторлар сони
+DEFAULT_CHUNKSIZE = 1_000_000
+
+# Беморлар оптик зичлиги устуни (натижалар жадвалидаги ном)
+DEFAULT_COLUMN = "Оптик зичлик"
+
+
+def _is_parquet(path):
+    return os.fspath(path).lower().endswith((".parquet", ".pq"))
+
+
+def peak_rss_mb():
+    """Жараённинг энг юқори RSS хотираси (МБ); аниқлаб бўлмаса None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'да килобайт, macOS'да байт
+    if sys.platform == "darwin":
+        return maxrss / (1024 * 1024)
+    return maxrss / 1024
+
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """Кириш файлини DataFrame бўлаклари кўринишида ўқиш"""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns)
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+
+class _ChunkWriter:
+    """
+    Натижаларни бўлаклаб ёзиш (CSV ёки Parquet)
+
+    pyarrow бўлса CSV ҳам у орқали ёзилади - pandas.to_csv дан ~10 марта
+    тезроқ. Бўлмаса pandas'га қайтилади.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self.arrow = self.parquet or _has_pyarrow()
+        self._writer = None
+        self._schema = None
+
+    def _open(self, schema):
+        if self.parquet:
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, schema)
+
+        import pyarrow.csv as pc
+        return pc.CSVWriter(self.path, schema)
+
+    def write(self, df):
+        if not self.arrow:
+            df.to_csv(self.path, mode="w" if self._schema is None else "a",
+                      header=self._schema is None, index=False, encoding="utf-8")
+            self._schema = True
+            return
+
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._open(self._schema)
+        else:
+            # Бўлаклар орасида турлар ўзгариши мумкин (масалан int -> float)
+            table = table.cast(self._schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def stream_file(curve, input_path, output_path, column=DEFAULT_COLUMN,
+                chunksize=DEFAULT_CHUNKSIZE, улчов_бирлиги=""):
+    """
+    Файлдаги беморлар оптик зичликларини мосланган эгри чизиқ орқали ҳисоблаш
+
+    Кириш устунлари сақланади, концентрация ва ҳолат устунлари қўшилади.
+    Қайтаради: қаторлар сони, вақт, тезлик ва RSS чўққиси луғати.
+    """
+    conc_column = f"Концентрация ({улчов_бирлиги})" if улчов_бирлиги else "Концентрация"
+
+    rows = 0
+    start = time.perf_counter()
+    writer = _ChunkWriter(output_path)
+    try:
+        for chunk in iter_chunks(input_path, chunksize):
+            if column not in chunk.columns:
+                raise ValueError(f"'{column}' устуни топилмади")
+
+            оптик = chunk[column].to_numpy(dtype=float)
+            chunk[conc_column] = curve(оптик)
+            chunk["Ҳолат"] = status_labels(curve.classify(оптик))
+
+            writer.write(chunk)
+            rows += len(chunk)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else float("inf"),
+        "peak_rss_mb": peak_rss_mb(),
+    }
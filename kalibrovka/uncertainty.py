@@ -0,0 +1,260 @@
+# kalibrovka/uncertainty.py
+"""
+Беморлар концентрацияси учун bootstrap ишонч оралиқлари
+
+Стандартлар OD'си B марта ғалаёнлантирилади ва танланган усулдаги эгри
+чизиқ ҳар бир реплика учун қайта мосланади:
+
+    4PL/5PL       мосланган OD'га қолдиқлар (residuals) қайта танлаб қўшилади
+    linear,       қолдиқ йўқ (эгри чизиқ стандартлардан ўтади) - OD'га
+    spline,       нисбий Гаусс шовқини (od_cv, стандарт 5%) қўшилади
+    quadratic
+
+od_cv аниқ берилса логистик усулларда ҳам Гаусс шовқини ишлатилади.
+
+Реплика ҳар бири учун интерполяция чақирилмайди: барча репликалар
+массив амаллари билан бирга ҳисобланади (чизиқли - batch ядроси,
+spline/quadratic - B-spline коэффициентлари B та кичик тизим сифатида,
+логистик - битта Левенберг-Марквардт ўтиши). Репликалар бўлакларга
+ажратилади; workers > 1 бўлса бўлаклар процесслар пулида ҳисобланади.
+Натижа workers сонига боғлиқ эмас (ҳар бўлакнинг ўз seed'и бор).
+"""
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import _linear_batch
+from .cache import LRUCache
+from .engine import УСУЛЛАР, fit_curve
+from .instrument import timed
+from .logistic import ЛОГИСТИК_УСУЛЛАР, fit_logistic_batch, logistic_forward, logistic_inverse
+
+DEFAULT_REPLICATES = 1000
+DEFAULT_LEVEL = 0.95
+
+# Интерполяцияловчи усуллар учун OD'нинг нисбий хатоси (intra-assay CV)
+DEFAULT_OD_CV = 0.05
+
+# Бир бўлакдаги репликалар сони (процесслар пули учун иш бирлиги)
+REPLICATE_CHUNK = 250
+
+CI_CACHE_SIZE = 32
+
+# B-spline даражаси (interp1d kind'ига мос)
+_SPLINE_DEGREE = {"spline": 3, "quadratic": 2}
+
+_ci_cache = LRUCache(CI_CACHE_SIZE)
+
+
+@dataclass
+class BootstrapCI:
+    """Беморлар бўйича ишонч оралиғи чегаралари"""
+    пастки: np.ndarray
+    юкори: np.ndarray
+    level: float
+    replicates: int
+    усул: str
+    шовқин: str
+    # Ҳар бир бемор учун концентрацияси ҳисобланган репликалар улуши
+    valid: np.ndarray
+    seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class _Plan:
+    """Репликаларни ҳисоблаш учун зарур маълумот (ишчи процессга узатилади)"""
+    усул: str
+    оптик: np.ndarray
+    концентрация: np.ndarray
+    беморлар: np.ndarray
+    асос: np.ndarray
+    қолдиқлар: np.ndarray = None
+    od_cv: float = 0.0
+    параметрлар: tuple = None
+
+
+def _knots(x, k):
+    """make_interp_spline (not-a-knot) тугунлари, ҳар бир қатор учун"""
+    if k % 2:
+        h = (k + 1) // 2
+        inner = x[:, h:x.shape[1] - h]
+    else:
+        h = k // 2
+        mid = (x[:, 1:] + x[:, :-1]) / 2
+        inner = mid[:, h:mid.shape[1] - h]
+    return np.concatenate([np.repeat(x[:, :1], k + 1, axis=1), inner,
+                           np.repeat(x[:, -1:], k + 1, axis=1)], axis=1)
+
+
+def _basis(t, u, k, n):
+    """
+    u нуқталаридаги нолдан фарқли B-spline базис функциялари
+
+    Қайтаради: интервал индекси l (B×q) ва базис қийматлари (B×q×(k+1)),
+    улар B_{l-k}..B_l га тегишли. Четдан ташқаридаги нуқталар чекка
+    кўпҳад бўйича экстраполяция қилинади (BSpline extrapolate=True каби).
+    """
+    l = np.zeros(u.shape, dtype=np.intp)
+    for j in range(t.shape[1]):
+        l += t[:, j:j + 1] <= u
+    l = np.clip(l - 1, k, n - 1)
+
+    h = np.zeros(u.shape + (k + 1,))
+    h[..., 0] = 1.0
+    for j in range(1, k + 1):
+        hh = h[..., :j].copy()
+        h[..., 0] = 0.0
+        for i in range(1, j + 1):
+            xb = np.take_along_axis(t, l + i, axis=1)
+            xa = np.take_along_axis(t, l + i - j, axis=1)
+            w = hh[..., i - 1] / (xb - xa)
+            h[..., i - 1] += w * (xb - u)
+            h[..., i] = w * (u - xa)
+    return l, h
+
+
+def _spline_batch(x, y, od, k):
+    """
+    B та интерполяцион B-spline (interp1d kind='cubic'/'quadratic' каби)
+
+    x, y - ҳар қатори тартибланган стандартлар (B×n), od - беморлар (B×m).
+    Такрорланган OD'ли реплика NaN қайтаради.
+    """
+    B, n = x.shape
+    t = _knots(x, k)
+    offsets = np.arange(k + 1) - k
+
+    l, h = _basis(t, x, k, n)
+    A = np.zeros((B, n, n))
+    np.put_along_axis(A, l[..., None] + offsets, h, axis=2)
+    bad = np.any(np.diff(x, axis=1) <= 0, axis=1)
+    A[bad] = np.eye(n)
+    c = np.linalg.solve(A, y[..., None])[..., 0]
+
+    l, h = _basis(t, od, k, n)
+    m = od.shape[1]
+    coef = np.take_along_axis(c, (l[..., None] + offsets).reshape(B, -1), axis=1).reshape(B, m, k + 1)
+    концентрация = np.einsum('bmk,bmk->bm', h, coef)
+    концентрация[bad] = np.nan
+    return концентрация
+
+
+def _perturb(plan, rng, size):
+    """size та реплика учун стандартлар OD'си (size×n)"""
+    if plan.қолдиқлар is not None:
+        танлов = rng.integers(len(plan.қолдиқлар), size=(size, len(plan.асос)))
+        return plan.асос + plan.қолдиқлар[танлов]
+    return plan.асос * (1.0 + plan.od_cv * rng.standard_normal((size, len(plan.асос))))
+
+
+def _replicates(plan, rng, size):
+    """size та реплика учун беморлар концентрацияси (size×m)"""
+    od = _perturb(plan, rng, size)
+    беморлар = np.broadcast_to(plan.беморлар, (size, len(plan.беморлар)))
+
+    if plan.усул in ЛОГИСТИК_УСУЛЛАР:
+        with np.errstate(invalid='ignore', over='ignore', divide='ignore'):
+            параметрлар, _ = fit_logistic_batch(plan.концентрация, od, plan.усул, plan.параметрлар)
+            return logistic_inverse(tuple(параметрлар.T[..., None]), беморлар)
+
+    # OD ғалаёнланганда стандартлар тартиби ўзгариши мумкин
+    tartib = np.argsort(od, axis=1, kind='stable')
+    x = np.take_along_axis(od, tartib, axis=1)
+    y = plan.концентрация[tartib]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if plan.усул == 'linear':
+            n_valid = np.full(size, x.shape[1])
+            концентрация, _ = _linear_batch(x, y, n_valid, np.ascontiguousarray(беморлар))
+            return концентрация
+        return _spline_batch(x, y, беморлар, _SPLINE_DEGREE[plan.усул])
+
+
+def _replicate_chunk(task):
+    """Ишчи процессдаги вазифа: битта бўлак репликалар"""
+    plan, seed, size = task
+    return _replicates(plan, np.random.default_rng(seed), size)
+
+
+def _plan(оптик_зичлик_стандарт, концентрация_стандарт, оптик_зичлик_беморлар, усул, od_cv):
+    """Нуқтавий мослаш ва шовқин модели; қайтаради (_Plan, шовқин тавсифи)"""
+    curve = fit_curve(оптик_зичлик_стандарт, концентрация_стандарт, усул)
+    оптик = np.asarray(curve.оптик, dtype=float)
+    концентрация = np.asarray(curve.концентрация, dtype=float)
+    беморлар = np.asarray(оптик_зичлик_беморлар, dtype=float).ravel()
+
+    if curve.логистик and od_cv is None:
+        асос = logistic_forward(curve.параметрлар, концентрация)
+        p = len(curve.параметрлар)
+        қолдиқлар = оптик - асос
+        # Стандартлар параметрлардан кўп бўлмаса қолдиқлар нолга тенг
+        if len(оптик) > p and np.any(np.abs(қолдиқлар) > 1e-12 * np.abs(оптик).max()):
+            # Марказлаштириш ва эркинлик даражаси бўйича тузатиш
+            қолдиқлар = (қолдиқлар - қолдиқлар.mean()) * np.sqrt(len(оптик) / (len(оптик) - p))
+            plan = _Plan(усул, оптик, концентрация, беморлар, асос, қолдиқлар,
+                         параметрлар=curve.параметрлар)
+            return plan, "residual"
+
+    od_cv = DEFAULT_OD_CV if od_cv is None else float(od_cv)
+    plan = _Plan(усул, оптик, концентрация, беморлар, оптик, od_cv=od_cv,
+                 параметрлар=curve.параметрлар)
+    return plan, f"od_cv={od_cv:g}"
+
+
+@timed("bootstrap")
+def bootstrap_ci(оптик_зичлик_стандарт, концентрация_стандарт, оптик_зичлик_беморлар, усул='linear',
+                 replicates=DEFAULT_REPLICATES, level=DEFAULT_LEVEL, od_cv=None, seed=None, workers=1):
+    """
+    Беморлар концентрацияси учун percentile bootstrap ишонч оралиғи
+
+    replicates - реплика сони (B), level - ишонч даражаси (масалан 0.95).
+    od_cv - OD'нинг нисбий хатоси (None: логистик усулларда қолдиқлар,
+    бошқаларида DEFAULT_OD_CV). workers > 1 бўлса бўлаклар процесслар
+    пулида ҳисобланади. Мослаш хатоси ValueError сифатида узатилади.
+    """
+    if усул not in УСУЛЛАР:
+        raise ValueError("Номаълум интерполяция усули")
+    if replicates < 1:
+        raise ValueError("Репликалар сони мусбат бўлиши керак")
+    if not 0 < level < 1:
+        raise ValueError("Ишонч даражаси 0 ва 1 орасида бўлиши керак")
+
+    start = time.perf_counter()
+    plan, шовқин = _plan(оптик_зичлик_стандарт, концентрация_стандарт, оптик_зичлик_беморлар, усул, od_cv)
+
+    sizes = [min(REPLICATE_CHUNK, replicates - s) for s in range(0, replicates, REPLICATE_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(plan, s, size) for s, size in zip(seeds, sizes)]
+    workers = max(1, min(workers or 1, len(tasks)))
+    if workers == 1:
+        бўлаклар = [_replicate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            бўлаклар = list(pool.map(_replicate_chunk, tasks))
+    концентрация = np.concatenate(бўлаклар)
+
+    ҳақиқий = np.isfinite(концентрация)
+    концентрация[~ҳақиқий] = np.nan
+    alpha = (1.0 - level) / 2
+    with warnings.catch_warnings():
+        # Бирорта ҳам ҳақиқий репликаси йўқ бемор - NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        пастки, юкори = np.nanquantile(концентрация, [alpha, 1.0 - alpha], axis=0)
+
+    return BootstrapCI(
+        пастки=пастки,
+        юкори=юкори,
+        level=level,
+        replicates=replicates,
+        усул=усул,
+        шовқин=шовқин,
+        valid=ҳақиқий.mean(axis=0),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def cached_bootstrap_ci(калит, *args, **kwargs):
+    """Натижа ва созламалар hash'и бўйича кэшланган bootstrap_ci"""
+    return _ci_cache.get_or_create(калит, lambda: bootstrap_ci(*args, **kwargs))
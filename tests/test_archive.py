@@ -0,0 +1,122 @@
+# tests/test_archive.py
+"""Натижалар архиви (.kres): ёзиш/ўқиш, бўш пластиналар ва сарлавҳа текшируви"""
+import io
+
+import numpy as np
+import pytest
+
+from kalibrovka.archive import (
+    ALIGNMENT, ARCHIVE_VERSION, MAGIC, archive_bytes, load_archive, save_archive,
+)
+
+
+def _plate(n, гормон_номи="ТТГ", seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "оптик_зичлик": rng.uniform(0.05, 2.0, n),
+        "концентрация": rng.uniform(0.0, 100.0, n),
+        "сақлаш_холати": rng.integers(-1, 2, n),
+        "гормон_номи": гормон_номи,
+        "улчов_бирлиги": "мкМЕ/мл",
+        "лот": "L1",
+        "усул": "linear",
+        "стандартлар": [[0.05, 0.0], [0.5, 5.0], [1.05, 10.0]],
+    }
+
+
+def _assert_plates(archive, plates):
+    assert len(archive) == sum(len(p["оптик_зичлик"]) for p in plates)
+    for i, expected in enumerate(plates):
+        info, оптик, концентрация, ҳолат = archive.plate(i)
+        assert info["гормон_номи"] == expected["гормон_номи"]
+        assert info["стандартлар"] == expected["стандартлар"]
+        np.testing.assert_array_equal(оптик, expected["оптик_зичлик"])
+        np.testing.assert_array_equal(концентрация, expected["концентрация"])
+        np.testing.assert_array_equal(ҳолат, expected["сақлаш_холати"])
+        assert np.all(archive.пластина[info["start"]:info["stop"]] == i)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, mmap):
+    plates = [_plate(7, "ТТГ", 1), _plate(3, "Т4", 2)]
+    path = tmp_path / "r.kres"
+    assert save_archive(path, plates, meta={"манба": "тест"}) == 10
+
+    archive = load_archive(path, mmap=mmap)
+    assert isinstance(archive.концентрация, np.memmap) is mmap
+    assert archive.meta == {"манба": "тест"}
+    _assert_plates(archive, plates)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_zero_row_plates(tmp_path, mmap):
+    plates = [_plate(4, "ТТГ", 1), _plate(0, "Т4", 2), _plate(2, "Т3", 3)]
+    path = tmp_path / "z.kres"
+    assert save_archive(path, plates) == 6
+
+    archive = load_archive(path, mmap=mmap)
+    _assert_plates(archive, plates)
+    assert archive.plates[1]["start"] == archive.plates[1]["stop"] == 4
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_empty_archive(tmp_path, mmap):
+    path = tmp_path / "e.kres"
+    assert save_archive(path, [_plate(0)]) == 0
+
+    archive = load_archive(path, mmap=mmap)
+    assert len(archive) == 0
+    assert archive.сақлаш_холати.dtype == np.int8
+    assert len(archive.to_frame()) == 0
+
+
+def test_write_at_nonzero_offset(tmp_path):
+    # Устун offset'лари архив бошига нисбатан - олдинда бошқа маълумот
+    # бўлса ҳам текислаш тўғри қолиши керак
+    plates = [_plate(5, "ТТГ", 1), _plate(9, "Т4", 2)]
+    prefix = b"x" * 37
+    output = io.BytesIO()
+    output.write(prefix)
+    save_archive(output, plates)
+    data = output.getvalue()
+    assert data[:len(prefix)] == prefix
+    assert data[len(prefix):] == archive_bytes(plates)
+
+    path = tmp_path / "o.kres"
+    path.write_bytes(data[len(prefix):])
+    archive = load_archive(path)
+    _assert_plates(archive, plates)
+
+
+def test_columns_are_aligned(tmp_path):
+    path = tmp_path / "a.kres"
+    save_archive(path, [_plate(13)])
+    archive = load_archive(path)
+    assert all(column.offset % ALIGNMENT == 0
+               for column in (archive.оптик_зичлик, archive.концентрация,
+                              archive.сақлаш_холати, archive.пластина))
+
+
+def test_rejects_bad_magic(tmp_path):
+    path = tmp_path / "bad.kres"
+    data = bytearray(archive_bytes([_plate(3)]))
+    data[:len(MAGIC)] = b"NOTKRES\0"
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="архиви эмас"):
+        load_archive(path)
+
+
+def test_rejects_truncated_file(tmp_path):
+    path = tmp_path / "short.kres"
+    path.write_bytes(MAGIC[:4])
+    with pytest.raises(ValueError, match="архиви эмас"):
+        load_archive(path)
+
+
+def test_rejects_unknown_version(tmp_path):
+    path = tmp_path / "v.kres"
+    data = bytearray(archive_bytes([_plate(3)]))
+    data[len(MAGIC):len(MAGIC) + 2] = np.uint16(ARCHIVE_VERSION + 1).astype("<u2").tobytes()
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match=f"версияси {ARCHIVE_VERSION + 1}"):
+        load_archive(path)
@@ -0,0 +1,53 @@
+# tests/test_batch.py
+"""Кўп пластинали интерполяция: ҳар бир пластинани алоҳида ҳисоблаш билан мослик"""
+import numpy as np
+import pytest
+
+from kalibrovka.batch import classify_batch, interpolate_batch
+from kalibrovka.engine import интерполяция
+
+
+def _plates(seed, N=40, k=8, m=300):
+    rng = np.random.default_rng(seed)
+    оптик = np.sort(rng.uniform(0.02, 2.5, (N, k)), axis=1)
+    концентрация = np.sort(rng.uniform(0.0, 200.0, (N, k)), axis=1)
+    # Аралаш тартиб ва турли сондаги стандартлар (padding)
+    оптик = rng.permuted(оптик, axis=1)
+    n_valid = rng.integers(4, k + 1, N)
+    for i, n in enumerate(n_valid):
+        оптик[i, n:] = np.nan
+        концентрация[i, n:] = np.nan
+    беморлар = rng.uniform(-0.2, 3.0, (N, m))
+    беморлар[0, :5] = np.nan
+    return оптик, концентрация, беморлар
+
+
+@pytest.mark.parametrize("усул", ["linear", "spline", "quadratic"])
+def test_batch_matches_single_plate(усул):
+    оптик, концентрация, беморлар = _plates(1)
+    batch_концентрация, batch_ҳолат = interpolate_batch(оптик, концентрация, беморлар, усул)
+
+    for i in range(оптик.shape[0]):
+        ok = ~np.isnan(оптик[i])
+        концентрация_i, ҳолат_i = интерполяция(оптик[i, ok], концентрация[i, ok], беморлар[i], усул)
+        np.testing.assert_array_equal(batch_концентрация[i], концентрация_i)
+        np.testing.assert_array_equal(batch_ҳолат[i], ҳолат_i)
+    assert np.isnan(batch_концентрация[0, :5]).all()
+
+
+def test_plate_with_too_few_standards_is_nan():
+    оптик = np.array([[0.1, 0.5, 0.9], [0.2, np.nan, np.nan]])
+    концентрация = np.array([[1.0, 5.0, 9.0], [2.0, np.nan, np.nan]])
+    result, _ = interpolate_batch(оптик, концентрация, [[0.3, 0.7], [0.3, 0.7]])
+    np.testing.assert_allclose(result[0], [3.0, 7.0])
+    assert np.isnan(result[1]).all()
+
+
+def test_classify_ignores_padding():
+    ҳолат = classify_batch([[0.1, 0.9, np.nan]], [[0.05, 0.5, 1.0]])
+    assert ҳолат.tolist() == [[-1, 0, 1]]
+
+
+def test_shape_mismatch():
+    with pytest.raises(ValueError):
+        interpolate_batch(np.ones((2, 3)), np.ones((2, 3)), np.ones((3, 4)))
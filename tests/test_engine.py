@@ -0,0 +1,91 @@
+# tests/test_engine.py
+"""Калибровка ядроси: SciPy interp1d ва иловадаги эски йўл билан мослик"""
+import warnings
+
+import numpy as np
+import pytest
+from scipy.interpolate import interp1d
+
+from kalibrovka.engine import LinearInterpolator, fit_curve, интерполяция, статистика_ҳисоблаш
+
+_KIND = {"linear": "linear", "spline": "cubic", "quadratic": "quadratic"}
+
+
+def _эски_интерполяция(оптик_зичлик_стандарт, концентрация_стандарт, оптик_зичлик_беморлар, усул):
+    """Пакетдан олдин иловадаги ҳисоблаш (st.error'сиз)"""
+    оптик_зичлик_стандарт = np.array(оптик_зичлик_стандарт, dtype=float)
+    концентрация_стандарт = np.array(концентрация_стандарт, dtype=float)
+    оптик_зичлик_беморлар = np.array(оптик_зичлик_беморлар, dtype=float)
+    tartib = np.argsort(оптик_зичлик_стандарт)
+    оптик_зичлик_стандарт = оптик_зичлик_стандарт[tartib]
+    концентрация_стандарт = концентрация_стандарт[tartib]
+
+    f = interp1d(оптик_зичлик_стандарт, концентрация_стандарт, kind=_KIND[усул], fill_value="extrapolate")
+    концентрация_беморлар = f(оптик_зичлик_беморлар)
+    сақлаш_холати = np.zeros_like(концентрация_беморлар, dtype=int)
+    сақлаш_холати[оптик_зичлик_беморлар < оптик_зичлик_стандарт.min()] = -1
+    сақлаш_холати[оптик_зичлик_беморлар > оптик_зичлик_стандарт.max()] = 1
+    return концентрация_беморлар, сақлаш_холати
+
+
+def _plate(seed, n_standards=8, n_patients=500):
+    rng = np.random.default_rng(seed)
+    оптик = rng.permutation(np.sort(rng.uniform(0.02, 2.5, n_standards)))
+    концентрация = np.sort(rng.uniform(0.0, 200.0, n_standards))[np.argsort(np.argsort(оптик))]
+    беморлар = rng.uniform(-0.2, 3.0, n_patients)
+    # Тугунларнинг ўзи ва четлари ҳам текширилади
+    return оптик, концентрация, np.concatenate([беморлар, оптик, [0.0, np.nan]])
+
+
+@pytest.mark.parametrize("усул", ["linear", "spline", "quadratic"])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_old_code_path(усул, seed):
+    оптик, концентрация, беморлар = _plate(seed)
+    эски_концентрация, эски_ҳолат = _эски_интерполяция(оптик, концентрация, беморлар, усул)
+    янги_концентрация, янги_ҳолат = интерполяция(оптик, концентрация, беморлар, усул)
+
+    np.testing.assert_array_equal(янги_концентрация, эски_концентрация)
+    np.testing.assert_array_equal(янги_ҳолат, эски_ҳолат)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_linear_kernel_bitwise_equal_to_interp1d(seed):
+    оптик, концентрация, беморлар = _plate(seed, n_standards=2 + seed % 7)
+    tartib = np.argsort(оптик)
+    x, y = оптик[tartib], концентрация[tartib]
+
+    expected = interp1d(x, y, fill_value="extrapolate")(беморлар)
+    np.testing.assert_array_equal(LinearInterpolator(x, y)(беморлар), expected)
+
+
+def test_linear_kernel_duplicate_od_is_silent():
+    x = np.array([0.1, 0.4, 0.4, 0.9])
+    y = np.array([1.0, 4.0, 5.0, 9.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = LinearInterpolator(x, y)([0.05, 0.2, 0.4, 0.6, 1.0])
+    assert np.isfinite(result[[0, 1, 3, 4]]).all()
+
+
+def test_linear_kernel_rejects_bad_standards():
+    with pytest.raises(ValueError):
+        LinearInterpolator([0.1], [1.0])
+    with pytest.raises(ValueError):
+        LinearInterpolator([0.1, 0.2], [1.0])
+
+
+def test_fit_curve_is_cached_and_order_independent():
+    оптик, концентрация, _ = _plate(0)
+    tartib = np.argsort(оптик)
+    assert fit_curve(оптик, концентрация) is fit_curve(оптик[tartib], концентрация[tartib])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        fit_curve([0.1, 0.2], [1.0, 2.0], "cubic")
+
+
+def test_statistics():
+    assert статистика_ҳисоблаш([-1, 0, 0, 1, 1, 1]) == {
+        "Жами беморлар": 6, "Нормал диапазонда": 2, "Пастки диапазон": 1, "Юкори диапазон": 3,
+    }
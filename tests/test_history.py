@@ -0,0 +1,99 @@
+# tests/test_history.py
+"""Ҳисоблашлар тарихи (SQLite): ёзиш, сўровлар ва хатоликлар"""
+import time
+
+import numpy as np
+import pytest
+
+from kalibrovka.history import RunHistory, RunRecord
+
+СТАНДАРТЛАР = [[0.05, 0.0], [0.25, 2.0], [0.55, 5.0], [1.05, 10.0]]
+
+
+def _record(гормон_номи="ТТГ", лот="L1", ҳолат=(0, 0, 1, -1), вақт=None, манба=None):
+    ҳолат = np.array(ҳолат, dtype=np.int8)
+    оптик = np.linspace(0.1, 1.0, ҳолат.size)
+    return RunRecord(гормон_номи, "мкМЕ/мл", лот, "linear", СТАНДАРТЛАР, оптик, оптик * 10, ҳолат,
+                     манба=манба, вақт=вақт)
+
+
+def test_unreadable_timestamp_falls_back_to_now(tmp_path):
+    history = RunHistory(tmp_path / "h.db")
+    start = time.time()
+    ids = history.write([_record(вақт="01.05.2024", манба="a"), _record(вақт="2024-05-02T10:00:00", манба="b")])
+    assert len(ids) == 2
+
+    runs = {r["source"]: r for r in history.runs()}
+    assert runs["a"]["created"] >= start
+    assert runs["b"]["created"] < start
+    history.close()
+
+
+def test_bad_record_does_not_roll_back_batch(tmp_path):
+    history = RunHistory(tmp_path / "h.db")
+    bad = _record(манба="bad")
+    bad.стандартлар = {1, 2}  # JSON'га айланмайди
+    ids = history.write([_record(манба="a"), bad, _record(манба="b")])
+
+    assert len(ids) == 2 and history.errors == 1
+    assert sorted(r["source"] for r in history.runs()) == ["a", "b"]
+    history.close()
+
+
+def test_writer_thread_batches_and_close_flushes(tmp_path):
+    history = RunHistory(tmp_path / "h.db", batch_size=50, flush_interval=0.2)
+    for i in range(120):
+        history.record(_record(манба=str(i)))
+    history.flush()
+    assert history.info()["runs"] == 120
+    assert history.written == 120 and 3 <= history.batches < 120
+
+    history.record(_record(манба="last"))
+    history.close()
+    assert RunHistory(tmp_path / "h.db").info()["runs"] == 121
+    with pytest.raises(RuntimeError):
+        history.record(_record())
+
+
+def test_run_round_trip(tmp_path):
+    history = RunHistory(tmp_path / "h.db")
+    record = _record(ҳолат=(0, 1, -1))
+    record.концентрация = np.array([1.0, np.nan, 3.0])
+    record.параметрлар = {"параметрлар": [1.0, 2.0]}
+    (run_id,) = history.write([record])
+
+    run = history.run(run_id)
+    assert run["standards"] == СТАНДАРТЛАР and run["params"] == {"параметрлар": [1.0, 2.0]}
+    np.testing.assert_array_equal(run["od"], record.оптик_зичлик)
+    np.testing.assert_array_equal(run["conc"], [1.0, np.nan, 3.0])
+    assert run["status"].tolist() == [0, 1, -1]
+    assert (run["n_total"], run["n_high"], run["n_low"]) == (3, 1, 1)
+    assert history.run(run_id + 1) is None
+    history.close()
+
+
+def test_query_filters(tmp_path):
+    history = RunHistory(tmp_path / "h.db")
+    history.write([
+        _record("ТТГ", "L1", (0, 0, 0, 1), вақт="2024-05-01T10:00:00", манба="a"),
+        _record("ТТГ", "L2", (1, 1, 0, 0), вақт="2024-05-10T10:00:00", манба="b"),
+        _record("Т4", "L1", (1, 0, 0, 0), вақт="2024-06-01T10:00:00", манба="c"),
+        _record(" ТТГ ", "L1", (0, 0, 0, 0), вақт="2024-06-05T10:00:00", манба="d"),
+    ])
+
+    def sources(**kwargs):
+        return [r["source"] for r in history.runs(**kwargs)]
+
+    assert sources() == ["d", "c", "b", "a"]
+    assert sources(гормон_номи="ТТГ") == ["d", "b", "a"]
+    assert sources(лот="L1") == ["d", "c", "a"]
+    assert sources(since="2024-05-05", until="2024-06-01T10:00:00") == ["b"]
+    assert sources(гормон_номи="ТТГ", min_high=0.5) == ["b"]
+    assert sources(min_high=0.25, limit=2) == ["c", "b"]
+
+    flagged = history.flagged("high", гормон_номи="ТТГ")
+    assert [(f["lot"], f["well"]) for f in flagged] == [("L2", 1), ("L2", 2), ("L1", 4)]
+    assert history.flagged("low") == []
+    with pytest.raises(ValueError):
+        history.flagged("normal")
+    history.close()
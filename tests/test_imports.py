@@ -0,0 +1,24 @@
+# tests/test_imports.py
+"""Пакет импорти енгил: ядро фақат NumPy'га боғлиқ"""
+import subprocess
+import sys
+from pathlib import Path
+
+import kalibrovka
+
+ОҒИР = ("asyncio", "sqlite3", "multiprocessing", "http", "scipy", "pandas", "plotly")
+
+
+def test_import_loads_only_numpy_core():
+    code = (
+        "import sys, kalibrovka\n"
+        f"print(','.join(m for m in {ОҒИР!r} if m in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=Path(__file__).resolve().parents[1])
+    assert output.stdout.strip() == ""
+
+
+def test_lazy_names_resolve():
+    for name in kalibrovka.__all__:
+        assert getattr(kalibrovka, name) is not None
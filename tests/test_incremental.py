@@ -0,0 +1,89 @@
+# tests/test_incremental.py
+"""Инкрементал янгилаш тўлиқ қайта ҳисоблаш билан бит бўйича бир хил"""
+import numpy as np
+import pytest
+
+from kalibrovka.incremental import _same, changed_rows, patch_result, update_result
+
+СТАНДАРТЛАР_OD = np.array([0.05, 0.25, 0.55, 1.05, 1.6])
+СТАНДАРТЛАР_КОНЦ = np.array([0.0, 2.0, 5.0, 10.0, 20.0])
+
+
+def _full(оптик, усул="linear", улчов_бирлиги="мкМЕ/мл"):
+    натижа, _ = update_result(None, СТАНДАРТЛАР_OD, СТАНДАРТЛАР_КОНЦ, оптик, улчов_бирлиги, усул)
+    return натижа
+
+
+def _assert_same_result(натижа, кутилган):
+    assert _same(натижа.оптик_зичлик_беморлар, кутилган.оптик_зичлик_беморлар)
+    assert _same(натижа.концентрация_беморлар, кутилган.концентрация_беморлар)
+    np.testing.assert_array_equal(натижа.сақлаш_холати, кутилган.сақлаш_холати)
+    assert натижа.статистика == кутилган.статистика
+    assert натижа.улчов_бирлиги == кутилган.улчов_бирлиги
+
+
+def _edit(rng, оптик):
+    оптик = оптик.copy()
+    тур = rng.integers(4)
+    if тур == 0:
+        i = rng.integers(оптик.size, size=rng.integers(1, 4))
+        оптик[i] = rng.uniform(-0.1, 2.0, i.size)
+    elif тур == 1:
+        оптик = np.concatenate([оптик, rng.uniform(-0.1, 2.0, rng.integers(1, 4))])
+    elif тур == 2 and оптик.size > 3:
+        оптик = оптик[:-rng.integers(1, 3)]
+    else:
+        оптик[rng.integers(оптик.size)] = np.nan
+    return оптик
+
+
+@pytest.mark.parametrize("усул", ["linear", "spline", "4pl"])
+def test_edit_sequence_matches_full_recompute(усул):
+    rng = np.random.default_rng(7)
+    оптик = rng.uniform(-0.1, 2.0, 40)
+    натижа = _full(оптик, усул)
+    турлар = set()
+    for _ in range(60):
+        оптик = _edit(rng, оптик)
+        натижа, янгиланиш = update_result(натижа, СТАНДАРТЛАР_OD, СТАНДАРТЛАР_КОНЦ, оптик,
+                                          "мкМЕ/мл", усул)
+        турлар.add(янгиланиш.тур)
+        _assert_same_result(натижа, _full(оптик, усул))
+    assert "rows" in турлар
+
+
+def test_statistics_patch_counts_removed_and_added_rows():
+    оптик = np.array([0.01, 0.3, 0.4, 1.9, 0.6])
+    олдинги = _full(оптик)
+    янги = np.array([0.3, 0.3, 0.4, 1.9])
+    натижа, янгиланиш = patch_result(олдинги, янги)
+    assert янгиланиш.тур == "rows" and янгиланиш.сони == 1
+    assert натижа.статистика == {
+        "Жами беморлар": 4, "Нормал диапазонда": 3, "Пастки диапазон": 0, "Юкори диапазон": 1,
+    }
+    _assert_same_result(натижа, _full(янги))
+
+
+def test_unit_change_shares_arrays():
+    олдинги = _full(np.array([0.1, 0.5, 1.2]))
+    натижа, янгиланиш = patch_result(олдинги, олдинги.оптик_зичлик_беморлар, "нг/мл")
+    assert янгиланиш.тур == "same" and натижа.улчов_бирлиги == "нг/мл"
+    assert натижа.концентрация_беморлар is олдинги.концентрация_беморлар
+
+
+def test_many_changed_rows_use_one_vector_pass():
+    олдинги = _full(np.linspace(0.1, 1.5, 10))
+    янги = np.linspace(0.2, 1.8, 10)
+    натижа, янгиланиш = patch_result(олдинги, янги)
+    assert янгиланиш.тур == "patients"
+    _assert_same_result(натижа, _full(янги, улчов_бирлиги=олдинги.улчов_бирлиги))
+
+
+def test_standards_change_refits_curve():
+    олдинги = _full(np.array([0.1, 0.5]))
+    _, янгиланиш = update_result(олдинги, СТАНДАРТЛАР_OD * 1.01, СТАНДАРТЛАР_КОНЦ, [0.1, 0.5], "мкМЕ/мл")
+    assert янгиланиш.тур == "curve"
+
+
+def test_changed_rows_treats_nan_as_equal():
+    assert changed_rows([0.1, np.nan, 0.3], [0.1, np.nan, 0.4, 0.5]).tolist() == [2, 3]
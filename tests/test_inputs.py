@@ -0,0 +1,50 @@
+# tests/test_inputs.py
+"""Нусхаланган матндан устунларни ўқиш"""
+import numpy as np
+
+from kalibrovka.inputs import parse_columns, parse_columns_report
+
+
+def test_decimal_comma_single_column():
+    assert parse_columns("0,15\n0,25", 1).ravel().tolist() == [0.15, 0.25]
+
+
+def test_decimal_comma_when_comma_split_has_extra_fields():
+    assert parse_columns("0,15 1,2\n0.3,3", 2).tolist() == [[0.15, 1.2], [0.3, 3.0]]
+
+
+def test_strong_separator_with_decimal_comma():
+    assert parse_columns("0,15;1,2\n0,25\t2,4", 2).tolist() == [[0.15, 1.2], [0.25, 2.4]]
+
+
+def test_comma_separated_pairs():
+    assert parse_columns("0.1,1\n0.2,2", 2).tolist() == [[0.1, 1.0], [0.2, 2.0]]
+
+
+def test_csv_header_selects_named_column():
+    data = "№,Оптик зичлик\n1,0.15\n2,0.25\n".encode("utf-8-sig")
+    assert parse_columns(data, 1, ["Оптик зичлик"]).ravel().tolist() == [0.15, 0.25]
+
+
+def test_horizontal_row_and_non_numeric_lines():
+    result = parse_columns("изоҳ\n0.1\t0.2\t0.3\nabc", 1)
+    np.testing.assert_array_equal(result.ravel(), [0.1, 0.2, 0.3])
+    assert parse_columns("", 2).shape == (0, 2)
+
+
+def test_comma_separated_single_column():
+    assert parse_columns("0.1,0.2,0.3", 1).ravel().tolist() == [0.1, 0.2, 0.3]
+    assert parse_columns("0.1, 0.2", 1).ravel().tolist() == [0.1, 0.2]
+    assert parse_columns("1,2,3", 1).ravel().tolist() == [1.0, 2.0, 3.0]
+    # Битта вергул, нуқтасиз ва бўшлиқсиз - ўнлик белги
+    assert parse_columns("0,15\n0,15 0,25", 1).ravel().tolist() == [0.15, 0.15, 0.25]
+
+
+def test_skipped_lines_are_counted():
+    result, skipped = parse_columns_report("OD\n0.1,0.2\nabc\n0.3\n\n1,a,2", 1)
+    assert result.ravel().tolist() == [0.1, 0.2, 0.3]
+    assert skipped == 3
+
+    result, skipped = parse_columns_report("Оптик зичлик,Концентрация\n0.1,1\n0.2\n0.3,3", 2,
+                                           ["Оптик зичлик", "Концентрация"])
+    assert result.tolist() == [[0.1, 1.0], [0.3, 3.0]] and skipped == 1
@@ -0,0 +1,140 @@
+# tests/test_logistic.py
+"""4PL/5PL мослаш: яқинлашиш, илиқ старт ва яқинлашмаслик"""
+import warnings
+
+import numpy as np
+import pytest
+
+from kalibrovka.batch import fit_plates
+from kalibrovka.engine import clear_curve_cache, fit_curve
+from kalibrovka.logistic import (FitWarning, LogisticFitter, _degenerate, _to_theta, fit_logistic,
+                                 fit_logistic_batch, logistic_forward, logistic_inverse)
+
+КОНЦЕНТРАЦИЯ = np.array([0.0, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0])
+
+
+@pytest.mark.parametrize("усул, параметрлар", [
+    ("4pl", (0.05, 1.4, 8.0, 2.5)),
+    ("5pl", (0.05, 1.4, 8.0, 2.5, 0.7)),
+])
+def test_clean_data_converges_to_true_parameters(усул, параметрлар):
+    оптик = logistic_forward(параметрлар, КОНЦЕНТРАЦИЯ)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FitWarning)
+        натижа = fit_logistic(КОНЦЕНТРАЦИЯ, оптик, усул)
+
+    assert натижа.маълумот.converged and not натижа.маълумот.stalled
+    assert натижа.маълумот.sse < 1e-12
+    np.testing.assert_allclose(натижа.параметрлар, параметрлар, rtol=1e-4)
+    np.testing.assert_allclose(logistic_inverse(натижа.параметрлар, оптик[1:]), КОНЦЕНТРАЦИЯ[1:], rtol=1e-5)
+
+
+def test_warm_start_takes_fewer_iterations():
+    rng = np.random.default_rng(3)
+    fitter = LogisticFitter("4pl")
+    for _ in range(20):
+        оптик = logistic_forward((0.05, 1.4, 8.0, 2.5), КОНЦЕНТРАЦИЯ) * (1 + 0.01 * rng.standard_normal(КОНЦЕНТРАЦИЯ.size))
+        fitter.fit(КОНЦЕНТРАЦИЯ, оптик)
+
+    cold, *warm = fitter.history
+    assert all(m.converged for m in fitter.history)
+    assert all(m.warm_start for m in warm)
+    assert np.mean([m.iterations for m in warm]) < cold.iterations
+
+
+def _degenerate_chain():
+    # Илиқ стартлар занжирида 32-пластина b=0 (log b underflow) га тушарди
+    оптик = np.sort(np.random.default_rng(0).uniform(0.05, 2.0, (200, 7)), axis=1)[:40]
+    return оптик, 100.0 / (1.0 + (оптик / 0.8) ** -1.5)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_warm_start_degenerate_minimum_is_rejected():
+    оптик, концентрация = _degenerate_chain()
+    fitter = LogisticFitter("4pl")
+    for i in range(33):
+        натижа = fitter.fit(концентрация[i], оптик[i])
+    cold = fit_logistic(концентрация[32], оптик[32], "4pl")
+
+    assert not _degenerate(_to_theta(натижа.параметрлар, "4pl"))
+    assert натижа.маълумот.sse <= cold.маълумот.sse * (1 + 1e-9)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_warm_started_plates_have_valid_parameters():
+    оптик, концентрация = _degenerate_chain()
+    clear_curve_cache()
+    curves = fit_plates(оптик, концентрация, "4pl")
+    for curve in curves:
+        a, b, c, d = curve.параметрлар
+        assert np.isfinite(curve.параметрлар).all() and b > 0 and c > 0
+    assert np.isfinite(curves[32]([50.0])).all()
+
+
+def test_degenerate_parameters():
+    # theta = (a, d, log c, log b): exp underflow нол беради
+    assert _degenerate(np.array([0.1, 2.0, 0.0, -800.0]))
+    assert _degenerate(np.array([0.1, 2.0, -800.0, 0.0]))
+    assert _degenerate(np.array([0.1, np.nan, 0.0, 0.0]))
+    assert not _degenerate(_to_theta((0.1, 1.5, 8.0, 2.0), "4pl"))
+
+
+def test_iteration_limit_is_not_converged():
+    оптик = logistic_forward((0.05, 1.4, 8.0, 2.5), КОНЦЕНТРАЦИЯ)
+    with pytest.warns(FitWarning, match="итерацияда яқинлашмади"):
+        натижа = fit_logistic(КОНЦЕНТРАЦИЯ, оптик, "4pl", max_iter=1)
+    assert not натижа.маълумот.converged and not натижа.маълумот.stalled
+
+
+@pytest.mark.filterwarnings("ignore:.* encountered in:RuntimeWarning")
+def test_stalled_fit_is_not_converged():
+    # Тасодифий OD'лар - демпфирлаш SSE'ни камайтира олмайди, градиент катта
+    оптик = np.random.default_rng(1).random(КОНЦЕНТРАЦИЯ.size)
+    with pytest.warns(FitWarning, match="тўхтаб қолди"):
+        натижа = fit_logistic(КОНЦЕНТРАЦИЯ, оптик, "4pl")
+    assert натижа.маълумот.stalled and not натижа.маълумот.converged
+
+
+def test_batch_matches_single_fits():
+    rng = np.random.default_rng(5)
+    оптик = logistic_forward((0.05, 1.4, 8.0, 2.5), КОНЦЕНТРАЦИЯ) * (1 + 0.02 * rng.standard_normal((30, КОНЦЕНТРАЦИЯ.size)))
+    параметрлар, converged = fit_logistic_batch(КОНЦЕНТРАЦИЯ, оптик, "4pl")
+
+    assert converged.all()
+    for i in range(оптик.shape[0]):
+        single = fit_logistic(КОНЦЕНТРАЦИЯ, оптик[i], "4pl")
+        np.testing.assert_allclose(
+            logistic_forward(параметрлар[i], КОНЦЕНТРАЦИЯ),
+            logistic_forward(single.параметрлар, КОНЦЕНТРАЦИЯ), atol=1e-6,
+        )
+
+
+def test_too_few_standards_and_negative_concentration():
+    with pytest.raises(ValueError):
+        fit_logistic(КОНЦЕНТРАЦИЯ[:4], np.ones(4), "5pl")
+    with pytest.raises(ValueError):
+        fit_logistic(-КОНЦЕНТРАЦИЯ, np.ones(КОНЦЕНТРАЦИЯ.size), "4pl")
+
+
+def test_curve_reports_fit_info():
+    оптик = logistic_forward((0.05, 1.4, 8.0, 2.5), КОНЦЕНТРАЦИЯ)
+    curve = fit_curve(оптик, КОНЦЕНТРАЦИЯ, "4pl")
+    assert curve.маълумот.converged
+    np.testing.assert_allclose(curve(оптик[1:]), КОНЦЕНТРАЦИЯ[1:], rtol=1e-5)
+
+
+def test_inverse_with_degenerate_parameters_does_not_raise():
+    натижа = logistic_inverse((0.7, 0.0, 1e-97, 1.5), [0.5, 1.0])
+    assert натижа.shape == (2,)
+    assert logistic_forward((0.7, 0.0, 1e-97, 1.5, 0.0), [1.0]).shape == (1,)
+
+
+def test_warm_started_fit_is_not_cached():
+    оптик = logistic_forward((0.05, 1.4, 8.0, 2.5), КОНЦЕНТРАЦИЯ)
+    clear_curve_cache()
+    warm = fit_curve(оптик, КОНЦЕНТРАЦИЯ, "4pl", (0.06, 1.2, 7.0, 2.4))
+    cold = fit_curve(оптик, КОНЦЕНТРАЦИЯ, "4pl")
+
+    assert warm.маълумот.warm_start and not cold.маълумот.warm_start
+    # Кэшдаги совуқ мослаш илиқ стартли чақирувда ҳам қайтарилади
+    assert fit_curve(оптик, КОНЦЕНТРАЦИЯ, "4pl", (0.06, 1.2, 7.0, 2.4)) is cold
@@ -0,0 +1,58 @@
+# tests/test_lut.py
+"""Жадвал режими: хатолик чегараси ва оралиқдан ташқари аниқ йўл"""
+import numpy as np
+import pytest
+
+from kalibrovka.engine import fit_curve
+from kalibrovka.logistic import logistic_forward
+from kalibrovka.lut import compile_lut, load_lut
+
+КОНЦЕНТРАЦИЯ = np.array([0.0, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0])
+ОПТИК = logistic_forward((0.05, 1.4, 8.0, 2.5), КОНЦЕНТРАЦИЯ)
+
+
+@pytest.mark.parametrize("усул", ["linear", "spline", "quadratic", "4pl", "5pl"])
+@pytest.mark.parametrize("max_error", [1e-2, 1e-3])
+def test_error_bound_holds_on_dense_sample(усул, max_error):
+    curve = fit_curve(ОПТИК, КОНЦЕНТРАЦИЯ, усул)
+    lut = compile_lut(curve, max_error)
+    assert lut.error_bound <= max_error
+
+    od = np.random.default_rng(0).uniform(curve.min_od, curve.max_od, 200_000)
+    od = np.concatenate([od, curve.оптик])
+    assert np.nanmax(np.abs(lut(od) - curve(od))) <= max_error
+
+
+def test_default_bound_is_relative_to_concentration_span():
+    curve = fit_curve(ОПТИК, КОНЦЕНТРАЦИЯ, "spline")
+    lut = compile_lut(curve)
+    assert lut.error_bound <= 1e-6 * np.ptp(КОНЦЕНТРАЦИЯ)
+
+
+def test_outside_range_uses_exact_curve():
+    curve = fit_curve(ОПТИК, КОНЦЕНТРАЦИЯ, "linear")
+    lut = compile_lut(curve, 1e-3)
+    od = np.array([[curve.min_od - 0.01, np.nan], [curve.max_od + 0.2, curve.max_od]])
+    np.testing.assert_array_equal(lut(od)[~np.isnan(od)], curve(od)[~np.isnan(od)])
+    assert lut(od).shape == od.shape
+    np.testing.assert_array_equal(lut.classify(od), curve.classify(od))
+
+
+def test_unreachable_bound_raises():
+    curve = fit_curve(ОПТИК, КОНЦЕНТРАЦИЯ, "spline")
+    with pytest.raises(ValueError):
+        compile_lut(curve, 1e-12, max_cells=1024)
+    with pytest.raises(ValueError):
+        compile_lut(fit_curve([0.2, 0.2], [1.0, 2.0], "linear"))
+
+
+def test_save_and_load(tmp_path):
+    curve = fit_curve(ОПТИК, КОНЦЕНТРАЦИЯ, "4pl")
+    lut = compile_lut(curve, 1e-3)
+    path = tmp_path / "curve.npz"
+    lut.save(path)
+
+    loaded = load_lut(path)
+    od = np.linspace(0.0, 3.0, 1001)
+    np.testing.assert_array_equal(loaded(od), lut(od))
+    assert loaded.error_bound == lut.error_bound
@@ -0,0 +1,41 @@
+# tests/test_multiplex.py
+"""Кўп аналитли пластина: ҳар бир аналитни алоҳида ҳисоблаш билан мослик"""
+import numpy as np
+import pytest
+
+from kalibrovka.engine import интерполяция, статистика_ҳисоблаш
+from kalibrovka.multiplex import (Analyte, build_multiplex_config, evaluate_multiplex,
+                                  multiplex_from_config, validate_multiplex_config)
+
+АНАЛИТЛАР = (
+    Analyte.create("ТТГ", "мкМЕ/мл", [(0.05, 0.0), (0.3, 2.0), (0.9, 6.0), (1.6, 20.0)]),
+    Analyte.create("Т4", "нмоль/л", [(1.8, 0.0), (0.2, 200.0), (1.1, 40.0), (0.5, 100.0)], "spline"),
+    Analyte.create("Т3", "нмоль/л", [(0.1, 0.5), (0.4, 2.0), (0.7, 4.0), (1.2, 8.0), (1.5, 9.0)]),
+)
+
+
+def test_matches_single_analyte_results():
+    оптик = np.random.default_rng(2).uniform(-0.1, 2.0, (200, len(АНАЛИТЛАР)))
+    натижа = evaluate_multiplex(АНАЛИТЛАР, оптик)
+
+    for i, analyte in enumerate(АНАЛИТЛАР):
+        концентрация, ҳолат = интерполяция(analyte.оптик, analyte.концентрация, оптик[:, i], analyte.усул)
+        np.testing.assert_array_equal(натижа.концентрация[:, i], концентрация)
+        np.testing.assert_array_equal(натижа.сақлаш_холати[:, i], ҳолат)
+        assert натижа.analyte_result(i).статистика == статистика_ҳисоблаш(ҳолат)
+    assert натижа.статистика["Т4: Жами беморлар"] == 200
+
+
+def test_config_round_trip():
+    оптик = [[0.1, 0.5, 0.6], [0.2, 0.7, 1.3]]
+    config_data = validate_multiplex_config(build_multiplex_config(АНАЛИТЛАР, оптик))
+    аналитлар, беморлар = multiplex_from_config(config_data)
+    assert аналитлар == АНАЛИТЛАР
+    np.testing.assert_array_equal(беморлар, оптик)
+
+
+def test_shape_and_name_checks():
+    with pytest.raises(ValueError):
+        evaluate_multiplex(АНАЛИТЛАР, np.ones((3, 2)))
+    with pytest.raises(ValueError):
+        evaluate_multiplex(АНАЛИТЛАР[:1] * 2, np.ones((3, 2)))
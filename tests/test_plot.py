@@ -0,0 +1,36 @@
+# tests/test_plot.py
+"""График нуқталарини сийраклаштириш"""
+import numpy as np
+
+from kalibrovka.plot import decimate
+
+
+def _cloud(n=200_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.random(n)
+    y = rng.random(n)
+    # Четдаги нуқталар - массив ўртасида, текис танлашда тушиб қолади
+    x[n // 2 + 1], y[n // 2 + 1] = 5.0, 0.5
+    y[n // 3 + 7] = -4.0
+    return x, y
+
+
+def test_small_input_is_kept_except_non_finite():
+    x = np.array([0.1, np.nan, 0.3])
+    assert decimate(x, [1.0, 2.0, np.inf]).tolist() == [0]
+    assert decimate([0.1, 0.2], [1.0, 2.0]).tolist() == [0, 1]
+
+
+def test_cap_keeps_outliers():
+    x, y = _cloud()
+    for max_points in (20000, 5000, 300, 10):
+        index = decimate(x, y, max_points=max_points)
+        assert index.size <= max_points
+        assert np.all(np.diff(index) > 0)
+        assert x.size // 2 + 1 in index
+        assert x.size // 3 + 7 in index
+
+
+def test_deterministic():
+    x, y = _cloud()
+    assert np.array_equal(decimate(x, y, max_points=1000), decimate(x.copy(), y.copy(), max_points=1000))
@@ -0,0 +1,134 @@
+# tests/test_registry.py
+"""Эгри чизиқлар реестри: битта мослаш, диск ва ҳисоблагичлар"""
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from kalibrovka import registry as registry_module
+from kalibrovka.registry import CurveRegistry, registry_key
+
+ОПТИК = [0.05, 0.25, 0.55, 1.05, 1.6]
+КОНЦЕНТРАЦИЯ = [0.0, 2.0, 5.0, 10.0, 20.0]
+
+
+def _fit(registry, лот="L1", усул="linear"):
+    return registry.get_or_fit("ТТГ", "мкМЕ/мл", лот, ОПТИК, КОНЦЕНТРАЦИЯ, усул)
+
+
+@pytest.fixture
+def slow_fits(monkeypatch):
+    """from_standards ни секинлаштириш ва чақирувлар сонини санаш"""
+    calls = []
+    original = registry_module.CalibrationCurve.from_standards
+
+    def from_standards(*args, **kwargs):
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(registry_module.CalibrationCurve, "from_standards", from_standards)
+    return calls
+
+
+def test_concurrent_get_or_fit_fits_once(slow_fits):
+    registry = CurveRegistry()
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(_fit(registry))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(slow_fits) == 1
+    assert len(results) == 8
+    curves = {id(curve) for curve, _ in results}
+    assert len(curves) == 1
+    assert sorted(cached for _, cached in results) == [False] + [True] * 7
+    assert registry.info()["fits"] == 1
+
+
+def test_failed_fit_is_not_stored():
+    registry = CurveRegistry()
+    with pytest.raises(ValueError):
+        registry.get_or_fit("ТТГ", "мкМЕ/мл", "L1", [0.1], [1.0], "linear")
+    assert registry.info()["fits"] == 0
+    assert registry._inflight == {}
+
+
+def test_counters():
+    registry = CurveRegistry()
+    curve, cached = _fit(registry)
+    assert not cached
+    again, cached = _fit(registry)
+    assert cached and again is curve
+    _fit(registry, лот="L2")
+
+    info = registry.info()
+    assert info["fits"] == 2
+    assert info["hits"] == 1
+    assert info["disk_hits"] == 0 and info["disk_errors"] == 0
+
+    registry.clear()
+    info = registry.info()
+    assert (info["fits"], info["hits"], info["size"]) == (0, 0, 0)
+
+
+def test_disk_persist_and_reload(tmp_path):
+    first = CurveRegistry(path=tmp_path)
+    curve, _ = _fit(first, усул="4pl")
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    # Янги жараён: хотира бўш, эгри чизиқ дискдан олинади
+    second = CurveRegistry(path=tmp_path)
+    loaded, cached = _fit(second, усул="4pl")
+    assert cached
+    assert second.info()["disk_hits"] == 1 and second.info()["fits"] == 0
+    assert loaded.параметрлар == pytest.approx(curve.параметрлар)
+    od = np.array([0.1, 0.7, 1.2])
+    np.testing.assert_allclose(loaded(od), curve(od))
+
+
+def test_warm_loads_newest_curves(tmp_path):
+    first = CurveRegistry(path=tmp_path)
+    for лот in ("L1", "L2", "L3"):
+        _fit(first, лот=лот)
+
+    second = CurveRegistry(path=tmp_path)
+    assert second.warm() == 3
+    _, cached = _fit(second, лот="L2")
+    assert cached
+    info = second.info()
+    assert info["hits"] == 1 and info["disk_hits"] == 0 and info["fits"] == 0
+
+    assert CurveRegistry(path=tmp_path).warm(limit=2) == 2
+
+
+def test_corrupt_file_counts_disk_error(tmp_path):
+    first = CurveRegistry(path=tmp_path)
+    _fit(first)
+    [path] = tmp_path.glob("*.json")
+    path.write_text("{бузилган", encoding="utf-8")
+
+    second = CurveRegistry(path=tmp_path)
+    _, cached = _fit(second)
+    assert not cached
+    assert second.info()["disk_errors"] == 1
+    assert second.info()["fits"] == 1
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert tuple(data["key"]) == registry_key("ТТГ", "мкМЕ/мл", "L1", ОПТИК, КОНЦЕНТРАЦИЯ, "linear")
+
+
+def test_disk_maxsize_prunes_oldest(tmp_path):
+    registry = CurveRegistry(path=tmp_path, disk_maxsize=2)
+    for лот in ("L1", "L2", "L3"):
+        _fit(registry, лот=лот)
+    assert len(list(tmp_path.glob("*.json"))) == 2
@@ -0,0 +1,21 @@
+# tests/test_reprocess.py
+"""Пластиналарни қайта ҳисоблаш: битта ёмон пластина ишни тўхтатмайди"""
+from kalibrovka.export import build_config
+from kalibrovka.reprocess import check_plates, reprocess_plates
+
+СТАНДАРТЛАР = [[0.05, 0.0], [0.25, 2.0], [0.55, 5.0], [1.05, 10.0]]
+
+
+def test_malformed_plate_becomes_error_result():
+    good = build_config("ТТГ", "мкМЕ/мл", СТАНДАРТЛАР, [0.1, 0.3, 2.0], "linear")
+    results = reprocess_plates([good, [1, 2, 3], {"гормон_номи": "Т4"}], workers=1)
+
+    assert [r.номи for r in results] == ["ТТГ", "#2", "Т4"]
+    assert results[0].error is None
+    assert results[0].статистика["Жами беморлар"] == 3
+    assert results[1].error and results[2].error
+
+
+def test_check_plates_names_malformed_plate():
+    errors = check_plates([[1, 2, 3]])
+    assert [name for name, _ in errors] == ["#1"]
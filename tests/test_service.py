@@ -0,0 +1,104 @@
+# tests/test_service.py
+"""HTTP калибровка хизмати: 400 жавоблар, null қийматлар ва бирлаштириш"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from kalibrovka.engine import интерполяция
+from kalibrovka.service import CalibrationService, InProcessClient, RequestError, parse_payload
+
+СТАНДАРТЛАР = [[0.1, 1.0], [0.2, 2.0], [0.3, 3.5], [0.4, 4.0], [0.5, 5.0]]
+СЎРОВ = {"гормон_номи": "ТТГ", "улчов_бирлиги": "мкМЕ/мл", "стандартлар": СТАНДАРТЛАР}
+
+
+def _post(payload, client=None):
+    return asyncio.run((client or InProcessClient()).post("/calibrate", payload))
+
+
+@pytest.mark.parametrize("payload", [
+    [1, 2, 3],
+    {"беморлар": [0.1]},
+    {"стандартлар": СТАНДАРТЛАР},
+    dict(СЎРОВ, беморлар=[0.1], интерполяция_усули="cubic"),
+    # Стандартлар (k, 2) жуфтлари эмас
+    dict(СЎРОВ, стандартлар=[[0.1, 1.0, 9.0], [0.2, 2.0, 9.0]], беморлар=[0.1]),
+    dict(СЎРОВ, стандартлар=[0.1, 1.0, 0.2, 2.0], беморлар=[0.1]),
+    dict(СЎРОВ, стандартлар=[[0.1, 1.0], [0.2]], беморлар=[0.1]),
+    dict(СЎРОВ, стандартлар=[["a", 1.0], [0.2, 2.0]], беморлар=[0.1]),
+    dict(СЎРОВ, стандартлар=[[0.1, 1.0]], беморлар=[0.1]),
+    dict(СЎРОВ, стандартлар=[[0.1, 1.0], [float("nan"), 2.0]], беморлар=[0.1]),
+    dict(СЎРОВ, беморлар=[[0.1], "x"]),
+    # Мослаш хатоси (4PL учун стандартлар кам) ҳам мижоз хатоси
+    dict(СЎРОВ, стандартлар=СТАНДАРТЛАР[:2], беморлар=[0.1], интерполяция_усули="4pl"),
+])
+def test_bad_requests_are_400(payload):
+    status, data = _post(payload)
+    assert status == 400
+    assert data["error"]
+
+
+def test_bad_json_is_400():
+    service = CalibrationService()
+    status, data = asyncio.run(service.handle("POST", "/calibrate", b"{"))
+    assert int(status) == 400 and data["error"]
+    assert service.metrics()["errors"] == 1
+
+
+def test_unexpected_error_is_logged_not_returned(monkeypatch, caplog):
+    service = CalibrationService()
+
+    async def broken(payload):
+        raise RuntimeError("/srv/secret.db: ички тафсилот")
+
+    monkeypatch.setattr(service, "calibrate", broken)
+    with caplog.at_level("ERROR", logger="kalibrovka.service"):
+        status, data = asyncio.run(service.handle("POST", "/calibrate", b"{}"))
+
+    assert int(status) == 500
+    assert data == {"error": "Ички хатолик"}
+    assert service.metrics()["errors"] == 1
+    [record] = caplog.records
+    assert record.exc_info[0] is RuntimeError
+    assert "secret" in caplog.text
+
+
+def test_routes():
+    client = InProcessClient()
+    assert asyncio.run(client.get("/health")) == (200, {"status": "ok"})
+    assert asyncio.run(client.get("/nope"))[0] == 404
+    assert asyncio.run(client.get("/calibrate"))[0] == 405
+
+
+def test_parse_payload_rejects_reshapeable_standards():
+    with pytest.raises(RequestError):
+        parse_payload(dict(СЎРОВ, стандартлар=[[0.1, 1.0, 0.2, 2.0]], беморлар=[]))
+
+
+def test_non_finite_concentrations_are_null():
+    status, data = _post(dict(СЎРОВ, стандартлар=[[0.1, 1.0], [0.1, 2.0], [0.3, 3.0]],
+                              беморлар=[0.2, float("nan"), 0.1]))
+    assert status == 200
+    assert data["концентрация"][1] is None
+    assert all(v is None or np.isfinite(v) for v in data["концентрация"])
+
+
+def test_concurrent_requests_match_engine_and_are_batched():
+    client = InProcessClient()
+    rng = np.random.default_rng(0)
+    сўровлар = [dict(СЎРОВ, беморлар=rng.uniform(0.0, 0.6, 20).tolist(), интерполяция_усули="spline")
+                for _ in range(50)]
+
+    async def run():
+        return await asyncio.gather(*[client.post("/calibrate", s) for s in сўровлар])
+
+    жавоблар = asyncio.run(run())
+    x, y = np.array(СТАНДАРТЛАР).T
+    for сўров, (status, data) in zip(сўровлар, жавоблар):
+        концентрация, ҳолат = интерполяция(x, y, сўров["беморлар"], "spline")
+        assert status == 200
+        np.testing.assert_array_equal(data["концентрация"], концентрация)
+        assert data["ҳолат"] == ҳолат.tolist()
+    metrics = client.service.metrics()
+    assert metrics["batched_requests"] == 50 and metrics["batches"] < 50
+    assert metrics["queue_depth"] == 0
@@ -0,0 +1,134 @@
+# tests/test_store.py
+"""Натижалар омбори: TTL, LRU чиқариш, сессия чегараси ва бўлишиш"""
+import numpy as np
+import pytest
+
+from kalibrovka.store import MemoryBudgetError, ResultStore, StoredResult
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _result(n=100, seed=0):
+    rng = np.random.default_rng(seed)
+    оптик = rng.uniform(0.05, 2.0, n)
+    return StoredResult.create([0.05, 0.5, 1.05], [0.0, 5.0, 10.0], оптик, оптик * 10,
+                               np.zeros(n, dtype=np.int8), "нг/мл")
+
+
+SIZE = _result().nbytes
+
+
+def test_result_is_read_only():
+    result = _result()
+    with pytest.raises(ValueError):
+        result.концентрация_беморлар[0] = 1.0
+    assert result.статистика["Нормал диапазонда"] == 100
+
+
+def test_get_hit_and_miss():
+    store = ResultStore(max_bytes=10 * SIZE, session_bytes=None, ttl=None)
+    result = store.put("s1", "a", _result())
+    assert store.get("s2", "a") is result
+    assert store.get("s1", "b") is None
+    info = store.info()
+    assert (info["hits"], info["misses"], info["entries"]) == (1, 1, 1)
+
+
+def test_ttl_expiry():
+    clock = Clock()
+    store = ResultStore(max_bytes=10 * SIZE, session_bytes=None, ttl=60, clock=clock)
+    store.put("s1", "a", _result())
+    clock.now = 30
+    store.put("s1", "b", _result(seed=1))
+    clock.now = 59
+    assert store.get("s1", "a") is not None  # мурожаат вақтни янгилайди
+
+    clock.now = 100
+    assert store.get("s1", "a") is not None
+    assert store.get("s1", "b") is None
+    assert store.info()["expirations"] == 1
+
+    clock.now = 200
+    assert store.get("s2", "a") is None
+    info = store.info()
+    assert info["entries"] == 0 and info["bytes"] == 0
+    assert info["sessions"] == 0  # s1 эскирди, топилмаган s2 боғланмайди
+
+
+def test_lru_eviction_by_total_memory():
+    clock = Clock()
+    store = ResultStore(max_bytes=3 * SIZE, session_bytes=None, ttl=None, clock=clock)
+    for i, key in enumerate("abc"):
+        clock.now = i
+        store.put(f"s{i}", key, _result(seed=i))
+    clock.now = 10
+    store.get("s0", "a")  # "a" энди энг янги
+    store.put("s3", "d", _result(seed=3))
+
+    assert store.get("s0", "b") is None
+    assert all(store.get("s0", key) is not None for key in "acd")
+    info = store.info()
+    assert info["evictions"] == 1 and info["bytes"] == 3 * SIZE
+
+
+def test_newest_entry_is_kept_over_budget():
+    store = ResultStore(max_bytes=SIZE // 2, session_bytes=None, ttl=None)
+    store.put("s1", "a", _result())
+    store.put("s1", "b", _result(seed=1))
+    assert store.get("s1", "a") is None
+    assert store.get("s1", "b") is not None
+
+
+def test_session_cap_drops_oldest_of_that_session():
+    store = ResultStore(max_bytes=100 * SIZE, session_bytes=2 * SIZE, ttl=None)
+    store.put("s1", "a", _result())
+    store.put("s1", "b", _result(seed=1))
+    store.put("s1", "c", _result(seed=2))
+
+    assert store.get("s2", "a") is None
+    assert store.info()["evictions"] == 1
+    [report] = [r for r in store.sessions() if r["session"] == "s1"]
+    assert report["results"] == 2 and report["bytes"] == 2 * SIZE
+
+
+def test_session_cap_keeps_results_shared_with_other_sessions():
+    store = ResultStore(max_bytes=100 * SIZE, session_bytes=2 * SIZE, ttl=None)
+    store.put("s1", "a", _result())
+    store.get("s2", "a")
+    store.put("s1", "b", _result(seed=1))
+    store.put("s1", "c", _result(seed=2))
+
+    # s1 "a" дан узилди, лекин s2 уни ишлатаётгани учун хотирада қолди
+    assert store.info()["evictions"] == 0
+    assert store.get("s2", "a") is not None
+    shared = {r["session"]: r for r in store.sessions()}
+    assert shared["s1"]["results"] == 2
+    assert shared["s2"]["results"] == 1
+
+
+def test_memory_budget_error():
+    store = ResultStore(max_bytes=100 * SIZE, session_bytes=SIZE - 1, ttl=None)
+    with pytest.raises(MemoryBudgetError, match="сессия чегараси"):
+        store.put("s1", "a", _result())
+    assert store.info()["entries"] == 0
+    assert issubclass(MemoryBudgetError, MemoryError)
+
+
+def test_release_and_clear():
+    store = ResultStore(max_bytes=10 * SIZE, session_bytes=None, ttl=None)
+    store.put("s1", "a", _result())
+    store.put("s1", "b", _result(seed=1))
+    store.release("s1", "a")
+    assert [r["results"] for r in store.sessions()] == [1]
+    store.release("s1")
+    store.release("missing")
+    assert store.sessions() == []
+
+    store.clear()
+    assert store.info()["entries"] == 0 and store.info()["bytes"] == 0
@@ -0,0 +1,105 @@
+# tests/test_stream.py
+"""Оқимли режим: бўлаклаб ўқиш ва CSV/Parquet га ёзиш"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kalibrovka import stream
+from kalibrovka.engine import CalibrationCurve
+from kalibrovka.results import status_labels
+from kalibrovka.stream import _ChunkWriter, iter_chunks, stream_file
+
+ОПТИК = [0.05, 0.25, 0.55, 1.05, 1.6]
+КОНЦЕНТРАЦИЯ = [0.0, 2.0, 5.0, 10.0, 20.0]
+
+
+@pytest.fixture
+def curve():
+    return CalibrationCurve.from_standards(ОПТИК, КОНЦЕНТРАЦИЯ, "linear")
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Бемор": np.arange(1, 1001),
+        "Оптик зичлик": rng.uniform(0.0, 1.8, 1000),
+    })
+    path = tmp_path / "in.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+
+@pytest.fixture(params=["arrow", "pandas"])
+def writer_backend(request, monkeypatch):
+    if request.param == "arrow":
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(stream, "_has_pyarrow", lambda: False)
+    return request.param
+
+
+def _read(path):
+    return pd.read_parquet(path) if str(path).endswith(".parquet") else pd.read_csv(path)
+
+
+def _check_output(result, df, curve, conc_column="Концентрация"):
+    оптик = df["Оптик зичлик"].to_numpy()
+    assert list(result["Бемор"]) == list(df["Бемор"])
+    np.testing.assert_allclose(result["Оптик зичлик"], оптик)
+    np.testing.assert_allclose(result[conc_column], curve(оптик))
+    assert list(result["Ҳолат"]) == list(status_labels(curve.classify(оптик)))
+
+
+def test_iter_chunks_csv(input_csv):
+    path, df = input_csv
+    chunks = list(iter_chunks(path, chunksize=300))
+    assert [len(c) for c in chunks] == [300, 300, 300, 100]
+    np.testing.assert_allclose(pd.concat(chunks)["Оптик зичлик"], df["Оптик зичлик"])
+
+
+def test_iter_chunks_parquet(tmp_path, input_csv):
+    pytest.importorskip("pyarrow")
+    _, df = input_csv
+    path = tmp_path / "in.parquet"
+    df.to_parquet(path, index=False)
+    chunks = list(iter_chunks(path, chunksize=400, columns=["Оптик зичлик"]))
+    assert sum(len(c) for c in chunks) == 1000
+    assert list(chunks[0].columns) == ["Оптик зичлик"]
+
+
+def test_stream_csv_to_csv(tmp_path, input_csv, curve, writer_backend):
+    path, df = input_csv
+    output = tmp_path / "out.csv"
+    info = stream_file(curve, path, output, chunksize=256, улчов_бирлиги="нг/мл")
+    assert info["rows"] == 1000
+    _check_output(_read(output), df, curve, "Концентрация (нг/мл)")
+
+
+def test_stream_csv_to_parquet(tmp_path, input_csv, curve):
+    pytest.importorskip("pyarrow")
+    path, df = input_csv
+    output = tmp_path / "out.parquet"
+    info = stream_file(curve, path, output, chunksize=256)
+    assert info["rows"] == 1000
+    _check_output(_read(output), df, curve)
+
+
+def test_stream_missing_column(tmp_path, input_csv, curve):
+    path, _ = input_csv
+    with pytest.raises(ValueError, match="устуни топилмади"):
+        stream_file(curve, path, tmp_path / "out.csv", column="OD")
+
+
+def test_chunk_writer_keeps_first_schema(tmp_path, writer_backend):
+    # Иккинчи бўлакда int устун float бўлиб келса ҳам файл бир бутун қолади
+    output = tmp_path / "w.csv"
+    writer = _ChunkWriter(output)
+    assert writer.arrow is (writer_backend == "arrow")
+    writer.write(pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}))
+    writer.write(pd.DataFrame({"a": [3.0], "b": ["z"]}))
+    writer.close()
+
+    result = pd.read_csv(output)
+    assert list(result["a"]) == [1, 2, 3]
+    assert list(result["b"]) == ["x", "y", "z"]